@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+오프라인 성능 측정 스크립트
+
+네이버 검색 API, 기사 사이트, Ollama를 흉내 내는 로컬 HTTP 서버를 띄운 뒤
+fetch_news, extract_article_text, assess_relevance, summarize_text, 전체 파이프라인의
+소요 시간을 기사 수별로 측정하여 JSON으로 출력합니다. 네트워크 자격 증명이나 Ollama가 필요 없습니다.
+
+사용법:
+  python bench_system.py                              # 30/300/3000건, 요약 모델 없이 측정
+  python bench_system.py --sizes 30 300 --output bench.json
+  python bench_system.py --summary-model <작은 요약 모델>   # 요약 단계까지 측정
+  python bench_system.py --fixtures recorded/          # 녹화해 둔 응답 재생
+  python bench_system.py --sizes 30 --summary-model <요약 모델> --summary-backends torch torch-int8 onnx --summary-workers 4
+                                                       # 요약 백엔드별 처리량/기본 출력 대비 일치도 비교
+  python bench_system.py --sizes 30 --extract-compare  # newspaper 대비 경량 본문 추출기 속도/일치도 비교
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import math
+import time
+import zlib
+import random
+import difflib
+import argparse
+import tempfile
+import threading
+import email.utils
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 네이버 API 한 검색어로 받을 수 있는 최대 기사 수 (start 1000 + display 100)
+MAX_ITEMS_PER_QUERY = 1000
+
+# 합성 기사 생성용 어휘
+VOCABULARY = (
+    "농촌 빈집 정비 사업 지자체 예산 주민 마을 귀농 청년 인구 감소 지원 정책 정부 발표 "
+    "주택 리모델링 철거 안전 관리 소유자 세금 공공 임대 활용 방안 지역 소멸 대응 도시 재생 "
+    "국토교통부 행정안전부 조례 개정 실태 조사 결과 전국 증가 추세 전문가 지적 대책 마련 시급 "
+    "부동산 시장 거래 가격 하락 상승 금리 대출 규제 완화 공급 확대 분양 청약 경쟁률 기록"
+).split()
+
+
+class FakeBackend:
+    """로컬 서버가 돌려줄 데이터와 지연시간 설정"""
+
+    def __init__(self, naver_latency: float, article_latency: float, llm_latency: float,
+                 fixtures: Optional[str] = None, seed: int = 42):
+        self.naver_latency = naver_latency
+        self.article_latency = article_latency
+        self.llm_latency = llm_latency
+        self.items_per_query = 30
+        self.base_url = ""
+        self.site_urls: List[str] = []
+        self.random = random.Random(seed)
+        self.now = datetime.now(timezone.utc)
+        self.recorded_items: List[Dict[str, Any]] = []
+        self.recorded_pages: List[str] = []
+        if fixtures:
+            self._load_fixtures(fixtures)
+
+    def _load_fixtures(self, directory: str):
+        """녹화해 둔 네이버 응답(naver/*.json)과 기사 HTML(articles/*.html) 읽기"""
+        for path in sorted(glob.glob(os.path.join(directory, "naver", "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                self.recorded_items.extend(json.load(f).get("items", []))
+        for path in sorted(glob.glob(os.path.join(directory, "articles", "*.html"))):
+            with open(path, "rb") as f:
+                self.recorded_pages.append(f.read().decode("utf-8", errors="replace"))
+
+    def _sentence(self, rng: random.Random, words: int) -> str:
+        return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+    def search_items(self, query: str, start: int, display: int, days_back: int) -> List[Dict[str, Any]]:
+        """검색 결과 한 페이지 (최신순)"""
+        items = []
+        span = days_back * 86400 * 0.9 / max(1, self.items_per_query)
+        for n in range(start, min(start + display, self.items_per_query + 1)):
+            article_id = f"{zlib.crc32(query.encode('utf-8')) % 100000}-{n}"
+            pub_date = self.now - timedelta(seconds=n * span)
+            if self.recorded_items:
+                recorded = self.recorded_items[(n - 1) % len(self.recorded_items)]
+                title, description = recorded.get("title", ""), recorded.get("description", "")
+            else:
+                rng = random.Random(article_id)
+                title = f"{query} {self._sentence(rng, 6)}"
+                description = self._sentence(rng, 20)
+            # 여러 사이트(호스트)에 나눠 호스트별 동시성 제한과 도메인 통계가 실제와 비슷하게 작동하도록 함
+            site = self.site_urls[zlib.crc32(article_id.encode("utf-8")) % len(self.site_urls)]
+            link = f"{site}/article/{article_id}"
+            items.append({
+                "title": title,
+                "originallink": link,
+                "link": link,
+                "description": description,
+                "pubDate": email.utils.format_datetime(pub_date),
+            })
+        return items
+
+    def article_html(self, article_id: str) -> str:
+        """기사 페이지 HTML"""
+        if self.recorded_pages:
+            return self.recorded_pages[zlib.crc32(article_id.encode("utf-8")) % len(self.recorded_pages)]
+        rng = random.Random(article_id)
+        paragraphs = "\n".join(f"<p>{self._sentence(rng, 40)}.</p>" for _ in range(8))
+        title = self._sentence(rng, 6)
+        related = "".join(f"<li><a href='/article/{rng.randrange(10 ** 6)}'>{self._sentence(rng, 6)}</a></li>"
+                          for _ in range(10))
+        # 국내 사이트처럼 일부 페이지는 EUC-KR로 제공
+        charset = "euc-kr" if rng.random() < 0.3 else "utf-8"
+        return f"""<html><head><meta charset="{charset}"><title>{title}</title>
+<script>window.ads = {{"slot": "top"}};</script><style>body {{ margin: 0; }}</style></head>
+<body><header><nav><a href="/">홈</a> <a href="/politics">정치</a> <a href="/economy">경제</a></nav></header>
+<div class="wrap"><article><h1>{title}</h1>
+{paragraphs}
+</article><aside><h3>관련 기사</h3><ul>{related}</ul></aside></div>
+<footer>Copyright 가짜 신문사. 무단 전재 및 재배포 금지.</footer></body></html>"""
+
+    def chat_reply(self, prompt: str, structured: bool = False) -> str:
+        """Ollama 응답 흉내 (번호 목록이면 '번호: 점수' 줄, 아니면 숫자 하나, format 지정 시 JSON)"""
+        numbers = re.findall(r"^\s*(\d+)\. ", prompt, re.M)
+        scores = [self.random.choice((20, 60, 90)) for _ in numbers or [0]]
+        if structured:
+            return json.dumps({"scores": scores} if numbers else {"score": scores[0]})
+        if numbers:
+            return "\n".join(f"{n}: {score}" for n, score in zip(numbers, scores))
+        return str(scores[0])
+
+
+def make_handler(backend: FakeBackend, days_back: int):
+    """요청 경로별로 네이버 API / 기사 / Ollama를 흉내 내는 핸들러 클래스 생성"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/v1/search/news.json":
+                time.sleep(backend.naver_latency)
+                params = parse_qs(url.query)
+                items = backend.search_items(
+                    params.get("query", [""])[0],
+                    int(params.get("start", ["1"])[0]),
+                    int(params.get("display", ["10"])[0]),
+                    days_back
+                )
+                body = json.dumps({"items": items}, ensure_ascii=False).encode("utf-8")
+                self._send(200, body, "application/json; charset=utf-8")
+            elif url.path.startswith("/article/"):
+                time.sleep(backend.article_latency)
+                html = backend.article_html(url.path.rsplit("/", 1)[1])
+                if '<meta charset="euc-kr">' in html:
+                    self._send(200, html.encode("cp949", errors="replace"), "text/html")
+                else:
+                    self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+            elif url.path in ("/", "/api/version"):
+                self._send(200, b'{"version": "0.0.0"}', "application/json")
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length", "0"))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if url.path != "/api/chat":
+                self._send(404, b"not found", "text/plain")
+                return
+            time.sleep(backend.llm_latency)
+            prompt = request.get("messages", [{}])[-1].get("content", "")
+            content = backend.chat_reply(prompt, structured=bool(request.get("format")))
+            eval_count = max(1, len(content) // 2)
+            body = json.dumps({
+                "model": request.get("model", ""),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": content},
+                "done": True,
+                "done_reason": "stop",
+                "eval_count": eval_count,
+                "eval_duration": int(backend.llm_latency * 1e9) or 1,
+            }, ensure_ascii=False).encode("utf-8")
+            self._send(200, body, "application/json")
+
+    return Handler
+
+
+def start_servers(backend: FakeBackend, days_back: int, sites: int) -> List[ThreadingHTTPServer]:
+    """로컬 가짜 서버들을 백그라운드 스레드로 시작 (첫 번째 서버가 네이버 API/Ollama 역할)
+
+    호스트별 동시성 제한과 도메인 통계는 포트를 빼고 호스트 이름으로 구분하므로, 사이트마다 다른
+    루프백 주소(127.0.0.2, 127.0.0.3, ...)를 씁니다. 그런 주소에 바인딩할 수 없는 환경(macOS 등)에서는
+    127.0.0.1로 대신하며, 이때는 모든 사이트가 한 호스트로 묶입니다.
+    """
+    servers = []
+    for i in range(max(1, sites)):
+        host = f"127.0.0.{i + 2}"
+        try:
+            server = ThreadingHTTPServer((host, 0), make_handler(backend, days_back))
+        except OSError:
+            if i == 0:
+                print("경고: 127.0.0.x 주소에 바인딩할 수 없어 모든 사이트를 127.0.0.1 한 호스트로 띄웁니다.")
+            host = "127.0.0.1"
+            server = ThreadingHTTPServer((host, 0), make_handler(backend, days_back))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        backend.site_urls.append(f"http://{host}:{server.server_address[1]}")
+        servers.append(server)
+    backend.base_url = backend.site_urls[0]
+    return servers
+
+
+def timed(results: List[Dict[str, Any]], size: int, stage: str, calls: int, func):
+    """함수 실행 시간을 측정하여 결과 목록에 추가"""
+    started = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - started
+    results.append({
+        "size": size,
+        "stage": stage,
+        "calls": calls,
+        "seconds": round(seconds, 4),
+        "per_call_ms": round(seconds * 1000 / calls, 3) if calls else 0.0,
+        "per_second": round(calls / seconds, 2) if seconds else 0.0,
+    })
+    print(f"  {stage:<28} {calls:>6}건 {seconds:>9.3f}s")
+    return value
+
+
+def run_case(processor, backend: FakeBackend, size: int, sample: int) -> List[Dict[str, Any]]:
+    """기사 수 하나에 대한 단계별 측정"""
+    from lib_metrics import metrics
+
+    results: List[Dict[str, Any]] = []
+    query_count = math.ceil(size / MAX_ITEMS_PER_QUERY)
+    backend.items_per_query = math.ceil(size / query_count)
+    queries = [f"빈집{i}" if i else "빈집" for i in range(query_count)]
+    print(f"[{size}건] 검색어 {query_count}개 x {backend.items_per_query}건")
+
+    news_service = processor.news_service
+    llm_service = processor.llm_service
+
+    items = []
+    for query in queries:
+        items.extend(timed(results, size, "fetch_news", 1, lambda: news_service.fetch_news(query)))
+    links = [item["link"] for item in items]
+    titles = [item["title"] for item in items]
+
+    sampled_links = links[:sample]
+    timed(results, size, "extract_article_text", len(sampled_links),
+          lambda: [news_service.extract_article_text(link) for link in sampled_links])
+    bodies = timed(results, size, "extract_articles(concurrent)", len(links),
+                   lambda: news_service.extract_articles(links))
+
+    sampled_titles = titles[:sample]
+    timed(results, size, "assess_relevance", len(sampled_titles),
+          lambda: [llm_service.assess_relevance("빈집", title) for title in sampled_titles])
+    timed(results, size, "assess_relevance_many", len(sampled_titles),
+          lambda: llm_service.assess_relevance_many("빈집", sampled_titles))
+    timed(results, size, "assess_relevance_batch", len(titles),
+          lambda: llm_service.assess_relevance_batch("빈집", titles))
+
+    sampled_bodies = bodies[:sample]
+    timed(results, size, "summarize_text", len(sampled_bodies),
+          lambda: [processor.summarize_text(body) for body in sampled_bodies])
+    timed(results, size, "summarize_batch", len(bodies), lambda: processor.summarize_batch(bodies))
+
+    metrics.reset()
+    timed(results, size, "process_news(end-to-end)", len(items),
+          lambda: processor.process_batch([(query, "빈집") for query in queries]))
+    results[-1]["metrics"] = metrics.snapshot()
+    return results
+
+
+def compare_extractors(news_service, links: List[str]) -> List[Dict[str, Any]]:
+    """같은 원문으로 newspaper와 경량 추출기의 파싱 시간, 메모리 최고치, 본문 일치도 비교"""
+    import tracemalloc
+    from lib_extract import decode_html
+    from newspaper import Article
+
+    pages = []
+    for link in links:
+        try:
+            raw, content_type = news_service.extractor.fetch(link)
+            pages.append((link, decode_html(raw, content_type)))
+        except Exception as e:
+            print(f"  원문 다운로드 실패 ({link}): {e}")
+    print(f"[본문 추출기 비교] 기사 {len(pages)}건")
+
+    def parse_newspaper(url: str, html: str) -> str:
+        article = Article(url, language="ko")
+        article.download(input_html=html)
+        article.parse()
+        return article.text
+
+    def parse_lxml(url: str, html: str) -> str:
+        return news_service.extractor.extract(html, url)
+
+    results: List[Dict[str, Any]] = []
+    reference: Optional[List[str]] = None
+    for name, parse in (("newspaper", parse_newspaper), ("lxml", parse_lxml)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        texts = [" ".join(parse(url, html).split()) for url, html in pages]
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if reference is None:
+            reference = texts
+        similarity = sum(difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, texts))
+        results.append({
+            "extractor": name,
+            "seconds": round(seconds, 4),
+            "per_article_ms": round(seconds * 1000 / len(pages), 3) if pages else 0.0,
+            "peak_kb": round(peak / 1024, 1),
+            "empty": sum(1 for text in texts if not text),
+            "parity_similarity": round(similarity / len(pages), 3) if pages else 1.0,
+        })
+        print(f"  {name:<12} {seconds:>9.3f}s  {results[-1]['per_article_ms']:>8.2f}ms/건"
+              f"  최대 {results[-1]['peak_kb']:>9.1f}KB  유사도 {results[-1]['parity_similarity']:.3f}")
+    return results
+
+
+def compare_summary_backends(config, bodies: List[str], backends: List[str], workers: int) -> List[Dict[str, Any]]:
+    """요약 백엔드별 처리량과 기본 백엔드(torch, 단일 프로세스) 출력 대비 일치도 비교"""
+    import copy
+    from lib_summary import SummaryBackend
+
+    texts = [body for body in bodies if body and len(body.strip()) >= 64]
+    candidates = [("torch", 1)] + [(name, 1) for name in backends if name != "torch"]
+    if workers > 1:
+        candidates += [(name, workers) for name in backends]
+    print(f"[요약 백엔드 비교] 기사 {len(texts)}건")
+
+    results: List[Dict[str, Any]] = []
+    reference: Optional[List[str]] = None
+    for name, worker_count in candidates:
+        backend_config = copy.copy(config)
+        backend_config.summary_backend = name
+        backend_config.summary_workers = worker_count
+        try:
+            started = time.perf_counter()
+            backend = SummaryBackend.from_config(backend_config)
+            load_seconds = time.perf_counter() - started
+        except Exception as e:
+            print(f"  {name} x{worker_count}: 로딩 실패 - {e}")
+            results.append({"backend": name, "workers": worker_count, "error": str(e)})
+            continue
+
+        try:
+            # 첫 호출의 초기화 비용은 제외
+            backend.summarize(texts[:1])
+            batch_size = max(1, config.summary_batch_size)
+            summaries: List[str] = []
+            started = time.perf_counter()
+            for start in range(0, len(texts), batch_size):
+                summaries.extend(backend.summarize(texts[start:start + batch_size]))
+            seconds = time.perf_counter() - started
+            tokens = sum(len(ids) for ids in backend.tokenizer(summaries)["input_ids"]) if summaries else 0
+        finally:
+            backend.close()
+
+        if reference is None:
+            reference = summaries
+        exact = sum(1 for a, b in zip(reference, summaries) if a == b)
+        similarity = sum(difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, summaries))
+        results.append({
+            "backend": name,
+            "workers": worker_count,
+            "load_seconds": round(load_seconds, 3),
+            "seconds": round(seconds, 4),
+            "articles_per_second": round(len(texts) / seconds, 2) if seconds else 0.0,
+            "tokens_per_second": round(tokens / seconds, 1) if seconds else 0.0,
+            "parity_exact": round(exact / len(texts), 3) if texts else 1.0,
+            "parity_similarity": round(similarity / len(texts), 3) if texts else 1.0,
+        })
+        print(f"  {name:<12} x{worker_count:<3} {seconds:>9.3f}s  {results[-1]['articles_per_second']:>7.2f}건/s"
+              f"  일치 {results[-1]['parity_exact']:.0%}  유사도 {results[-1]['parity_similarity']:.3f}")
+    return results
+
+
+def main():
+    """메인 측정 함수"""
+    parser = argparse.ArgumentParser(description="로컬 가짜 서버를 이용한 뉴스 파이프라인 오프라인 성능 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000], help="측정할 기사 수 목록")
+    parser.add_argument("--sample", type=int, default=30, help="개별 호출 단계에서 측정할 최대 건수")
+    parser.add_argument("--naver-latency", type=float, default=0.05, help="네이버 API 응답 지연(초)")
+    parser.add_argument("--article-latency", type=float, default=0.05, help="기사 페이지 응답 지연(초)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="가짜 Ollama 응답 지연(초)")
+    parser.add_argument("--sites", type=int, default=10, help="기사를 나눠 둘 가짜 사이트(호스트) 수")
+    parser.add_argument("--summary-model", default="", help="요약 모델 이름 (기본값: 요약 생략)")
+    parser.add_argument("--extract-compare", action="store_true",
+                        help="newspaper와 경량 추출기(lxml)의 파싱 시간/메모리/본문 일치도 비교")
+    parser.add_argument("--summary-backends", nargs="+", default=[],
+                        help="비교할 요약 백엔드 목록 (torch, torch-int8, onnx, --summary-model 필요)")
+    parser.add_argument("--summary-workers", type=int, default=1, help="요약 백엔드 비교 시 프로세스 풀 크기")
+    parser.add_argument("--fixtures", metavar="DIR", help="녹화 응답 디렉터리 (naver/*.json, articles/*.html)")
+    parser.add_argument("--output", metavar="FILE", help="결과 JSON 저장 파일 (기본값: 표준 출력)")
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.naver_latency, args.article_latency, args.llm_latency, args.fixtures)
+    days_back = 7
+    servers = start_servers(backend, days_back, args.sites)
+
+    # 서비스 모듈을 불러오기 전에 가짜 서버 주소를 환경변수로 지정
+    os.environ["OLLAMA_HOST"] = backend.base_url
+    os.environ["NAVER_API_URL"] = f"{backend.base_url}/v1/search/news.json"
+    os.environ.setdefault("X-Naver-Client-Id", "bench")
+    os.environ.setdefault("X-Naver-Client-Secret", "bench")
+    os.environ["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "WARNING")
+
+    from config import Config
+    from news_processor import NewsProcessor
+
+    config = Config()
+    config.days_back = days_back
+    config.refresh_dates()
+    config.cache_enabled = False
+    config.incremental = False
+    # 이전 측정의 도메인 통계(차단, 제한 시간)가 결과에 영향을 주지 않도록 매번 새로 시작
+    config.domain_stats_file = os.path.join(tempfile.mkdtemp(prefix="bench-"), "domain_stats.sqlite3")
+    config.news_max_items = MAX_ITEMS_PER_QUERY
+    config.summary_model = args.summary_model
+    processor = NewsProcessor(config)
+
+    results = []
+    backend_results = []
+    extractor_results = []
+    try:
+        for size in args.sizes:
+            results.extend(run_case(processor, backend, size, args.sample))
+        if args.extract_compare:
+            items = processor.news_service.fetch_news("빈집")[:args.sample]
+            extractor_results = compare_extractors(processor.news_service, [item["link"] for item in items])
+        if args.summary_backends and args.summary_model:
+            items = processor.news_service.fetch_news("빈집")[:args.sample]
+            bodies = processor.news_service.extract_articles([item["link"] for item in items])
+            backend_results = compare_summary_backends(config, bodies, args.summary_backends, args.summary_workers)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    report = json.dumps({
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "naver_latency": args.naver_latency,
+            "article_latency": args.article_latency,
+            "llm_latency": args.llm_latency,
+            "summary_model": args.summary_model,
+            "fixtures": args.fixtures,
+            "sites": args.sites,
+            "fetch_workers": config.fetch_workers,
+            "article_extractor": config.article_extractor,
+            "relevance_batch_size": config.relevance_batch_size,
+            "summary_batch_size": config.summary_batch_size,
+        },
+        "results": results,
+        "extractors": extractor_results,
+        "summary_backends": backend_results,
+    }, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"결과 파일 생성: {args.output}")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -17,33 +17,124 @@ class Config:
         
         # LLM 설정
         self.llm_model = os.getenv("LLM_MODEL", "llama3.1:8b")
+        self.llm_max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+        self.llm_timeout = float(os.getenv("LLM_TIMEOUT", "120"))
+        self.llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.llm_backoff = float(os.getenv("LLM_BACKOFF", "1.0"))
+        self.llm_keep_alive = os.getenv("LLM_KEEP_ALIVE", "30m")
         
         # 날짜 설정
-        self.today = datetime.now()
         self.days_back = int(os.getenv("DAYS_BACK", "7"))
-        self.from_date = self.today - timedelta(days=self.days_back)
+        self.refresh_dates()
         
         # 뉴스 설정
-        self.news_display_count = int(os.getenv("NEWS_DISPLAY_COUNT", "30"))
+        self.news_display_count = int(os.getenv("NEWS_DISPLAY_COUNT", "100"))
+        self.news_max_items = int(os.getenv("NEWS_MAX_ITEMS", "1000"))
         self.relevance_threshold = int(os.getenv("RELEVANCE_THRESHOLD", "50"))
+        self.relevance_batch_size = int(os.getenv("RELEVANCE_BATCH_SIZE", "20"))
+        self.relevance_format = os.getenv("RELEVANCE_FORMAT", "json")
+        self.relevance_num_predict = int(os.getenv("RELEVANCE_NUM_PREDICT", "8"))
+        self.relevance_fail_open = os.getenv("RELEVANCE_FAIL_OPEN", "true").lower() == "true"
+        
+        # 연관성 사전 필터 설정 (키워드 n-gram → 임베딩 → LLM 순)
+        self.relevance_cascade = os.getenv("RELEVANCE_CASCADE", "true").lower() == "true"
+        self.relevance_ngram = int(os.getenv("RELEVANCE_NGRAM", "2"))
+        self.relevance_accept_similarity = float(os.getenv("RELEVANCE_ACCEPT_SIMILARITY", "0.8"))
+        self.relevance_reject_similarity = float(os.getenv("RELEVANCE_REJECT_SIMILARITY", "0.1"))
+        self.relevance_reject_min_ngrams = int(os.getenv("RELEVANCE_REJECT_MIN_NGRAMS", "4"))
+        self.relevance_embedding_model = os.getenv("RELEVANCE_EMBEDDING_MODEL", "")
+        self.relevance_embed_accept = float(os.getenv("RELEVANCE_EMBED_ACCEPT", "0.6"))
+        self.relevance_embed_reject = float(os.getenv("RELEVANCE_EMBED_REJECT", "0.3"))
+        
+        # 네이버 API 요청 설정
+        self.naver_api_url = os.getenv("NAVER_API_URL", "https://openapi.naver.com/v1/search/news.json")
+        self.naver_timeout = float(os.getenv("NAVER_TIMEOUT", "10"))
+        self.naver_max_retries = int(os.getenv("NAVER_MAX_RETRIES", "4"))
+        self.naver_backoff = float(os.getenv("NAVER_BACKOFF", "1.0"))
+        self.naver_concurrency = int(os.getenv("NAVER_CONCURRENCY", "4"))
+        
+        # 본문 다운로드 동시성 설정
+        self.fetch_workers = int(os.getenv("FETCH_WORKERS", "8"))
+        self.fetch_per_host = int(os.getenv("FETCH_PER_HOST", "2"))
         
-        # 필터링 설정
+        # 본문 추출 설정 (lxml: 경량 추출기, newspaper: 기존 newspaper3k)
+        self.article_extractor = os.getenv("ARTICLE_EXTRACTOR", "lxml")
+        self.extract_timeout = float(os.getenv("EXTRACT_TIMEOUT", "10"))
+        self.extract_time_budget = float(os.getenv("EXTRACT_TIME_BUDGET", "15"))
+        self.extract_parse_budget = float(os.getenv("EXTRACT_PARSE_BUDGET", "3"))
+        self.extract_max_kb = int(os.getenv("EXTRACT_MAX_KB", "3072"))
+        self.extract_min_chars = int(os.getenv("EXTRACT_MIN_CHARS", "200"))
+        self.extract_fallback = os.getenv("EXTRACT_FALLBACK", "true").lower() == "true"
+        
+        # 필터링 설정 (호스트 이름, 하위 도메인 포함)
+        # 네이버 미러(n.news.naver.com)는 원문을 받을 수 없는 기사의 대체 주소로 쓰므로 제외하지 않음
         self.skip_domains = [
-            "n.news",
             "news.ifm.kr", 
             "www.dnews.co.kr"
         ]
         
+        # 도메인별 추출 통계 설정 (연속 실패 시 차단, 응답 시간에 맞춘 제한 시간)
+        self.domain_stats_file = os.getenv("DOMAIN_STATS_FILE", "domain_stats.sqlite3")
+        self.domain_failure_threshold = int(os.getenv("DOMAIN_FAILURE_THRESHOLD", "3"))
+        self.domain_cooldown_minutes = float(os.getenv("DOMAIN_COOLDOWN_MINUTES", "60"))
+        self.domain_min_timeout = float(os.getenv("DOMAIN_MIN_TIMEOUT", "3"))
+        self.domain_timeout_factor = float(os.getenv("DOMAIN_TIMEOUT_FACTOR", "3"))
+        self.domain_window = int(os.getenv("DOMAIN_WINDOW", "50"))
+        
         # 요약 설정
         self.summary_model = os.getenv("SUMMARY_MODEL", "gogamza/kobart-summarization")
-        self.max_text_length = int(os.getenv("MAX_TEXT_LENGTH", "2048"))
         self.summary_max_length = int(os.getenv("SUMMARY_MAX_LENGTH", "128"))
         self.summary_min_length = int(os.getenv("SUMMARY_MIN_LENGTH", "30"))
+        self.summary_batch_size = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+        self.summary_chunk_tokens = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1000"))
+        self.summary_max_chunks = int(os.getenv("SUMMARY_MAX_CHUNKS", "8"))
+        self.summary_backend = os.getenv("SUMMARY_BACKEND", "torch")
+        self.summary_workers = int(os.getenv("SUMMARY_WORKERS", "1"))
+        self.summary_threads = int(os.getenv("SUMMARY_THREADS", "0"))
+        self.summary_onnx_dir = os.getenv("SUMMARY_ONNX_DIR", "onnx_models")
+        self.summary_socket = os.getenv("SUMMARY_SOCKET", "")
+        self.summary_socket_timeout = float(os.getenv("SUMMARY_SOCKET_TIMEOUT", "600"))
+        
+        # 중복 제거 설정
+        self.dedup_enabled = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+        self.dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+        self.dedup_ngram = int(os.getenv("DEDUP_NGRAM", "3"))
+        self.dedup_num_perm = int(os.getenv("DEDUP_NUM_PERM", "64"))
+        self.dedup_bands = int(os.getenv("DEDUP_BANDS", "16"))
+        self.dedup_text_length = int(os.getenv("DEDUP_TEXT_LENGTH", "500"))
+        
+        # 캐시 설정
+        self.cache_enabled = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+        self.cache_dir = os.getenv("CACHE_DIR", ".cache")
+        self.cache_ttl_days = float(os.getenv("CACHE_TTL_DAYS", "30"))
+        self.cache_max_mb = int(os.getenv("CACHE_MAX_MB", "512"))
+        
+        # 증분 수집 설정
+        self.incremental = os.getenv("INCREMENTAL", "false").lower() == "true"
+        self.index_file = os.getenv("INDEX_FILE", "news_index.sqlite3")
+        
+        # 작업 대기열 설정 (enqueue/worker/render 명령)
+        self.queue_file = os.getenv("QUEUE_FILE", "news_queue.sqlite3")
+        self.queue_lease_seconds = float(os.getenv("QUEUE_LEASE_SECONDS", "600"))
+        self.queue_max_attempts = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+        self.queue_poll_interval = float(os.getenv("QUEUE_POLL_INTERVAL", "1.0"))
+        
+        # 보고서 서버 설정 (serve 명령)
+        self.serve_host = os.getenv("SERVE_HOST", "127.0.0.1")
+        self.serve_port = int(os.getenv("SERVE_PORT", "8000"))
+        self.serve_refresh_minutes = float(os.getenv("SERVE_REFRESH_MINUTES", "30"))
+        self.serve_max_queries = int(os.getenv("SERVE_MAX_QUERIES", "20"))
+        self.serve_cache_dir = os.getenv("SERVE_CACHE_DIR", "report_cache")
         
         # 출력 파일 설정
         self.output_file = os.getenv("OUTPUT_FILE", "result.html")
-        self.output_nodup_file = os.getenv("OUTPUT_NODUP_FILE", "result_nodup.html")
+        self.output_jsonl = os.getenv("OUTPUT_JSONL", "true").lower() == "true"
         
+    def refresh_dates(self, now: Optional[datetime] = None):
+        """수집 기간(today, from_date)을 지금(또는 now) 기준으로 다시 계산 (오래 실행되는 서버용)"""
+        self.today = now or datetime.now()
+        self.from_date = self.today - timedelta(days=self.days_back)
+    
     def setup_logging(self):
         """로깅 설정"""
         log_level = os.getenv("LOG_LEVEL", "INFO")
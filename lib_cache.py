@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+from config import Config
+
+class CacheService:
+    """SQLite 기반 영구 캐시 서비스 (TTL 및 용량 기반 정리)"""
+
+    # 용량 검사 주기 (쓰기 횟수 기준)
+    EVICT_INTERVAL = 200
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self.evict()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "CacheService":
+        """설정값으로 캐시 생성"""
+        return cls(
+            os.path.join(config.cache_dir, "cache.sqlite3"),
+            ttl_seconds=config.cache_ttl_days * 86400,
+            max_bytes=config.cache_max_mb * 1024 * 1024
+        )
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """키 구성요소들로 고정 길이 해시 키 생성"""
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """캐시 조회 (없거나 만료되었으면 None)"""
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl_seconds:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                    )
+                    return None
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            self.logger.warning(f"캐시 조회 실패: {e}")
+            return None
+
+    def set(self, namespace: str, key: str, value: Any):
+        """캐시 저장"""
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (namespace, key, data, len(data.encode("utf-8")), now, now)
+                )
+                self._writes += 1
+                should_evict = self._writes % self.EVICT_INTERVAL == 0
+            if should_evict:
+                self.evict()
+        except sqlite3.Error as e:
+            self.logger.warning(f"캐시 저장 실패: {e}")
+
+    def evict(self):
+        """만료 항목 삭제 후 용량 초과분을 오래 사용하지 않은 순으로 삭제"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total <= self.max_bytes:
+                    return
+
+                # 최대 용량의 90%까지 줄여 정리가 너무 자주 일어나지 않게 함
+                target = int(self.max_bytes * 0.9)
+                cutoff = None
+                for size, accessed_at in self._conn.execute(
+                    "SELECT size, accessed_at FROM entries ORDER BY accessed_at"
+                ):
+                    total -= size
+                    cutoff = accessed_at
+                    if total <= target:
+                        break
+                if cutoff is not None:
+                    self._conn.execute("DELETE FROM entries WHERE accessed_at <= ?", (cutoff,))
+                    self.logger.info(f"캐시 용량 정리 완료: {self.path}")
+        except sqlite3.Error as e:
+            self.logger.warning(f"캐시 정리 실패: {e}")
+
+    def close(self):
+        """캐시 연결 종료"""
+        with self._lock:
+            self._conn.close()
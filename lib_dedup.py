@@ -0,0 +1,118 @@
+import re
+import zlib
+import logging
+import unicodedata
+from typing import List, Set, Dict
+from config import Config
+
+class DedupService:
+    """한국어 문자 n-gram MinHash/LSH 기반 중복 기사 탐지 서비스"""
+
+    # 빈 버킷 표시값 (32비트 해시 최대값보다 큼)
+    _EMPTY = 1 << 32
+
+    def __init__(self, ngram: int = 3, num_perm: int = 64, bands: int = 16,
+                 threshold: float = 0.5, text_length: int = 500):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.text_length = text_length
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "DedupService":
+        """설정값으로 중복 탐지 서비스 생성"""
+        return cls(
+            ngram=config.dedup_ngram,
+            num_perm=config.dedup_num_perm,
+            bands=config.dedup_bands,
+            threshold=config.dedup_threshold,
+            text_length=config.dedup_text_length
+        )
+
+    def _normalize(self, text: str) -> str:
+        """비교용 텍스트 정규화 (태그, 공백, 문장부호 제거)"""
+        text = unicodedata.normalize("NFKC", text or "")
+        text = re.sub(r"<[^>]+>", "", text)
+        text = re.sub(r"[\W_]+", "", text.lower())
+        return text[:self.text_length]
+
+    def _shingles(self, text: str) -> Set[str]:
+        """문자 n-gram 집합 생성"""
+        text = self._normalize(text)
+        if len(text) <= self.ngram:
+            return {text} if text else set()
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        """단일 해시 MinHash(One Permutation Hashing) 서명 생성"""
+        signature = [self._EMPTY] * self.num_perm
+        for shingle in shingles:
+            h = zlib.crc32(shingle.encode("utf-8"))
+            bucket, value = h % self.num_perm, h // self.num_perm
+            if value < signature[bucket]:
+                signature[bucket] = value
+        return signature
+
+    @staticmethod
+    def _jaccard(a: Set[str], b: Set[str]) -> float:
+        """두 n-gram 집합의 자카드 유사도"""
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def _band_keys(self, shingles: Set[str]) -> List[tuple]:
+        """LSH 밴드별 버킷 키 목록"""
+        signature = self._signature(shingles)
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def new_index(self) -> "DedupIndex":
+        """기사를 하나씩 추가하며 중복을 판단하는 증분 색인 생성"""
+        return DedupIndex(self)
+
+    def unique_indices(self, texts: List[str]) -> List[int]:
+        """중복을 제거하고 남길 인덱스 목록 반환 (입력 순서 유지, 먼저 나온 기사를 남김)"""
+        index = self.new_index()
+        kept = [i for i, text in enumerate(texts) if index.add(text)]
+        if len(kept) < len(texts):
+            self.logger.info(f"{len(texts)}개 중 중복 {len(texts) - len(kept)}개 제거")
+        return kept
+
+
+class DedupIndex:
+    """중복 탐지 증분 색인 (앞서 남긴 기사들과만 비교)"""
+
+    def __init__(self, service: DedupService):
+        self.service = service
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._kept: List[Set[str]] = []
+
+    def add(self, text: str) -> bool:
+        """텍스트를 추가하고, 앞서 남긴 기사와 중복이 아니면 True 반환"""
+        shingles = self.service._shingles(text)
+        if not shingles:
+            return True
+
+        # LSH 밴드 버킷이 겹치는 후보만 실제 자카드 유사도로 확인
+        keys = self.service._band_keys(shingles)
+        checked = set()
+        for key in keys:
+            for j in self._buckets.get(key, ()):
+                if j in checked:
+                    continue
+                checked.add(j)
+                if self.service._jaccard(shingles, self._kept[j]) >= self.service.threshold:
+                    return False
+
+        position = len(self._kept)
+        self._kept.append(shingles)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(position)
+        return True
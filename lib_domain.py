@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlparse
+from typing import Any, Dict, Iterable, List, Optional
+from config import Config
+
+def host_of(url: str) -> str:
+    """URL의 호스트 (소문자, 포트 제외)"""
+    return (urlparse(url or "").hostname or "").lower()
+
+class HostIndex:
+    """호스트 이름과 그 하위 도메인을 한 번에 찾는 색인
+
+    'example.com'을 등록하면 'example.com', 'www.example.com'이 모두 일치하며,
+    조회 비용은 등록 개수가 아니라 호스트의 라벨 수에 비례합니다.
+    """
+
+    def __init__(self, hosts: Iterable[str] = ()):
+        self._hosts = frozenset(host.strip().lower().strip(".") for host in hosts if host and host.strip())
+
+    def match(self, host: str) -> Optional[str]:
+        """일치하는 등록 호스트 (없으면 None)"""
+        labels = host.lower().split(".")
+        for i in range(len(labels)):
+            suffix = ".".join(labels[i:])
+            if suffix in self._hosts:
+                return suffix
+        return None
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+class DomainStat:
+    """한 도메인의 본문 추출 통계 (최근 응답 시간은 window개만 보관)"""
+
+    def __init__(self, host: str, attempts: int = 0, failures: int = 0, empties: int = 0,
+                 total_chars: int = 0, streak: int = 0, open_until: float = 0.0,
+                 latencies: Optional[List[float]] = None):
+        self.host = host
+        self.attempts = attempts
+        self.failures = failures
+        self.empties = empties
+        self.total_chars = total_chars
+        self.streak = streak            # 연속 실패(오류 또는 빈 본문) 횟수
+        self.open_until = open_until    # 차단 해제 시각
+        self.latencies = latencies or []
+
+    @property
+    def successes(self) -> int:
+        return self.attempts - self.failures - self.empties
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.attempts if self.attempts else 0.0
+
+    @property
+    def empty_rate(self) -> float:
+        return self.empties / self.attempts if self.attempts else 0.0
+
+    @property
+    def avg_chars(self) -> float:
+        return self.total_chars / self.successes if self.successes > 0 else 0.0
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def is_open(self, now: Optional[float] = None) -> bool:
+        return self.open_until > (time.time() if now is None else now)
+
+
+class DomainHealth:
+    """도메인별 본문 추출 결과를 저장하고 차단(circuit breaker), 도메인별 제한 시간, 처리 순서를 정하는 서비스
+
+    연속 failure_threshold번 실패하거나 빈 본문을 돌려준 도메인은 cooldown_seconds 동안 건너뜁니다.
+    차단이 풀린 뒤 첫 시도가 다시 실패하면 바로 다시 차단합니다.
+    """
+
+    MIN_SAMPLES = 5   # 응답 시간으로 제한 시간을 정하기 위한 최소 표본 수
+
+    def __init__(self, path: str, skip_domains: Iterable[str] = (), default_timeout: float = 10.0,
+                 min_timeout: float = 3.0, timeout_factor: float = 3.0, failure_threshold: int = 3,
+                 cooldown_seconds: float = 3600.0, window: int = 50):
+        self.path = path
+        self.skip_index = HostIndex(skip_domains)
+        self.default_timeout = default_timeout
+        self.min_timeout = min(min_timeout, default_timeout)
+        self.timeout_factor = timeout_factor
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.window = max(1, window)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS domains (
+                host TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                failures INTEGER NOT NULL,
+                empties INTEGER NOT NULL,
+                total_chars INTEGER NOT NULL,
+                streak INTEGER NOT NULL,
+                open_until REAL NOT NULL,
+                latencies TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._stats: Dict[str, DomainStat] = {}
+        for row in self._conn.execute(
+            "SELECT host, attempts, failures, empties, total_chars, streak, open_until, latencies FROM domains"
+        ):
+            self._stats[row[0]] = DomainStat(*row[:7], latencies=json.loads(row[7]))
+
+    @classmethod
+    def from_config(cls, config: Config) -> "DomainHealth":
+        """설정값으로 도메인 통계 서비스 생성"""
+        return cls(
+            config.domain_stats_file,
+            skip_domains=config.skip_domains,
+            default_timeout=config.extract_timeout,
+            min_timeout=config.domain_min_timeout,
+            timeout_factor=config.domain_timeout_factor,
+            failure_threshold=config.domain_failure_threshold,
+            cooldown_seconds=config.domain_cooldown_minutes * 60,
+            window=config.domain_window
+        )
+
+    def is_skipped(self, url: str) -> bool:
+        """설정에서 제외한 도메인이거나 차단 중인 도메인인지 (메모리에서만 확인)"""
+        host = host_of(url)
+        if self.skip_index.match(host):
+            return True
+        with self._lock:
+            stat = self._stats.get(host)
+            return stat is not None and stat.is_open()
+
+    def _load(self, host: str) -> Optional[DomainStat]:
+        """저장소에서 도메인 통계를 다시 읽음 (다른 프로세스의 기록 포함)"""
+        row = self._conn.execute(
+            "SELECT host, attempts, failures, empties, total_chars, streak, open_until, latencies "
+            "FROM domains WHERE host = ?", (host,)
+        ).fetchone()
+        return DomainStat(*row[:7], latencies=json.loads(row[7])) if row else None
+
+    def record(self, url: str, latency: float, chars: int = 0, failed: bool = False):
+        """본문 추출 결과 기록 (실패나 빈 본문이 이어지면 도메인 차단)
+
+        여러 작업자 프로세스가 같은 저장소를 쓰므로 쓰기 잠금을 잡은 뒤 최신 통계를 다시 읽어 갱신하고,
+        다른 프로세스가 건 차단도 함께 읽어 is_skipped가 저장소를 조회하지 않고 판단하게 합니다.
+        차단 중에 끝난 이전 요청의 성공은 차단을 풀지 않습니다.
+        """
+        host = host_of(url)
+        if not host:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stat = self._load(host) or DomainStat(host)
+                stat.attempts += 1
+                stat.latencies = (stat.latencies + [round(latency, 3)])[-self.window:]
+                if failed:
+                    stat.failures += 1
+                elif chars <= 0:
+                    stat.empties += 1
+                else:
+                    stat.total_chars += chars
+                if failed or chars <= 0:
+                    stat.streak += 1
+                    if stat.streak >= self.failure_threshold and not stat.is_open(now):
+                        stat.open_until = now + self.cooldown_seconds
+                        self.logger.warning(f"도메인 차단: {host} (연속 {stat.streak}회 실패, "
+                                            f"{self.cooldown_seconds / 60:.0f}분)")
+                elif not stat.is_open(now):
+                    stat.streak = 0
+                    stat.open_until = 0.0
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO domains VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (host, stat.attempts, stat.failures, stat.empties, stat.total_chars, stat.streak,
+                     stat.open_until, json.dumps(stat.latencies), now)
+                )
+                blocked = self._conn.execute(
+                    "SELECT host, attempts, failures, empties, total_chars, streak, open_until, latencies "
+                    "FROM domains WHERE open_until > ? AND host != ?", (now, host)
+                ).fetchall()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._stats[host] = stat
+            for row in blocked:
+                self._stats[row[0]] = DomainStat(*row[:7], latencies=json.loads(row[7]))
+
+    def timeout_for(self, url: str) -> float:
+        """도메인의 최근 p95 응답 시간에 맞춘 다운로드 제한 시간 (표본이 적으면 기본값)"""
+        with self._lock:
+            stat = self._stats.get(host_of(url))
+            if stat is None or len(stat.latencies) < self.MIN_SAMPLES:
+                return self.default_timeout
+            p95 = stat.percentile(95)
+        return max(self.min_timeout, min(self.default_timeout, p95 * self.timeout_factor))
+
+    def _expected_cost(self, host: str) -> float:
+        """본문 하나를 얻는 데 드는 예상 시간 (p50 응답 시간 / 성공률, 처음 보는 도메인은 기본 제한 시간의 절반)"""
+        stat = self._stats.get(host)
+        if stat is None or not stat.latencies:
+            return self.default_timeout / 2
+        if stat.is_open():
+            return float("inf")
+        success_rate = stat.successes / stat.attempts if stat.attempts else 1.0
+        return stat.percentile(50) / max(success_rate, 0.1)
+
+    def order(self, urls: List[str]) -> List[str]:
+        """도메인을 예상 비용 순으로 정렬한 뒤 도메인마다 한 개씩 번갈아 꺼낸 처리 순서
+
+        빠른 도메인의 URL이 앞에 오되 한 도메인에 몰리지 않아 도메인별 동시 요청 제한에 덜 막힙니다.
+        같은 도메인 안에서는 원래 순서를 유지합니다.
+        """
+        by_host: Dict[str, List[str]] = {}
+        for url in urls:
+            by_host.setdefault(host_of(url), []).append(url)
+        with self._lock:
+            costs = {host: self._expected_cost(host) for host in by_host}
+        queues = [by_host[host] for host in sorted(by_host, key=lambda host: costs[host])]
+        ordered = []
+        for i in range(max((len(queue) for queue in queues), default=0)):
+            ordered.extend(queue[i] for queue in queues if i < len(queue))
+        return ordered
+
+    def reset(self, host: Optional[str] = None):
+        """도메인 통계 삭제 (host가 없으면 전체)"""
+        with self._lock:
+            if host is None:
+                self._stats.clear()
+                self._conn.execute("DELETE FROM domains")
+            else:
+                self._stats.pop(host.lower(), None)
+                self._conn.execute("DELETE FROM domains WHERE host = ?", (host.lower(),))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """도메인별 통계 목록 (CLI 출력용)"""
+        now = time.time()
+        with self._lock:
+            stats = list(self._stats.values())
+        rows = []
+        for stat in stats:
+            rows.append({
+                "host": stat.host,
+                "attempts": stat.attempts,
+                "failure_rate": stat.failure_rate,
+                "empty_rate": stat.empty_rate,
+                "p50": stat.percentile(50),
+                "p95": stat.percentile(95),
+                "avg_chars": stat.avg_chars,
+                "timeout": self.timeout_for(f"http://{stat.host}/"),
+                "open_for": max(0.0, stat.open_until - now),
+            })
+        return rows
+
+    def close(self):
+        """통계 저장소 연결 종료"""
+        with self._lock:
+            self._conn.close()
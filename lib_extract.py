@@ -0,0 +1,237 @@
+import re
+import time
+import codecs
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+# 주요 언론사별 본문 위치 (호스트 접미사 -> XPath 목록, 앞에서부터 시도)
+SITE_RULES: Dict[str, List[str]] = {
+    "news.naver.com": ["//*[@id='dic_area']", "//*[@id='newsct_article']", "//*[@id='articleBodyContents']"],
+    "chosun.com": ["//section[contains(@class, 'article-body')]", "//*[@id='news_body_id']"],
+    "joongang.co.kr": ["//*[@id='article_body']"],
+    "donga.com": ["//*[contains(@class, 'news_view')]", "//*[@id='article_txt']"],
+    "hani.co.kr": ["//*[contains(@class, 'article-text')]", "//*[@class='text']"],
+    "khan.co.kr": ["//*[@id='articleBody']", "//*[contains(@class, 'art_body')]"],
+    "kmib.co.kr": ["//*[@id='articleBody']"],
+    "hankookilbo.com": ["//*[contains(@class, 'article-story')]"],
+    "seoul.co.kr": ["//*[contains(@class, 'viewContent')]", "//*[@id='atic_txt1']"],
+    "segye.com": ["//*[@id='article_txt']"],
+    "munhwa.com": ["//*[@id='News_content']"],
+    "yna.co.kr": ["//*[contains(@class, 'story-news')]"],
+    "newsis.com": ["//*[contains(@class, 'viewer')]//article", "//*[@id='textBody']"],
+    "news1.kr": ["//*[@id='articles_detail']", "//*[@id='articleBodyContent']"],
+    "mk.co.kr": ["//*[contains(@class, 'news_cnt_detail_wrap')]", "//*[@id='article_body']"],
+    "hankyung.com": ["//*[@id='articletxt']"],
+    "mt.co.kr": ["//*[@id='textBody']"],
+    "edaily.co.kr": ["//*[contains(@class, 'news_body')]"],
+    "sedaily.com": ["//*[contains(@class, 'article_view')]"],
+    "fnnews.com": ["//*[@id='article_content']"],
+    "heraldcorp.com": ["//*[contains(@class, 'article_view')]", "//*[@id='articleText']"],
+    "asiae.co.kr": ["//*[contains(@class, 'article')]//*[@id='txt_area']", "//*[@id='txt_area']"],
+    "ytn.co.kr": ["//*[contains(@class, 'paragraph')]", "//*[@id='CmAdContent']"],
+    "kbs.co.kr": ["//*[@id='cont_newstext']"],
+    "imbc.com": ["//*[contains(@class, 'news_txt')]"],
+    "sbs.co.kr": ["//*[contains(@class, 'text_area')]"],
+}
+
+# 규칙이 없는 사이트에 공통으로 시도할 본문 위치 (많이 쓰이는 국내 기사 CMS 포함)
+GENERIC_RULES: List[str] = [
+    "//*[@itemprop='articleBody']",
+    "//*[@id='article-view-content-div']",
+    "//*[@id='articleBody']",
+    "//*[@id='article_body']",
+    "//*[@id='articleText']",
+    "//*[@id='newsEndContents']",
+    "//article",
+]
+
+# 본문 추출 전에 제거할 태그
+NOISE_TAGS = ("script", "style", "noscript", "iframe", "form", "button", "figcaption",
+              "aside", "nav", "header", "footer")
+
+# 줄바꿈으로 구분할 블록 태그
+BLOCK_TAGS = ("p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "section", "article", "blockquote")
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w-]+)', re.I)
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w-]+)', re.I)
+_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# EUC-KR 계열 표기는 확장 문자까지 읽을 수 있는 cp949로 통일
+_CHARSET_ALIASES = {"euc-kr": "cp949", "euc_kr": "cp949", "ks_c_5601-1987": "cp949",
+                    "ksc5601": "cp949", "x-windows-949": "cp949", "windows-949": "cp949"}
+
+class ExtractTimeout(Exception):
+    """본문 추출이 파싱 시간 상한(parse_budget)을 넘음"""
+
+
+def _normalize_charset(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = _CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def decode_html(raw: bytes, content_type: str = "") -> str:
+    """BOM, UTF-8, HTTP 헤더, <meta charset>, CP949 순으로 오류 없이 디코딩되는 문자셋 사용
+
+    UTF-8은 다른 한국어 인코딩 바이트를 오류 없이 읽는 경우가 거의 없으므로, 선언이 잘못된 사이트도 먼저 UTF-8로 확인합니다.
+    """
+    candidates: List[Optional[str]] = []
+    if raw.startswith(codecs.BOM_UTF8):
+        candidates.append("utf-8-sig")
+    candidates.append("utf-8")
+
+    header = _HEADER_CHARSET.search(content_type or "")
+    header_charset = _normalize_charset(header.group(1)) if header else None
+    # 헤더 없이 기본값으로 붙는 latin-1은 신뢰하지 않음
+    if header_charset and header_charset not in ("latin-1", "iso8859-1", "cp1252"):
+        candidates.append(header_charset)
+
+    meta = _META_CHARSET.search(raw[:4096])
+    if meta:
+        candidates.append(_normalize_charset(meta.group(1).decode("ascii", "ignore")))
+
+    candidates.append("cp949")
+    for charset in dict.fromkeys(c for c in candidates if c):
+        try:
+            return raw.decode(charset)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+class ArticleExtractor:
+    """원문을 한 번만 받아 문자셋을 판별하고 lxml로 본문을 뽑는 경량 추출기
+
+    사이트별 규칙(SITE_RULES) → 공통 규칙(GENERIC_RULES) → 문단 밀도 휴리스틱 순으로 본문 위치를 찾습니다.
+    기사 하나당 다운로드 크기(max_bytes)와 시간(time_budget), 파싱 시간(parse_budget)에 상한을 둡니다.
+    """
+
+    USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+    def __init__(self, timeout: float = 10.0, max_bytes: int = 3 * 1024 * 1024, time_budget: float = 15.0,
+                 pool_size: int = 8, rules: Optional[Dict[str, List[str]]] = None, parse_budget: float = 3.0):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.time_budget = time_budget
+        self.parse_budget = parse_budget
+        self.rules = dict(SITE_RULES if rules is None else rules)
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = self.USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ArticleExtractor":
+        """설정값으로 추출기 생성"""
+        return cls(
+            timeout=config.extract_timeout,
+            max_bytes=config.extract_max_kb * 1024,
+            time_budget=config.extract_time_budget,
+            pool_size=max(1, config.fetch_workers),
+            parse_budget=config.extract_parse_budget
+        )
+
+    def register_rule(self, host: str, xpath: str):
+        """사이트 본문 규칙 추가 (기존 규칙보다 먼저 시도)"""
+        self.rules[host] = [xpath] + self.rules.get(host, [])
+
+    def fetch(self, url: str, timeout: Optional[float] = None) -> Tuple[bytes, str]:
+        """원문 바이트와 Content-Type을 받아옴 (크기/시간 상한 초과 시 그때까지 받은 내용만 사용)"""
+        deadline = time.monotonic() + self.time_budget
+        chunks: List[bytes] = []
+        size = 0
+        with self.session.get(url, timeout=timeout or self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes or time.monotonic() > deadline:
+                    self.logger.info(f"본문 다운로드 상한 도달 ({url}): {size} bytes")
+                    break
+            return b"".join(chunks)[:self.max_bytes], response.headers.get("Content-Type", "")
+
+    def _rules_for(self, url: str) -> List[str]:
+        host = (urlparse(url).hostname or "").lower()
+        matched: List[str] = []
+        for suffix, xpaths in self.rules.items():
+            if host == suffix or host.endswith("." + suffix):
+                matched.extend(xpaths)
+        return matched + GENERIC_RULES
+
+    def extract(self, html: str, url: str = "") -> str:
+        """HTML에서 본문 텍스트 추출 (문단은 줄바꿈으로 구분, 찾지 못하면 빈 문자열)
+        
+        파싱 뒤 각 단계(잡음 제거, 규칙별 XPath, 휴리스틱) 전에 parse_budget을 넘었는지 확인하고,
+        넘었으면 ExtractTimeout을 발생시킵니다.
+        """
+        import lxml.html
+        from lxml import etree
+
+        deadline = time.monotonic() + self.parse_budget
+
+        def check_budget(stage: str):
+            if time.monotonic() > deadline:
+                raise ExtractTimeout(f"파싱 시간 상한 {self.parse_budget:g}초 초과 ({stage})")
+
+        html = _XML_DECLARATION.sub("", html, count=1)
+        if not html.strip():
+            return ""
+        try:
+            tree = lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return ""
+
+        check_budget("parse")
+        for element in list(tree.iter(*NOISE_TAGS)):
+            element.drop_tree()
+
+        body = None
+        for xpath in self._rules_for(url):
+            check_budget(xpath)
+            found = [element for element in tree.xpath(xpath) if element.text_content().strip()]
+            if found:
+                body = max(found, key=lambda element: len(element.text_content()))
+                break
+        if body is None:
+            check_budget("heuristic")
+            body = self._densest_block(tree)
+        return self._element_text(body) if body is not None else ""
+
+    @staticmethod
+    def _densest_block(tree):
+        """문단(<p>, <br> 뒤 텍스트)이 가장 많이 모인 요소"""
+        scores: Dict[object, int] = {}
+        for node in tree.iter("p", "br"):
+            parent = node.getparent()
+            if parent is None:
+                continue
+            text = node.text_content() if node.tag == "p" else (node.tail or "")
+            length = len(text.strip())
+            if length >= 20:
+                scores[parent] = scores.get(parent, 0) + length
+        return max(scores, key=scores.get) if scores else None
+
+    @staticmethod
+    def _element_text(element) -> str:
+        """요소 텍스트를 문단 단위 줄로 정리"""
+        for br in element.iter("br"):
+            br.tail = "\n" + (br.tail or "")
+        for block in element.iter(*BLOCK_TAGS):
+            block.tail = "\n" + (block.tail or "")
+        lines = (" ".join(line.split()) for line in element.text_content().splitlines())
+        return "\n".join(line for line in lines if line)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from config import Config
+
+# 네이버 API pubDate 형식
+PUB_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
+
+def parse_pub_date(value: str) -> Optional[datetime]:
+    """네이버 pubDate 문자열을 시간대 없는 datetime으로 변환 (실패 시 None)"""
+    try:
+        return datetime.strptime(value, PUB_DATE_FORMAT).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+class ArticleIndex:
+    """검색어별 처리한 기사 목록과 마지막 수집 시점(high-water mark)을 저장하는 색인"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                query TEXT NOT NULL,
+                link TEXT NOT NULL,
+                pub_date TEXT,
+                seen_at REAL NOT NULL,
+                record TEXT,
+                done INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (query, link)
+            )
+        """)
+        # 이전 형식 색인: 처리 완료 표시 열 추가 (기존 행은 처리 완료로 간주)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(seen)")}
+        if "done" not in columns:
+            self._conn.execute("ALTER TABLE seen ADD COLUMN done INTEGER NOT NULL DEFAULT 1")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS marks (
+                query TEXT PRIMARY KEY,
+                high_water TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ArticleIndex":
+        """설정값으로 색인 생성"""
+        return cls(config.index_file)
+
+    def get_high_water(self, query: str) -> Optional[datetime]:
+        """검색어의 마지막 수집 기사 발행 시각"""
+        with self._lock:
+            row = self._conn.execute("SELECT high_water FROM marks WHERE query = ?", (query,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def seen_links(self, query: str) -> Set[str]:
+        """검색어로 이미 처리한 기사 링크 집합 (link, originallink 모두 포함)
+
+        끝까지 마친 실행에서 mark_seen으로 기록한 링크만 포함합니다. 중단된 실행에서 save_record로 저장만 한
+        기사는 제외하여, 다음 실행이 그 기사에서 페이지 넘김을 멈추지 않고 뒤쪽의 처리하지 못한 기사까지 수집합니다.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT link FROM seen WHERE query = ? AND done = 1", (query,)).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_seen(self, query: str, items: List[Dict[str, Any]]):
+        """수집한 기사들을 처리 완료로 기록하고 high-water mark 갱신"""
+        now = time.time()
+        latest = self.get_high_water(query)
+        rows = []
+        for item in items:
+            pub_date = parse_pub_date(item.get('pubDate'))
+            if pub_date and (latest is None or pub_date > latest):
+                latest = pub_date
+            iso = pub_date.isoformat() if pub_date else None
+            for link in {item.get('link'), item.get('originallink')}:
+                if link:
+                    rows.append((query, link, iso, now))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO seen (query, link, pub_date, seen_at, done) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (query, link) DO UPDATE SET done = 1", rows
+            )
+            if latest:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO marks VALUES (?, ?, ?)", (query, latest.isoformat(), now)
+                )
+            self._conn.execute("COMMIT")
+
+    def save_record(self, query: str, record: Dict[str, Any]):
+        """보고서에 들어간 기사 레코드 저장 (본문 제외, 처리 완료 표시는 mark_seen에서)"""
+        data = {key: value for key, value in record.items() if key != 'body'}
+        pub_date = parse_pub_date(record.get('pubDate'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO seen (query, link, pub_date, seen_at, record, done) VALUES (?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT (query, link) DO UPDATE SET record = excluded.record",
+                (query, record['link'], pub_date.isoformat() if pub_date else None, time.time(),
+                 json.dumps(data, ensure_ascii=False))
+            )
+
+    def load_records(self, query: str, since: datetime) -> List[Dict[str, Any]]:
+        """수집 기간 안에 저장된 기사 레코드를 최신순으로 반환"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM seen WHERE query = ? AND record IS NOT NULL AND pub_date >= ? "
+                "ORDER BY pub_date DESC",
+                (query, since.isoformat())
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune(self, before: datetime):
+        """기준 시각보다 오래된 기사 기록 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE pub_date < ?", (before.isoformat(),))
+
+    def close(self):
+        """색인 연결 종료"""
+        with self._lock:
+            self._conn.close()
@@ -1,44 +1,319 @@
-import ollama
+import re
+import json
+import math
+import random
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import threading
+import httpx
+import ollama
+from typing import Optional, Dict, Any, List
+from lib_cache import CacheService
+from lib_metrics import metrics
 
 class LLMService:
     """범용 LLM 서비스 클래스"""
     
-    def __init__(self, model: str = 'llama3.1:8b'):
+    # 일괄 평가 응답의 "번호: 점수" 줄 패턴
+    _BATCH_LINE_PATTERN = re.compile(r'^\s*(\d+)\s*[:.)\-]\s*(\d+)')
+    
+    # 연관성 프롬프트 버전 (프롬프트를 바꾸면 올려서 이전 캐시 점수를 쓰지 않게 함)
+    RELEVANCE_PROMPT_VERSION = "2"
+    
+    # JSON 모드 응답 형식 (Ollama structured output)
+    _SCORE_SCHEMA = {
+        "type": "object",
+        "properties": {"score": {"type": "integer", "minimum": 0, "maximum": 100}},
+        "required": ["score"],
+    }
+    _SCORES_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "scores": {"type": "array", "items": {"type": "integer", "minimum": 0, "maximum": 100}},
+        },
+        "required": ["scores"],
+    }
+    
+    def __init__(self, model: str = 'llama3.1:8b', batch_size: int = 20, cache: Optional[CacheService] = None,
+                 max_in_flight: int = 4, timeout: float = 120.0, max_retries: int = 3, backoff: float = 1.0,
+                 scoring_format: str = "json", num_predict: int = 8, keep_alive: Optional[str] = None):
         self.model = model
+        self.batch_size = max(1, batch_size)
+        self.cache = cache
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # 연관성 평가 응답 형식 (json: 형식 제한 출력, text: 자유 응답 파싱)과 제목당 생성 토큰 한도
+        self.scoring_format = scoring_format
+        self.num_predict = max(1, num_predict)
+        # 요청 사이에 모델을 메모리에 유지할 시간 (예: "30m", 빈 값이면 서버 기본값)
+        self.keep_alive = keep_alive or None
         self.logger = logging.getLogger(__name__)
+        
+        # 요청은 전용 스레드의 이벤트 루프에서 하나의 AsyncClient로 보냄 (연결 재사용)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop_lock = threading.Lock()
     
-    def _send_request(self, prompt: str) -> str:
-        """LLM에 요청을 보내고 응답을 받는 공통 메서드"""
-        try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[{
-                    'role': 'user',
-                    'content': prompt,
-                }],
-            )
-            return response['message']['content']
-        except Exception as e:
-            self.logger.error(f"LLM 요청 실패: {e}")
-            return ""
-    
-    def assess_relevance(self, keyword: str, sentence: str) -> int:
-        """키워드와 문장 간의 연관성을 0-100으로 평가"""
-        prompt = f"""'{keyword}'와 다음 문장 '{sentence}' 간의 연관성을 숫자로 표현하세요.
+    @classmethod
+    def from_config(cls, config, cache: Optional[CacheService] = None) -> "LLMService":
+        """설정값으로 LLM 서비스 생성"""
+        return cls(
+            config.llm_model,
+            config.relevance_batch_size,
+            cache,
+            max_in_flight=config.llm_max_in_flight,
+            timeout=config.llm_timeout,
+            max_retries=config.llm_max_retries,
+            backoff=config.llm_backoff,
+            scoring_format=config.relevance_format,
+            num_predict=config.relevance_num_predict,
+            keep_alive=config.llm_keep_alive
+        )
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """요청용 이벤트 루프 스레드를 필요할 때 시작"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._open_client(), loop).result()
+                self._loop = loop
+            return self._loop
+    
+    async def _open_client(self):
+        # 세마포어와 클라이언트는 이벤트 루프 안에서 생성
+        # 연결 풀(transport)은 직접 만들어 넘기고 close()에서 공개 API로 닫음
+        self._transport = httpx.AsyncHTTPTransport()
+        self._client = ollama.AsyncClient(timeout=self.timeout, transport=self._transport)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """재시도할 오류인지 판단 (요청 자체가 잘못된 4xx는 제외, 429는 재시도)"""
+        status = getattr(error, 'status_code', None)
+        if isinstance(error, ollama.ResponseError) and status and 400 <= status < 500:
+            return status == 429
+        return True
+    
+    async def _chat(self, prompt: str, format: Optional[Any] = None,
+                    options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """동시 요청 수 제한, 요청별 제한 시간, 지수 백오프 재시도를 적용한 요청 (실패 시 None)"""
+        kwargs: Dict[str, Any] = {}
+        if format is not None:
+            kwargs['format'] = format
+        if options:
+            kwargs['options'] = options
+        if self.keep_alive:
+            kwargs['keep_alive'] = self.keep_alive
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    with metrics.timer("llm.request"):
+                        response = await asyncio.wait_for(
+                            self._client.chat(
+                                model=self.model,
+                                messages=[{
+                                    'role': 'user',
+                                    'content': prompt,
+                                }],
+                                **kwargs
+                            ),
+                            self.timeout
+                        )
+                # Ollama가 알려주는 생성 토큰 수/시간(ns)으로 처리량 기록
+                if response.get('eval_count') and response.get('eval_duration'):
+                    metrics.record_tokens("llm", response['eval_count'], response['eval_duration'] / 1e9)
+                return response['message']['content']
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    metrics.count("llm.failed")
+                    self.logger.error(f"LLM 요청 실패: {e!r}")
+                    return None
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                metrics.count("llm.retries")
+                self.logger.warning(f"LLM 요청 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {e!r}")
+                await asyncio.sleep(delay)
+        return None
+    
+    def _send_requests(self, prompts: List[str], format: Optional[Any] = None,
+                       options: Optional[Dict[str, Any]] = None) -> List[Optional[str]]:
+        """여러 프롬프트를 동시에 보내고 입력 순서대로 응답 반환 (실패한 요청은 None)"""
+        if not prompts:
+            return []
+        
+        async def gather():
+            return await asyncio.gather(*(self._chat(prompt, format, options) for prompt in prompts))
+        
+        return asyncio.run_coroutine_threadsafe(gather(), self._get_loop()).result()
+    
+    def _send_request(self, prompt: str) -> Optional[str]:
+        """LLM에 요청을 보내고 응답을 받는 공통 메서드 (실패 시 None)"""
+        return self._send_requests([prompt])[0]
+    
+    def close(self):
+        """클라이언트 연결과 이벤트 루프 종료"""
+        with self._loop_lock:
+            if self._loop is None:
+                return
+            if self._transport is not None:
+                asyncio.run_coroutine_threadsafe(self._transport.aclose(), self._loop).result()
+                self._transport = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+    
+    def assess_relevance(self, keyword: str, sentence: str) -> Optional[int]:
+        """키워드와 문장 간의 연관성을 0-100으로 평가 (요청/응답 해석 실패 시 None)"""
+        return self.assess_relevance_many(keyword, [sentence])[0]
+    
+    def _scoring_options(self, count: int) -> Dict[str, Any]:
+        """평가 요청용 생성 옵션 (결정적 출력, 제목 수에 비례한 생성 토큰 한도)"""
+        return {"temperature": 0, "num_predict": 16 + self.num_predict * count}
+    
+    def assess_relevance_many(self, keyword: str, sentences: List[str]) -> List[Optional[int]]:
+        """문장마다 개별 프롬프트를 동시에 보내 연관성 평가 (입력 순서대로, 실패 시 None)"""
+        scores: List[Optional[int]] = [self._get_cached_relevance(keyword, sentence) for sentence in sentences]
+        uncached = [i for i, score in enumerate(scores) if score is None]
+        
+        use_json = self.scoring_format == "json"
+        prompts = []
+        for i in uncached:
+            if use_json:
+                prompts.append(f"""'{keyword}'와 다음 문장 간의 연관성을 0에서 100 사이 정수로 평가해 {{"score": 점수}} 형식의 JSON으로만 답하세요.
+        연관성이 없으면 0, 많으면 100입니다.
+        문장: {sentences[i]}""")
+            else:
+                prompts.append(f"""'{keyword}'와 다음 문장 '{sentences[i]}' 간의 연관성을 숫자로 표현하세요.
         설명과정은 생략하고 결과만 0에서 100 사이의 **숫자 하나**만 출력하세요.
         만약 연관성이 없다면 0을 출력하고 연관성이 많다면 100을 출력해
         출력 예시: 75
-        예시로 보여준 **숫자 하나** 이외 추론과정이나 설명을 보이면 안돼"""
+        예시로 보여준 **숫자 하나** 이외 추론과정이나 설명을 보이면 안돼""")
         
-        response = self._send_request(prompt)
+        responses = self._send_requests(
+            prompts, self._SCORE_SCHEMA if use_json else None, self._scoring_options(1)
+        )
+        for i, response in zip(uncached, responses):
+            if response is None:
+                continue
+            score = self._parse_relevance(response)
+            if score is None:
+                metrics.count("relevance.parse_failed")
+                self.logger.warning(f"연관성 평가 실패 - 응답: {response}")
+                continue
+            scores[i] = score
+            self._set_cached_relevance(keyword, sentences[i], score)
+        return scores
+    
+    def _parse_relevance(self, response: str) -> Optional[int]:
+        """단일 평가 응답({"score": n} 또는 숫자 하나)을 0-100 점수로 변환 (실패 시 None)"""
         try:
-            content = int(response.strip())
-            return max(0, min(100, content))  # 0-100 범위로 제한
+            data = json.loads(response)
         except ValueError:
-            self.logger.warning(f"연관성 평가 실패 - 응답: {response}")
-            return 0
+            return None
+        if isinstance(data, dict):
+            data = data.get("score")
+        if not self._is_score(data):
+            return None
+        return max(0, min(100, int(data)))  # 0-100 범위로 제한
+    
+    @staticmethod
+    def _is_score(value: Any) -> bool:
+        """점수로 쓸 수 있는 유한한 숫자인지 (bool, NaN, Infinity 제외)"""
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    
+    def assess_relevance_batch(self, keyword: str, titles: List[str]) -> List[Optional[int]]:
+        """여러 제목의 연관성을 번호 목록 프롬프트로 평가 (묶음들은 동시에 요청, 입력 순서대로, 실패 시 None)"""
+        scores: List[Optional[int]] = [self._get_cached_relevance(keyword, title) for title in titles]
+        uncached = [i for i, score in enumerate(scores) if score is None]
+        
+        use_json = self.scoring_format == "json"
+        chunks = [uncached[start:start + self.batch_size] for start in range(0, len(uncached), self.batch_size)]
+        prompts = [self._relevance_chunk_prompt(keyword, [titles[i] for i in indices]) for indices in chunks]
+        responses = self._send_requests(
+            prompts, self._SCORES_SCHEMA if use_json else None, self._scoring_options(self.batch_size)
+        )
+        for indices, response in zip(chunks, responses):
+            for offset, score in self._parse_relevance_chunk(response or "", len(indices)).items():
+                scores[indices[offset]] = score
+                self._set_cached_relevance(keyword, titles[indices[offset]], score)
+        
+        # 파싱하지 못한 항목은 개별 평가로 대체
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            metrics.count("relevance.batch_fallbacks", len(missing))
+            self.logger.info(f"일괄 평가 누락 {len(missing)}건 - 개별 평가로 대체")
+            for i, score in zip(missing, self.assess_relevance_many(keyword, [titles[i] for i in missing])):
+                scores[i] = score
+        
+        return scores
+    
+    def _relevance_chunk_prompt(self, keyword: str, titles: List[str]) -> str:
+        """제목 묶음 하나를 평가하는 번호 목록 프롬프트"""
+        numbered = "\n".join(f"{i + 1}. {title}" for i, title in enumerate(titles))
+        if self.scoring_format == "json":
+            return f"""'{keyword}'와 아래 번호가 붙은 각 문장 간의 연관성을 0에서 100 사이 정수로 평가하세요.
+        {{"scores": [1번 점수, 2번 점수, ...]}} 형식의 JSON으로만 답하고, 점수는 번호 순서대로 {len(titles)}개여야 합니다.
+        연관성이 없으면 0, 많으면 100입니다.
+        
+        {numbered}"""
+        return f"""'{keyword}'와 아래 번호가 붙은 각 문장 간의 연관성을 0에서 100 사이의 숫자로 평가하세요.
+        설명과정은 생략하고 한 줄에 하나씩 "번호: 점수" 형식으로만 출력하세요.
+        만약 연관성이 없다면 0, 연관성이 많다면 100입니다.
+        출력 예시:
+        1: 75
+        2: 0
+        모든 번호에 대해 빠짐없이 출력하고, 그 외 추론과정이나 설명을 보이면 안돼.
+        
+        {numbered}"""
+    
+    def _parse_relevance_chunk(self, response: str, count: int) -> Dict[int, int]:
+        """일괄 평가 응답({"scores": [...]} 또는 "번호: 점수" 줄)을 {묶음 내 인덱스: 점수}로 변환"""
+        try:
+            data = json.loads(response)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("scores"), list):
+            # 개수가 맞지 않으면 어느 제목의 점수인지 알 수 없으므로 버리고 개별 평가로 대체
+            if len(data["scores"]) != count:
+                return {}
+            return {
+                index: max(0, min(100, int(score)))
+                for index, score in enumerate(data["scores"])
+                if self._is_score(score)
+            }
+        
+        parsed: Dict[int, int] = {}
+        for line in response.splitlines():
+            match = self._BATCH_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            index = int(match.group(1)) - 1
+            if 0 <= index < count and index not in parsed:
+                parsed[index] = max(0, min(100, int(match.group(2))))
+        return parsed
+    
+    def _get_cached_relevance(self, keyword: str, sentence: str) -> Optional[int]:
+        """캐시된 연관성 점수 조회"""
+        if not self.cache:
+            return None
+        cached = self.cache.get("relevance", self._relevance_key(keyword, sentence))
+        if cached is not None:
+            metrics.count("relevance.cache_hits")
+        return cached
+    
+    def _set_cached_relevance(self, keyword: str, sentence: str, score: int):
+        """연관성 점수 캐시 저장"""
+        if self.cache:
+            self.cache.set("relevance", self._relevance_key(keyword, sentence), score)
+    
+    def _relevance_key(self, keyword: str, sentence: str) -> str:
+        """연관성 캐시 키 (모델, 응답 형식, 프롬프트 버전, 응답 길이 제한별로 구분)"""
+        return CacheService.make_key(keyword, sentence, self.model, self.scoring_format,
+                                     self.RELEVANCE_PROMPT_VERSION, self.num_predict)
     
     def remove_duplicates(self, html_content: str) -> str:
         """HTML 뉴스 내용에서 중복 제거"""
@@ -56,14 +331,14 @@ class LLMService:
             return html_content
     
     def generate_text(self, prompt: str) -> str:
-        """범용 텍스트 생성 메서드"""
-        return self._send_request(prompt)
+        """범용 텍스트 생성 메서드 (실패 시 빈 문자열)"""
+        return self._send_request(prompt) or ""
 
 # 하위 호환성을 위한 함수들
 def assess_relevance(keyword: str, sentence: str) -> int:
-    """하위 호환성을 위한 래퍼 함수"""
+    """하위 호환성을 위한 래퍼 함수 (평가 실패 시 0)"""
     service = LLMService()
-    return service.assess_relevance(keyword, sentence)
+    return service.assess_relevance(keyword, sentence) or 0
 
 def remove_duplicate_new(news_html: str) -> str:
     """하위 호환성을 위한 래퍼 함수"""
@@ -0,0 +1,172 @@
+import re
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+class _Histogram:
+    """지연시간 분포 (누적 버킷 + 최근 샘플)"""
+
+    # 초 단위 버킷 경계
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+    MAX_SAMPLES = 10000
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.bucket_counts = [0] * len(self.BUCKETS)
+        self.samples = deque(maxlen=self.MAX_SAMPLES)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+        for i, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """파이프라인 단계별 지연시간, 건수, 모델 처리량(tokens/s) 수집기 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """수집한 값 초기화"""
+        with self._lock:
+            self._timings: Dict[str, _Histogram] = {}
+            self._counters: Dict[str, float] = {}
+            self._tokens: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """블록 실행 시간을 지연시간 분포에 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float):
+        """지연시간 한 건 기록"""
+        with self._lock:
+            self._timings.setdefault(name, _Histogram()).observe(seconds)
+
+    def count(self, name: str, value: float = 1):
+        """건수 증가"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_tokens(self, name: str, tokens: int, seconds: float):
+        """모델 생성 토큰 수와 소요 시간 기록"""
+        with self._lock:
+            totals = self._tokens.setdefault(name, [0, 0.0])
+            totals[0] += tokens
+            totals[1] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 값을 dict로 반환"""
+        with self._lock:
+            return {
+                "timings": {name: hist.summary() for name, hist in sorted(self._timings.items())},
+                "counters": dict(sorted(self._counters.items())),
+                "throughput": {
+                    name: {
+                        "tokens": tokens,
+                        "seconds": seconds,
+                        "tokens_per_second": tokens / seconds if seconds else 0.0,
+                    }
+                    for name, (tokens, seconds) in sorted(self._tokens.items())
+                },
+            }
+
+    def format_table(self) -> str:
+        """사람이 읽기 쉬운 요약 표 문자열"""
+        data = self.snapshot()
+        lines = [f"{'단계':<28}{'건수':>8}{'합계(s)':>10}{'평균(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'최대(ms)':>10}"]
+        for name, s in data["timings"].items():
+            lines.append(
+                f"{name:<28}{s['count']:>8}{s['total']:>10.2f}{s['mean'] * 1000:>10.1f}"
+                f"{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}{s['max'] * 1000:>10.1f}"
+            )
+        if data["counters"]:
+            lines.append("")
+            lines.append(f"{'카운터':<28}{'값':>8}")
+            for name, value in data["counters"].items():
+                lines.append(f"{name:<28}{value:>8g}")
+        if data["throughput"]:
+            lines.append("")
+            lines.append(f"{'모델':<28}{'토큰':>8}{'시간(s)':>10}{'tokens/s':>10}")
+            for name, t in data["throughput"].items():
+                lines.append(f"{name:<28}{t['tokens']:>8g}{t['seconds']:>10.2f}{t['tokens_per_second']:>10.1f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """JSON 문자열로 내보내기"""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _prom_name(name: str) -> str:
+        return "news_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 형식으로 내보내기"""
+        lines = []
+        with self._lock:
+            for name, hist in sorted(self._timings.items()):
+                metric = self._prom_name(name) + "_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(hist.BUCKETS, hist.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum {hist.total}")
+                lines.append(f"{metric}_count {hist.count}")
+            for name, value in sorted(self._counters.items()):
+                metric = self._prom_name(name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, (tokens, seconds) in sorted(self._tokens.items()):
+                metric = self._prom_name(name)
+                lines.append(f"# TYPE {metric}_tokens_total counter")
+                lines.append(f"{metric}_tokens_total {tokens}")
+                lines.append(f"# TYPE {metric}_token_seconds_total counter")
+                lines.append(f"{metric}_token_seconds_total {seconds}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename: str):
+        """확장자에 따라 JSON(.json) 또는 Prometheus 텍스트(.prom 등)로 파일 저장"""
+        content = self.to_json() if filename.endswith(".json") else self.to_prometheus()
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+# 파이프라인 전체에서 공유하는 수집기
+metrics = Metrics()
@@ -1,77 +1,295 @@
+import time
 import logging
+import threading
 import unicodedata
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from newspaper import Article
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import List, Dict, Any, Optional, Set, Deque, Tuple
 from config import Config
+from lib_cache import CacheService
+from lib_metrics import metrics
+from lib_extract import ArticleExtractor, decode_html
+from lib_domain import DomainHealth, host_of
 
 class NewsService:
     """뉴스 수집 및 처리 서비스"""
     
-    def __init__(self, config: Config):
+    MAX_DISPLAY = 100   # 네이버 API 페이지당 최대 개수
+    MAX_START = 1000    # 네이버 API start 최대값
+    
+    def __init__(self, config: Config, cache: Optional[CacheService] = None):
         self.config = config
+        self.cache = cache
         self.logger = logging.getLogger(__name__)
+        
+        # 본문 다운로드용 스레드 풀 (필요할 때 생성)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 호스트별 진행 중인 다운로드 수와 대기열 (풀 스레드가 호스트 제한에 묶여 놀지 않도록 제출 단계에서 제한)
+        self._host_active: Dict[str, int] = {}
+        self._host_pending: Dict[str, Deque[Tuple[str, Future]]] = {}
+        self._lock = threading.Lock()
+        
+        # 경량 본문 추출기 (ARTICLE_EXTRACTOR=lxml일 때 사용)
+        self.extractor = ArticleExtractor.from_config(config)
+        
+        # 도메인별 추출 통계 (차단, 제한 시간, 처리 순서)
+        self.domains = DomainHealth.from_config(config)
+        
+        # 네이버 API 연결 재사용용 세션
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, self.config.naver_concurrency))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
-    def fetch_news(self, query: str) -> List[Dict[str, Any]]:
-        """네이버 뉴스 API를 통해 뉴스 수집"""
-        api_url = "https://openapi.naver.com/v1/search/news.json"
-        headers = {
-            "X-Naver-Client-Id": self.config.naver_client_id,
-            "X-Naver-Client-Secret": self.config.naver_client_secret
-        }
-        params = {
-            "query": query,
-            "sort": "date",
-            "display": self.config.news_display_count
-        }
+    def fetch_news(self, query: str, since: Optional[datetime] = None,
+                   seen: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """네이버 뉴스 API를 통해 뉴스 수집
         
-        try:
-            resp = requests.get(api_url, headers=headers, params=params)
-            resp.raise_for_status()
-            items = resp.json().get("items", [])
+        최신순으로 페이지를 넘기며 수집하고, 수집 기간(from_date)보다 오래된 기사가 나오면 중단합니다.
+        since/seen이 주어지면 그 시각 이전 기사나 이미 처리한 링크에 닿는 즉시 중단합니다(증분 수집).
+        """
+        started = time.perf_counter()
+        seen = seen or set()
+        display = max(1, min(self.MAX_DISPLAY, self.config.news_display_count))
+        total = 0
+        filtered = []
+        start = 1
+        
+        while start <= self.MAX_START and len(filtered) < self.config.news_max_items:
+            try:
+                items = self._request_page(query, start, display).get("items", [])
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.logger.error(f"뉴스 수집 실패 ({query}, start={start}): {e}")
+                break
+            total += len(items)
             
             # 날짜 필터링
-            filtered = []
+            reached_old = False
             for item in items:
+                if item.get('link') in seen or item.get('originallink') in seen:
+                    reached_old = True
+                    continue
                 try:
                     pub_date = datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S %z').replace(tzinfo=None)
-                    if pub_date >= self.config.from_date:
+                    if pub_date >= self.config.from_date and (since is None or pub_date >= since):
                         filtered.append(item)
+                    else:
+                        reached_old = True
                 except ValueError as e:
                     self.logger.warning(f"날짜 파싱 실패: {item.get('pubDate')} - {e}")
                     continue
             
-            self.logger.info(f"총 {len(items)}개 중 {len(filtered)}개 뉴스 수집 완료")
-            return filtered
+            if reached_old or len(items) < display:
+                break
+            start += display
+        
+        filtered = filtered[:self.config.news_max_items]
+        metrics.observe("naver.fetch_news", time.perf_counter() - started)
+        metrics.count("naver.items_received", total)
+        metrics.count("naver.items_collected", len(filtered))
+        self.logger.info(f"총 {total}개 중 {len(filtered)}개 뉴스 수집 완료")
+        return filtered
+    
+    def fetch_news_many(self, queries: List[str], since: Optional[Dict[str, datetime]] = None,
+                        seen: Optional[Dict[str, Set[str]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """여러 검색어의 뉴스를 동시에 수집 (since/seen은 검색어별 증분 수집 기준)"""
+        since = since or {}
+        seen = seen or {}
+        with ThreadPoolExecutor(max_workers=max(1, self.config.naver_concurrency),
+                                thread_name_prefix="naver-fetch") as executor:
+            results = list(executor.map(
+                lambda query: self.fetch_news(query, since.get(query), seen.get(query)), queries
+            ))
+        return dict(zip(queries, results))
+    
+    def _request_page(self, query: str, start: int, display: int) -> Dict[str, Any]:
+        """검색 결과 한 페이지 요청 (429/5xx/연결 오류 시 지수 백오프 재시도)"""
+        headers = {
+            "X-Naver-Client-Id": self.config.naver_client_id,
+            "X-Naver-Client-Secret": self.config.naver_client_secret
+        }
+        params = {
+            "query": query,
+            "sort": "date",
+            "display": display,
+            "start": start
+        }
+        
+        for attempt in range(self.config.naver_max_retries + 1):
+            last_attempt = attempt == self.config.naver_max_retries
+            delay = self.config.naver_backoff * (2 ** attempt)
+            try:
+                with metrics.timer("naver.request"):
+                    resp = self.session.get(self.config.naver_api_url, headers=headers, params=params,
+                                            timeout=self.config.naver_timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                metrics.count("naver.retries")
+                self.logger.warning(f"네이버 API 연결 오류 - {delay:.1f}초 후 재시도: {e}")
+                time.sleep(delay)
+                continue
+            
+            if (resp.status_code == 429 or resp.status_code >= 500) and not last_attempt:
+                retry_after = resp.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                metrics.count("naver.retries")
+                self.logger.warning(f"네이버 API 응답 {resp.status_code} - {delay:.1f}초 후 재시도")
+                time.sleep(delay)
+                continue
             
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"뉴스 수집 실패: {e}")
-            return []
+            resp.raise_for_status()
+            return resp.json()
+        
+        return {}
     
     def extract_article_text(self, url: str) -> str:
         """기사 본문 추출"""
+        if self.cache:
+            cached = self.cache.get("body", CacheService.make_key(url))
+            if cached is not None:
+                metrics.count("article.cache_hits")
+                return cached
+        
+        if self.domains.is_skipped(url):
+            metrics.count("article.domain_skipped")
+            return ""
+        
+        timeout = self.domains.timeout_for(url)
+        started = time.perf_counter()
         try:
-            article = Article(url, language='ko')
-            article.download()
-            article.parse()
+            if self.config.article_extractor == "newspaper":
+                text = self._extract_with_newspaper(url, timeout=timeout)
+            else:
+                text = self._extract_with_lxml(url, timeout)
             
             # 텍스트 정규화
-            text = unicodedata.normalize("NFKC", article.text)
+            text = unicodedata.normalize("NFKC", text)
             text = text.replace("\x00", "")  # Null 문자 제거
+            text = text.strip()
             
-            return text.strip()
+            self.domains.record(url, time.perf_counter() - started, len(text))
+            metrics.count("article.fetched" if text else "article.empty")
+            if self.cache and text:
+                self.cache.set("body", CacheService.make_key(url), text)
+            return text
             
         except Exception as e:
+            self.domains.record(url, time.perf_counter() - started, failed=True)
+            metrics.count("article.failed")
             self.logger.warning(f"본문 추출 실패 ({url}): {e}")
             return ""
     
+    def _extract_with_lxml(self, url: str, timeout: Optional[float] = None) -> str:
+        """원문을 한 번 받아 경량 추출기로 본문 추출 (본문이 너무 짧으면 같은 원문으로 newspaper 추출)"""
+        with metrics.timer("article.download"):
+            raw, content_type = self.extractor.fetch(url, timeout)
+        html = decode_html(raw, content_type)
+        with metrics.timer("article.parse"):
+            text = self.extractor.extract(html, url)
+        
+        if len(text) < self.config.extract_min_chars and self.config.extract_fallback:
+            metrics.count("article.extract_fallback")
+            text = self._extract_with_newspaper(url, html) or text
+        return text
+    
+    def _extract_with_newspaper(self, url: str, html: Optional[str] = None,
+                                timeout: Optional[float] = None) -> str:
+        """newspaper로 본문 추출 (html이 있으면 다시 받지 않음)"""
+        from newspaper import Article
+        
+        article = Article(url, language='ko', request_timeout=timeout or self.config.extract_timeout)
+        with metrics.timer("article.download"):
+            article.download(input_html=html)
+        with metrics.timer("article.parse"):
+            article.parse()
+        return article.text
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """다운로드 스레드 풀 반환 (전체 동시성 제한)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.fetch_workers,
+                    thread_name_prefix="article-fetch"
+                )
+            return self._executor
+    
+    def submit_extract(self, url: str) -> Future:
+        """본문 추출 작업을 제출하고 Future 반환
+        
+        호스트별 동시 다운로드가 fetch_per_host개를 넘으면 풀에 넣지 않고 호스트 대기열에 두었다가,
+        같은 호스트의 다운로드가 끝날 때 이어서 제출합니다.
+        """
+        future: Future = Future()
+        host = host_of(url)
+        with self._lock:
+            if self._host_active.get(host, 0) >= max(1, self.config.fetch_per_host):
+                self._host_pending.setdefault(host, deque()).append((url, future))
+                return future
+            self._host_active[host] = self._host_active.get(host, 0) + 1
+        self._dispatch(host, url, future)
+        return future
+    
+    def _dispatch(self, host: str, url: str, future: Future):
+        try:
+            self._get_executor().submit(self._run_extract, host, url, future)
+        except RuntimeError as e:
+            # 풀이 종료된 뒤에는 남은 작업을 실패로 처리
+            future.set_exception(e)
+            self._release_host(host)
+    
+    def _run_extract(self, host: str, url: str, future: Future):
+        try:
+            future.set_result(self.extract_article_text(url))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._release_host(host)
+    
+    def _release_host(self, host: str):
+        """호스트의 다운로드 한 건이 끝나면 대기 중인 다음 작업을 제출"""
+        with self._lock:
+            pending = self._host_pending.get(host)
+            if pending:
+                url, future = pending.popleft()
+                if not pending:
+                    del self._host_pending[host]
+            else:
+                self._host_active[host] -= 1
+                if not self._host_active[host]:
+                    del self._host_active[host]
+                return
+        self._dispatch(host, url, future)
+    
+    def order_urls(self, urls: List[str]) -> List[str]:
+        """빠르고 안정적인 도메인부터, 도메인을 번갈아 가며 다운로드하도록 정렬"""
+        return self.domains.order(urls)
+    
+    def extract_articles(self, urls: List[str]) -> List[str]:
+        """여러 기사 본문을 동시에 추출 (빠른 도메인부터 시작하되 결과는 입력 순서 유지)"""
+        futures = {url: self.submit_extract(url) for url in self.order_urls(list(dict.fromkeys(urls)))}
+        return [futures[url].result() for url in urls]
+    
+    def close(self):
+        """스레드 풀과 세션 정리"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        self.session.close()
+        self.extractor.close()
+        self.domains.close()
+    
     def is_valid_link(self, link: str) -> bool:
-        """링크 유효성 검사"""
-        for skip_domain in self.config.skip_domains:
-            if skip_domain in link:
-                self.logger.debug(f"링크 스킵: {link} (도메인: {skip_domain})")
-                return False
+        """링크 유효성 검사 (제외 도메인이나 차단 중인 도메인이면 False)"""
+        if not link or self.domains.is_skipped(link):
+            self.logger.debug(f"링크 스킵: {link}")
+            return False
         return True
 
 # 하위 호환성을 위한 함수들
@@ -0,0 +1,353 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+
+# 기사 작업 단계 (수집 → 연관성 평가 → 본문 추출 → 요약 → 보고서 기록)
+FETCHED = "fetched"
+SCORED = "scored"
+EXTRACTED = "extracted"
+SUMMARIZED = "summarized"
+RENDERED = "rendered"
+STAGES = (FETCHED, SCORED, EXTRACTED, SUMMARIZED, RENDERED)
+
+# 더 진행하지 않는 기사 (연관성 낮음/중복/본문 없음, 재시도 초과)
+SKIPPED = "skipped"
+FAILED = "failed"
+
+# 검색어 작업 단계
+QUEUED = "queued"
+
+class JobQueue:
+    """여러 작업 프로세스가 함께 쓰는 SQLite 기반 작업 대기열
+
+    작업은 임대(lease) 후 처리하고, 완료 시 임대한 작업자만 다음 단계로 넘길(ack) 수 있습니다.
+    작업자가 중간에 종료되면 임대 시간이 지난 작업을 다른 작업자가 이어서 처리합니다.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                keyword TEXT,
+                position INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                link TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                record TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                UNIQUE (query, link)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_stage ON articles (stage, query, position)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "JobQueue":
+        """설정값으로 작업 대기열 생성"""
+        return cls(config.queue_file, config.queue_lease_seconds, config.queue_max_attempts)
+
+    def _transaction(self, func, *args):
+        """쓰기 잠금을 잡은 트랜잭션 안에서 실행 (다른 프로세스와 같은 작업을 임대하지 않도록)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    # --- 작업 등록 ---
+
+    def enqueue(self, jobs: List[Tuple[str, Optional[str]]]) -> int:
+        """(검색어, 키워드) 작업 등록 후 새로 처리할 검색어 수 반환
+
+        이미 끝난 검색어(수집한 기사가 모두 기록/제외/실패 단계)는 기사 작업을 지우고 다시 수집하도록 되돌리며,
+        처리 중인 검색어는 그대로 둡니다. 새로 처리할 검색어가 있으면 보고서 기록 표시도 지웁니다.
+        대기열의 모든 작업이 끝난 상태에서 등록하면 새 실행으로 보고, 이번 목록에 없는 이전 검색어는 지웁니다.
+        """
+        def insert():
+            if jobs and self._is_idle():
+                names = [query for query, _ in jobs]
+                placeholders = ", ".join("?" * len(names))
+                self._conn.execute(f"DELETE FROM articles WHERE query NOT IN ({placeholders})", names)
+                self._conn.execute(f"DELETE FROM queries WHERE query NOT IN ({placeholders})", names)
+            start = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM queries").fetchone()[0]
+            queued = 0
+            for offset, (query, keyword) in enumerate(jobs):
+                row = self._conn.execute("SELECT stage FROM queries WHERE query = ?", (query,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO queries (query, keyword, position, stage) VALUES (?, ?, ?, ?)",
+                        (query, keyword or query, start + offset, QUEUED)
+                    )
+                    queued += 1
+                    continue
+                pending = self._conn.execute(
+                    "SELECT COUNT(*) FROM articles WHERE query = ? AND stage IN (?, ?, ?)",
+                    (query, FETCHED, SCORED, EXTRACTED)
+                ).fetchone()[0]
+                if row[0] == QUEUED or pending:
+                    continue
+                self._conn.execute("DELETE FROM articles WHERE query = ?", (query,))
+                self._conn.execute(
+                    "UPDATE queries SET keyword = ?, stage = ?, lease_owner = NULL, lease_until = NULL, attempts = 0 "
+                    "WHERE query = ?",
+                    (keyword or query, QUEUED, query)
+                )
+                queued += 1
+            if queued:
+                self._conn.execute("DELETE FROM meta WHERE key = 'rendered'")
+            return queued
+        return self._transaction(insert)
+
+    def jobs(self) -> List[Tuple[str, str]]:
+        """등록 순서대로 (검색어, 키워드) 목록"""
+        with self._lock:
+            return self._conn.execute("SELECT query, keyword FROM queries ORDER BY position").fetchall()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    # --- 임대 ---
+
+    def _fail_exhausted(self, now: float):
+        """임대가 만료된 채 시도 횟수를 다 쓴 작업(작업자가 처리 중 종료된 경우)을 failed로 표시"""
+        self._conn.execute(
+            "UPDATE queries SET stage = ?, lease_owner = NULL, lease_until = NULL "
+            "WHERE stage = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, QUEUED, now, self.max_attempts)
+        )
+        self._conn.execute(
+            "UPDATE articles SET stage = ?, lease_owner = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE stage IN (?, ?, ?) AND lease_until < ? AND attempts >= ?",
+            (FAILED, now, FETCHED, SCORED, EXTRACTED, now, self.max_attempts)
+        )
+
+    def lease_query(self, owner: str) -> Optional[Tuple[str, str]]:
+        """수집할 검색어 하나를 임대"""
+        def lease():
+            now = time.time()
+            self._fail_exhausted(now)
+            row = self._conn.execute(
+                "SELECT query, keyword FROM queries WHERE stage = ? AND (lease_until IS NULL OR lease_until < ?) "
+                "AND attempts < ? ORDER BY position LIMIT 1",
+                (QUEUED, now, self.max_attempts)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE queries SET lease_owner = ?, lease_until = ?, attempts = attempts + 1 WHERE query = ?",
+                    (owner, now + self.lease_seconds, row[0])
+                )
+            return row
+        return self._transaction(lease)
+
+    def lease_articles(self, stage: str, owner: str, limit: int,
+                       whole_query: bool = False) -> List[Tuple[int, Dict[str, Any]]]:
+        """단계가 stage인 기사 작업 임대 (whole_query이면 한 검색어의 해당 단계 기사를 모두 임대)
+
+        반환값은 검색어 내 순서대로 정렬한 (작업 id, 레코드) 목록입니다.
+        """
+        def lease():
+            now = time.time()
+            self._fail_exhausted(now)
+            free = "stage = ? AND (lease_until IS NULL OR lease_until < ?) AND attempts < ?"
+            if whole_query:
+                # 같은 검색어의 기사를 다른 작업자가 일부 임대 중이면 건너뜀
+                row = self._conn.execute(
+                    f"SELECT query FROM articles WHERE {free} AND query NOT IN ("
+                    "SELECT query FROM articles WHERE stage = ? AND lease_until >= ?"
+                    ") ORDER BY id LIMIT 1",
+                    (stage, now, self.max_attempts, stage, now)
+                ).fetchone()
+                if not row:
+                    return []
+                rows = self._conn.execute(
+                    f"SELECT id, record FROM articles WHERE {free} AND query = ? ORDER BY position",
+                    (stage, now, self.max_attempts, row[0])
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT id, record FROM articles WHERE {free} ORDER BY id LIMIT ?",
+                    (stage, now, self.max_attempts, limit)
+                ).fetchall()
+
+            self._conn.executemany(
+                "UPDATE articles SET lease_owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                [(owner, now + self.lease_seconds, task_id) for task_id, _ in rows]
+            )
+            return [(task_id, json.loads(record)) for task_id, record in rows]
+        return self._transaction(lease)
+
+    # --- 완료 처리 ---
+
+    def complete_query(self, query: str, owner: str, articles: List[Dict[str, Any]]) -> bool:
+        """수집한 기사를 fetched 단계로 등록하고 검색어 작업 완료 (임대가 만료되어 다른 작업자에게 넘어갔으면 False)"""
+        def complete():
+            row = self._conn.execute(
+                "SELECT lease_owner FROM queries WHERE query = ? AND stage = ?", (query, QUEUED)
+            ).fetchone()
+            if not row or row[0] != owner:
+                return False
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO articles (query, position, link, stage, record, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(query, position, article.get('link', ''), FETCHED,
+                  json.dumps(dict(article, query=query), ensure_ascii=False), now)
+                 for position, article in enumerate(articles)]
+            )
+            self._conn.execute(
+                "UPDATE queries SET stage = ?, lease_owner = NULL, lease_until = NULL WHERE query = ?",
+                (FETCHED, query)
+            )
+            return True
+        return self._transaction(complete)
+
+    def complete_articles(self, owner: str, results: List[Tuple[int, str, Dict[str, Any]]]) -> int:
+        """(작업 id, 다음 단계, 레코드) 목록을 반영하고 반영한 건수 반환 (임대가 만료된 작업은 무시)
+
+        시도 횟수는 단계마다 새로 셉니다.
+        """
+        def complete():
+            now = time.time()
+            done = 0
+            for task_id, stage, record in results:
+                cursor = self._conn.execute(
+                    "UPDATE articles SET stage = ?, record = ?, lease_owner = NULL, lease_until = NULL, attempts = 0, "
+                    "updated_at = ? WHERE id = ? AND lease_owner = ?",
+                    (stage, json.dumps(record, ensure_ascii=False), now, task_id, owner)
+                )
+                done += cursor.rowcount
+            return done
+        return self._transaction(complete)
+
+    def release(self, owner: str, task_ids: List[int], query: Optional[str] = None):
+        """처리하지 못한 작업의 임대를 풀어 다시 시도하게 함 (재시도 횟수를 넘으면 failed)"""
+        def release():
+            if query is not None:
+                self._conn.execute(
+                    "UPDATE queries SET lease_owner = NULL, lease_until = NULL, "
+                    "stage = CASE WHEN attempts >= ? THEN ? ELSE stage END WHERE query = ? AND lease_owner = ?",
+                    (self.max_attempts, FAILED, query, owner)
+                )
+            self._conn.executemany(
+                "UPDATE articles SET lease_owner = NULL, lease_until = NULL, "
+                "stage = CASE WHEN attempts >= ? THEN ? ELSE stage END WHERE id = ? AND lease_owner = ?",
+                [(self.max_attempts, FAILED, task_id, owner) for task_id in task_ids]
+            )
+        self._transaction(release)
+
+    # --- 상태 조회 ---
+
+    def counts(self) -> Dict[str, int]:
+        """단계별 기사 수 (검색어 작업은 'query:단계' 키)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, COUNT(*) FROM articles GROUP BY stage").fetchall()
+            query_rows = self._conn.execute("SELECT stage, COUNT(*) FROM queries GROUP BY stage").fetchall()
+        counts = dict(rows)
+        counts.update({f"query:{stage}": count for stage, count in query_rows})
+        return counts
+
+    def _is_idle(self) -> bool:
+        pending_queries = self._conn.execute(
+            "SELECT COUNT(*) FROM queries WHERE stage = ?", (QUEUED,)
+        ).fetchone()[0]
+        pending_articles = self._conn.execute(
+            "SELECT COUNT(*) FROM articles WHERE stage IN (?, ?, ?)", (FETCHED, SCORED, EXTRACTED)
+        ).fetchone()[0]
+        return pending_queries == 0 and pending_articles == 0
+
+    def is_complete(self) -> bool:
+        """모든 검색어 수집과 기사 처리가 끝났는지 (보고서 기록만 남은 상태)"""
+        with self._lock:
+            return self._is_idle()
+
+    def acquire_lock(self, name: str, owner: str) -> bool:
+        """이름 있는 작업(보고서 기록 등)을 한 작업자만 하도록 임대"""
+        def acquire():
+            now = time.time()
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (f"lock:{name}",)).fetchone()
+            if row:
+                holder, until = json.loads(row[0])
+                if holder != owner and until >= now:
+                    return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                (f"lock:{name}", json.dumps([owner, now + self.lease_seconds]))
+            )
+            return True
+        return self._transaction(acquire)
+
+    def release_lock(self, name: str, owner: str):
+        """acquire_lock으로 잡은 작업 임대 해제"""
+        def release():
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (f"lock:{name}",)).fetchone()
+            if row and json.loads(row[0])[0] == owner:
+                self._conn.execute("DELETE FROM meta WHERE key = ?", (f"lock:{name}",))
+        self._transaction(release)
+
+    def records(self, query: str, stages: Tuple[str, ...]) -> List[Tuple[int, Dict[str, Any]]]:
+        """검색어의 해당 단계 기사 (검색어 내 순서대로)"""
+        placeholders = ", ".join("?" * len(stages))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, record FROM articles WHERE query = ? AND stage IN ({placeholders}) ORDER BY position",
+                (query, *stages)
+            ).fetchall()
+        return [(task_id, json.loads(record)) for task_id, record in rows]
+
+    def mark_rendered(self, task_ids: List[int]):
+        """보고서에 기록한 기사 표시"""
+        def mark():
+            self._conn.executemany(
+                "UPDATE articles SET stage = ?, updated_at = ? WHERE id = ?",
+                [(RENDERED, time.time(), task_id) for task_id in task_ids]
+            )
+        self._transaction(mark)
+
+    def close(self):
+        """대기열 연결 종료"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,142 @@
+import re
+import math
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional
+from config import Config
+from lib_llm import LLMService
+from lib_metrics import metrics
+
+class RelevanceService:
+    """비용이 낮은 단계부터 적용하는 연관성 평가 서비스
+
+    1단계: 키워드 문자 n-gram이 제목/설명에 얼마나 포함되는지(IDF 가중 포함률)로 명확한 기사를 바로 판정
+    2단계: (설정 시) 작은 문장 임베딩 모델의 코사인 유사도로 판정
+    3단계: 판정하지 못한 중간 구간만 LLM 일괄 평가
+    """
+
+    def __init__(self, config: Config, llm_service: LLMService):
+        self.config = config
+        self.llm_service = llm_service
+        self.logger = logging.getLogger(__name__)
+        self._embedder = None
+        self._embedder_failed = False
+        self._embedder_lock = threading.Lock()
+
+    def _normalize(self, text: str) -> str:
+        """비교용 텍스트 정규화 (태그, 공백, 문장부호 제거)"""
+        text = unicodedata.normalize("NFKC", text or "")
+        text = re.sub(r"<[^>]+>", "", text)
+        return re.sub(r"[\W_]+", "", text.lower())
+
+    def _ngrams(self, text: str) -> set:
+        """정규화된 텍스트의 문자 n-gram 집합"""
+        n = max(1, self.config.relevance_ngram)
+        if len(text) <= n:
+            return {text} if text else set()
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def lexical_scores(self, keyword: str, documents: List[str]) -> List[float]:
+        """키워드 n-gram의 IDF 가중 포함률(0~1)을 모든 문서에 대해 계산"""
+        keyword_grams = self._ngrams(self._normalize(keyword))
+        if not keyword_grams:
+            return [0.0] * len(documents)
+
+        doc_grams = [self._ngrams(self._normalize(doc)) for doc in documents]
+
+        # 이번 기사 묶음 전체에서 흔한 n-gram일수록 가중치를 낮춤
+        total = len(documents) + 1
+        idf = {
+            gram: math.log(total / (1 + sum(1 for grams in doc_grams if gram in grams))) + 1.0
+            for gram in keyword_grams
+        }
+        weight = sum(idf.values())
+        return [sum(idf[gram] for gram in keyword_grams if gram in grams) / weight for grams in doc_grams]
+
+    def _get_embedder(self):
+        """임베딩 모델 지연 로딩 (설정되지 않았거나 실패하면 None)"""
+        if not self.config.relevance_embedding_model or self._embedder_failed:
+            return None
+        with self._embedder_lock:
+            if self._embedder is None:
+                try:
+                    from transformers import AutoTokenizer, AutoModel
+                    self.logger.info("연관성 임베딩 모델 로딩 중...")
+                    tokenizer = AutoTokenizer.from_pretrained(self.config.relevance_embedding_model)
+                    model = AutoModel.from_pretrained(self.config.relevance_embedding_model)
+                    model.eval()
+                    self._embedder = (tokenizer, model)
+                except Exception as e:
+                    self.logger.error(f"연관성 임베딩 모델 로딩 실패: {e}")
+                    self._embedder_failed = True
+                    return None
+            return self._embedder
+
+    def embedding_scores(self, keyword: str, documents: List[str]) -> Optional[List[float]]:
+        """키워드와 문서들의 임베딩 코사인 유사도 (모델이 없으면 None)"""
+        embedder = self._get_embedder()
+        if embedder is None or not documents:
+            return None
+
+        import torch
+        tokenizer, model = embedder
+        with metrics.timer("relevance.embedding"), torch.inference_mode():
+            encoded = tokenizer([keyword] + documents, padding=True, truncation=True,
+                                max_length=128, return_tensors="pt")
+            hidden = model(**encoded).last_hidden_state
+            # 패딩을 제외한 평균 풀링
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            vectors = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors = torch.nn.functional.normalize(vectors, dim=-1)
+            return (vectors[1:] @ vectors[0]).tolist()
+
+    def score_batch(self, keyword: str, items: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """기사들(title, description)의 연관성을 0-100으로 평가 (입력 순서대로, LLM 평가 실패 시 None)"""
+        if not self.config.relevance_cascade:
+            return self.llm_service.assess_relevance_batch(keyword, [item['title'] for item in items])
+
+        scores: List[Optional[int]] = [None] * len(items)
+        undecided = []
+
+        # 1단계: 키워드 n-gram 포함률
+        titles = [item['title'] for item in items]
+        documents = [f"{item['title']} {item.get('description', '')}" for item in items]
+        title_scores = self.lexical_scores(keyword, titles)
+        document_scores = self.lexical_scores(keyword, documents)
+        # 짧은 키워드는 n-gram이 한두 개뿐이라 포함률이 0 아니면 1이므로, 겹치지 않는다고 제외하지 않음
+        can_reject = len(self._ngrams(self._normalize(keyword))) >= self.config.relevance_reject_min_ngrams
+        for i, (title_score, document_score) in enumerate(zip(title_scores, document_scores)):
+            if title_score >= self.config.relevance_accept_similarity:
+                scores[i] = 100
+                metrics.count("relevance.lexical_accepted")
+            elif can_reject and document_score < self.config.relevance_reject_similarity:
+                scores[i] = 0
+                metrics.count("relevance.lexical_rejected")
+            else:
+                undecided.append(i)
+
+        # 2단계: 임베딩 유사도
+        similarities = self.embedding_scores(keyword, [documents[i] for i in undecided])
+        if similarities is not None:
+            remaining = []
+            for i, similarity in zip(undecided, similarities):
+                if similarity >= self.config.relevance_embed_accept:
+                    scores[i] = 100
+                    metrics.count("relevance.embedding_accepted")
+                elif similarity < self.config.relevance_embed_reject:
+                    scores[i] = 0
+                    metrics.count("relevance.embedding_rejected")
+                else:
+                    remaining.append(i)
+            undecided = remaining
+
+        # 3단계: 중간 구간만 LLM 평가
+        if undecided:
+            metrics.count("relevance.llm_scored", len(undecided))
+            llm_scores = self.llm_service.assess_relevance_batch(keyword, [titles[i] for i in undecided])
+            for i, score in zip(undecided, llm_scores):
+                scores[i] = score
+
+        self.logger.info(f"연관성 평가: {len(items)}건 중 {len(undecided)}건만 LLM 평가")
+        return scores
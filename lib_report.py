@@ -0,0 +1,96 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+# JSONL 레코드에 기록할 필드
+RECORD_FIELDS = ("query", "title", "link", "description", "pubDate", "relevance", "summary")
+
+class ReportWriter:
+    """HTML 보고서와 JSONL 레코드를 기사 단위로 바로 기록하는 스트리밍 작성기
+
+    작성 중에는 '<파일명>.part'에 기록하여 진행 중인 결과를 볼 수 있게 하고,
+    commit() 시 원래 파일명으로 원자적으로 교체합니다.
+    """
+
+    def __init__(self, filename: str, jsonl_filename: Optional[str] = None):
+        self.filename = filename
+        self.jsonl_filename = jsonl_filename
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+
+        self._html = open(self._part(filename), "w", encoding="utf-8")
+        self._jsonl = open(self._part(jsonl_filename), "w", encoding="utf-8") if jsonl_filename else None
+
+    @staticmethod
+    def _part(filename: str) -> str:
+        """작성 중 임시 파일 이름"""
+        return f"{filename}.part"
+
+    def write(self, html: str):
+        """HTML 조각을 기록하고 바로 디스크로 내보냄"""
+        self._html.write(html)
+        self._html.flush()
+
+    def write_record(self, record: Dict[str, Any]):
+        """기사 레코드 한 줄을 JSONL로 기록"""
+        if self._jsonl:
+            data = {field: record.get(field) for field in RECORD_FIELDS}
+            self._jsonl.write(json.dumps(data, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+
+    def commit(self):
+        """파일을 닫고 임시 파일을 최종 파일로 교체"""
+        for handle, filename in ((self._html, self.filename), (self._jsonl, self.jsonl_filename)):
+            if handle is None or handle.closed:
+                continue
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+            os.replace(self._part(filename), filename)
+        self.logger.info(f"HTML 파일 저장 완료: {self.filename}")
+
+    def abort(self):
+        """파일을 닫기만 함 (작성 중이던 '.part' 파일은 부분 결과로 남김)"""
+        for handle in (self._html, self._jsonl):
+            if handle is not None and not handle.closed:
+                handle.close()
+        self.logger.warning(f"보고서 작성 중단 - 부분 결과: {self._part(self.filename)}")
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+class ReportBuffer:
+    """ReportWriter와 같은 인터페이스로 메모리에 보고서를 모으는 작성기"""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self.records: List[Dict[str, Any]] = []
+
+    def write(self, html: str):
+        """HTML 조각 추가"""
+        self._parts.append(html)
+
+    def write_record(self, record: Dict[str, Any]):
+        """기사 레코드 추가"""
+        self.records.append({field: record.get(field) for field in RECORD_FIELDS})
+
+    def getvalue(self) -> str:
+        """모은 HTML 반환"""
+        return "".join(self._parts)
+
+    def __enter__(self) -> "ReportBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
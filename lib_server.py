@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import email.utils
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import urlsplit, parse_qs, quote
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+
+class Report:
+    """검색어 하나의 마지막 보고서 (HTML, ETag, 생성 시각)"""
+
+    def __init__(self, query: str, html: str, articles: int, modified: float, etag: Optional[str] = None):
+        self.query = query
+        self.html = html
+        self.body = html.encode("utf-8")
+        self.articles = articles
+        self.modified = modified
+        self.etag = etag or '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"query": self.query, "html": self.html, "articles": self.articles,
+                "modified": self.modified, "etag": self.etag}
+
+
+class ReportService:
+    """구독한 검색어의 보고서를 메모리/디스크에 보관하고 주기적으로 백그라운드에서 갱신하는 서비스
+
+    갱신 중이거나 갱신에 실패해도 마지막으로 성공한 보고서를 계속 제공합니다.
+    같은 검색어에 대한 동시 요청은 파이프라인 실행 한 번으로 합치고(single-flight),
+    파이프라인은 요약 모델을 나눠 쓰므로 한 번에 하나만 실행합니다.
+    """
+
+    def __init__(self, processor: Any, cache_dir: str, refresh_seconds: float = 1800.0, max_queries: int = 20):
+        self.processor = processor
+        self.cache_dir = cache_dir
+        self.refresh_seconds = refresh_seconds
+        self.max_queries = max(1, max_queries)
+        self.logger = logging.getLogger(__name__)
+
+        self._reports: Dict[str, Report] = {}
+        self._subscriptions: Dict[str, Optional[str]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._errors: Dict[str, str] = {}
+        # 마지막 갱신 시도 시각 (이전 보고서를 유지하거나 실패해도 다음 주기까지 다시 갱신하지 않음)
+        self._attempted: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._pipeline_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_cached()
+
+    @classmethod
+    def from_config(cls, processor: Any, config: Config) -> "ReportService":
+        """설정값으로 보고서 서비스 생성"""
+        return cls(processor, config.serve_cache_dir, config.serve_refresh_minutes * 60, config.serve_max_queries)
+
+    # --- 디스크 캐시 ---
+
+    def _path(self, query: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(query.encode("utf-8")).hexdigest()[:16] + ".json")
+
+    def _load_cached(self):
+        """이전 실행에서 저장한 보고서를 불러오고 최근 보고서부터 max_queries개까지 다시 구독
+
+        구독한 검색어는 보고서 생성 시각 기준으로 갱신 주기가 지났으면 첫 갱신 주기에 바로 갱신합니다.
+        """
+        loaded = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), encoding="utf-8") as f:
+                    data = json.load(f)
+                self._reports[data["query"]] = Report(data["query"], data["html"], data.get("articles", 0),
+                                                      data["modified"], data.get("etag"))
+                loaded.append((data["modified"], data["query"], data.get("keyword")))
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"저장된 보고서를 읽지 못했습니다 ({name}): {e}")
+        for _, query, keyword in sorted(loaded, reverse=True)[:self.max_queries]:
+            self._subscriptions[query] = keyword
+
+    def _save(self, report: Report):
+        path = self._path(report.query)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # 재시작 후 다시 구독할 때 쓰도록 관련성 키워드도 함께 저장
+        with self._lock:
+            keyword = self._subscriptions.get(report.query)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(report.to_dict(), keyword=keyword), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # --- 구독과 조회 ---
+
+    def subscribe(self, query: str, keyword: Optional[str] = None) -> bool:
+        """주기적으로 갱신할 검색어 추가 (구독 수 상한을 넘으면 False)"""
+        with self._lock:
+            if query not in self._subscriptions and len(self._subscriptions) >= self.max_queries:
+                return False
+            if keyword or query not in self._subscriptions:
+                self._subscriptions[query] = keyword
+        self._wake.set()
+        return True
+
+    def subscriptions(self) -> List[Dict[str, Any]]:
+        """구독 중인 검색어별 상태 (목록 페이지용)"""
+        with self._lock:
+            rows = []
+            for query, keyword in self._subscriptions.items():
+                report = self._reports.get(query)
+                rows.append({
+                    "query": query,
+                    "keyword": keyword,
+                    "articles": report.articles if report else None,
+                    "modified": report.modified if report else None,
+                    "refreshing": query in self._inflight,
+                    "error": self._errors.get(query),
+                })
+            return rows
+
+    def get(self, query: str, timeout: Optional[float] = None) -> Optional[Report]:
+        """검색어 보고서 반환 (없으면 갱신을 기다림, 갱신에 실패하면 None)"""
+        with self._lock:
+            report = self._reports.get(query)
+        if report is not None:
+            return report
+        try:
+            return self.refresh([query])[query].result(timeout)
+        except Exception as e:
+            self.logger.error(f"'{query}' 보고서 생성 실패: {e}")
+            return None
+
+    # --- 갱신 ---
+
+    def refresh(self, queries: List[str]) -> Dict[str, Future]:
+        """검색어들을 백그라운드에서 갱신하고 검색어별 Future 반환 (이미 갱신 중인 검색어는 그 Future를 공유)"""
+        futures: Dict[str, Future] = {}
+        jobs: List[Tuple[str, Optional[str]]] = []
+        with self._lock:
+            for query in dict.fromkeys(queries):
+                if query not in self._inflight:
+                    self._inflight[query] = Future()
+                    jobs.append((query, self._subscriptions.get(query)))
+                futures[query] = self._inflight[query]
+        if jobs:
+            threading.Thread(target=self._run, args=(jobs,), name="report-refresh", daemon=True).start()
+        return futures
+
+    def _run(self, jobs: List[Tuple[str, Optional[str]]]):
+        """파이프라인을 한 번 실행해 보고서들을 갱신하고 기다리던 요청에 결과 전달"""
+        results: Dict[str, Any] = {}
+        try:
+            with self._pipeline_lock:
+                # 서버가 며칠씩 떠 있어도 수집 기간이 실행 시점 기준이 되도록 매번 다시 계산
+                self.processor.config.refresh_dates()
+                started = time.perf_counter()
+                buffers = self.processor.render_batch(jobs)
+                self.logger.info(f"보고서 갱신: {', '.join(query for query, _ in jobs)} "
+                                 f"({time.perf_counter() - started:.1f}초)")
+            for query, _ in jobs:
+                results[query] = self._store(query, buffers[query])
+        except Exception as e:
+            self.logger.error(f"보고서 갱신 실패 ({', '.join(query for query, _ in jobs)}): {e}")
+            for query, _ in jobs:
+                results.setdefault(query, e)
+
+        for query, _ in jobs:
+            with self._lock:
+                self._attempted[query] = time.time()
+                future = self._inflight.pop(query)
+                if isinstance(results[query], Exception):
+                    self._errors[query] = str(results[query])
+                else:
+                    self._errors.pop(query, None)
+            if isinstance(results[query], Exception):
+                future.set_exception(results[query])
+            else:
+                future.set_result(results[query])
+
+    def _store(self, query: str, buffer: Any) -> Report:
+        """새 보고서 저장 (기사가 하나도 없으면 이전 보고서를 유지)"""
+        with self._lock:
+            previous = self._reports.get(query)
+        if not buffer.records and previous is not None and previous.articles > 0:
+            # 일시적인 수집 실패로 빈 보고서가 마지막 정상 보고서를 덮어쓰지 않도록 함
+            self.logger.warning(f"'{query}' 갱신 결과에 기사가 없어 이전 보고서를 유지합니다.")
+            return previous
+
+        report = Report(query, buffer.getvalue(), len(buffer.records), time.time())
+        if previous is not None and previous.etag == report.etag:
+            # 내용이 같으면 ETag와 수정 시각을 유지해 클라이언트 캐시를 그대로 쓰게 함
+            report = previous
+        with self._lock:
+            self._reports[query] = report
+        try:
+            self._save(report)
+        except OSError as e:
+            self.logger.warning(f"보고서를 저장하지 못했습니다 ({query}): {e}")
+        return report
+
+    def _due_queries(self) -> Tuple[List[str], float]:
+        """갱신 주기가 지난 구독 검색어 목록과 다음 갱신까지 남은 시간"""
+        now = time.time()
+        due = []
+        wait = self.refresh_seconds
+        with self._lock:
+            for query in self._subscriptions:
+                report = self._reports.get(query)
+                last = self._attempted.get(query, report.modified if report else None)
+                age = now - last if last is not None else float("inf")
+                if age >= self.refresh_seconds:
+                    if query not in self._inflight:
+                        due.append(query)
+                else:
+                    wait = min(wait, self.refresh_seconds - age)
+        return due, wait
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            due, wait = self._due_queries()
+            if due:
+                # 갱신할 검색어를 한 번에 처리해 겹치는 기사는 한 번만 다운로드/요약
+                for future in self.refresh(due).values():
+                    future.exception()
+                continue
+            self._wake.wait(max(1.0, wait))
+            self._wake.clear()
+
+    def start(self):
+        """백그라운드 갱신 시작"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._schedule, name="report-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """백그라운드 갱신 중지"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class _ReportRequestHandler(BaseHTTPRequestHandler):
+    """보고서 요청 핸들러
+
+    GET  /                  구독 중인 검색어 목록
+    GET  /report?q=검색어   검색어 보고서 (ETag/If-None-Match, Last-Modified/If-Modified-Since 지원)
+    POST /refresh?q=검색어  즉시 갱신 요청
+    GET  /health            상태 확인
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "NewsReport/1.0"
+
+    def log_message(self, format, *args):
+        self.server.logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304 and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, data: Dict[str, Any]):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _parse_path(self) -> Tuple[str, Dict[str, List[str]]]:
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        return url.path, params
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path, params = self._parse_path()
+        service: ReportService = self.server.service
+        if path == "/":
+            self._send(200, self._index_page(service).encode("utf-8"))
+        elif path == "/health":
+            self._send_json(200, {"ok": True, "queries": len(service.subscriptions())})
+        elif path == "/report":
+            query = params.get("q", [""])[0].strip()
+            if not query:
+                self._send_json(400, {"ok": False, "error": "검색어(q)가 필요합니다."})
+                return
+            if not service.subscribe(query, params.get("keyword", [None])[0]):
+                self._send_json(429, {"ok": False, "error": "구독할 수 있는 검색어 수를 넘었습니다."})
+                return
+            report = service.get(query)
+            if report is None:
+                self._send_json(503, {"ok": False, "error": "보고서를 만들지 못했습니다. 잠시 후 다시 시도하세요."})
+                return
+            self._send_report(report)
+        else:
+            self._send_json(404, {"ok": False, "error": "없는 경로입니다."})
+
+    def do_POST(self):
+        path, params = self._parse_path()
+        service: ReportService = self.server.service
+        if path != "/refresh":
+            self._send_json(404, {"ok": False, "error": "없는 경로입니다."})
+            return
+        query = params.get("q", [""])[0].strip()
+        if not query:
+            self._send_json(400, {"ok": False, "error": "POST /refresh?q=검색어 형식으로 요청하세요."})
+            return
+        if not service.subscribe(query):
+            self._send_json(429, {"ok": False, "error": "구독할 수 있는 검색어 수를 넘었습니다."})
+            return
+        service.refresh([query])
+        self._send_json(202, {"ok": True, "query": query})
+
+    def _send_report(self, report: Report):
+        headers = {
+            "ETag": report.etag,
+            "Last-Modified": email.utils.formatdate(report.modified, usegmt=True),
+            # 캐시해 두되 매번 ETag로 확인하게 함
+            "Cache-Control": "no-cache",
+        }
+        if self._not_modified(report):
+            self._send(304, headers=headers)
+        else:
+            self._send(200, report.body, headers=headers)
+
+    def _not_modified(self, report: Report) -> bool:
+        """If-None-Match가 있으면 ETag로, 없으면 If-Modified-Since로 판단"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return report.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(report.modified) <= since
+        return False
+
+    @staticmethod
+    def _index_page(service: ReportService) -> str:
+        rows = []
+        for row in service.subscriptions():
+            if row["modified"]:
+                updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["modified"]))
+                status = f"{row['articles']}개 기사, {updated}"
+            else:
+                status = "생성 전"
+            if row["refreshing"]:
+                status += " (갱신 중)"
+            if row["error"]:
+                status += f" (마지막 갱신 실패: {escape(row['error'])})"
+            rows.append(f"<li><a href='/report?q={quote(row['query'])}'>{escape(row['query'])}</a> - {status}</li>")
+        return ("<!DOCTYPE html><html lang='ko'><head><meta charset='UTF-8'><title>뉴스 요약 보고서</title></head>"
+                f"<body><h1>뉴스 요약 보고서</h1><ul>{''.join(rows) or '<li>구독 중인 검색어가 없습니다.</li>'}</ul>"
+                "<form action='/report'><input name='q' placeholder='검색어'> <button>보기</button></form>"
+                "</body></html>")
+
+
+class ReportServer(ThreadingHTTPServer):
+    """보고서 서비스를 HTTP로 제공하는 로컬 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ReportService):
+        self.service = service
+        self.logger = logging.getLogger(__name__)
+        super().__init__(address, _ReportRequestHandler)
@@ -0,0 +1,175 @@
+import os
+import re
+import math
+import logging
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from config import Config
+
+# 선택 가능한 추론 백엔드
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+class SummaryBackend(ABC):
+    """요약 추론 백엔드 공통 인터페이스
+
+    summarize(texts)는 입력 순서대로 요약문 목록을 반환하고, tokenizer는 길이 정렬과 토큰 수 계산에 사용합니다.
+    """
+
+    name = ""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.tokenizer = None
+
+    @staticmethod
+    def from_config(config: Config) -> "SummaryBackend":
+        """설정값(SUMMARY_BACKEND, SUMMARY_WORKERS)으로 백엔드 생성"""
+        if config.summary_workers > 1:
+            return ProcessPoolSummaryBackend(config)
+        return _create_backend(config, config.summary_threads)
+
+    @abstractmethod
+    def summarize(self, texts: List[str]) -> List[str]:
+        """입력 순서대로 요약문 목록 반환"""
+
+    def close(self):
+        """백엔드 자원 정리"""
+
+
+class _PipelineBackend(SummaryBackend):
+    """transformers 요약 파이프라인을 추론 모드로 실행하는 백엔드"""
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+        self.pipeline = None
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        import torch
+
+        with torch.inference_mode():
+            outputs = self.pipeline(
+                texts,
+                max_length=self.config.summary_max_length,
+                min_length=self.config.summary_min_length,
+                do_sample=False,
+                truncation=True,
+                batch_size=len(texts)
+            )
+        return [output['summary_text'] for output in outputs]
+
+
+class TorchSummaryBackend(_PipelineBackend):
+    """PyTorch fp32 모델 (quantize=True이면 Linear 층을 int8로 동적 양자화)"""
+
+    def __init__(self, config: Config, quantize: bool = False, threads: int = 0):
+        super().__init__(config)
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+
+        self.name = "torch-int8" if quantize else "torch"
+        if threads > 0:
+            torch.set_num_threads(threads)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(config.summary_model)
+        model = AutoModelForSeq2SeqLM.from_pretrained(config.summary_model)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.pipeline = pipeline("summarization", model=model, tokenizer=self.tokenizer)
+
+
+class OnnxSummaryBackend(_PipelineBackend):
+    """ONNX Runtime으로 변환한 인코더-디코더 모델 (디코더 KV 캐시 사용)
+
+    optimum[onnxruntime] 패키지가 필요하며, 변환 결과는 SUMMARY_ONNX_DIR에 저장해 다음 실행부터 재사용합니다.
+    """
+
+    def __init__(self, config: Config, threads: int = 0):
+        super().__init__(config)
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        from transformers import AutoTokenizer, pipeline
+
+        self.name = "onnx"
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+
+        export_dir = os.path.join(config.summary_onnx_dir, re.sub(r"[^\w.-]+", "_", config.summary_model))
+        if os.path.isdir(export_dir):
+            self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True, session_options=options)
+        else:
+            self.logger.info(f"요약 모델을 ONNX로 변환 중: {export_dir}")
+            self.tokenizer = AutoTokenizer.from_pretrained(config.summary_model)
+            model = ORTModelForSeq2SeqLM.from_pretrained(
+                config.summary_model, export=True, use_cache=True, session_options=options
+            )
+            model.save_pretrained(export_dir)
+            self.tokenizer.save_pretrained(export_dir)
+        self.pipeline = pipeline("summarization", model=model, tokenizer=self.tokenizer)
+
+
+def _create_backend(config: Config, threads: int) -> SummaryBackend:
+    """현재 프로세스에서 실행할 백엔드 생성"""
+    if config.summary_backend == "torch":
+        return TorchSummaryBackend(config, threads=threads)
+    if config.summary_backend == "torch-int8":
+        return TorchSummaryBackend(config, quantize=True, threads=threads)
+    if config.summary_backend == "onnx":
+        return OnnxSummaryBackend(config, threads=threads)
+    raise ValueError(f"알 수 없는 요약 백엔드: {config.summary_backend} (선택: {', '.join(BACKENDS)})")
+
+
+# 프로세스 풀 작업 프로세스마다 하나씩 두는 백엔드
+_pool_backend = None
+
+def _init_pool_worker(config: Config, threads: int):
+    global _pool_backend
+    _pool_backend = _create_backend(config, threads)
+
+def _pool_ready(_: int) -> bool:
+    return _pool_backend is not None
+
+def _pool_summarize(texts: List[str]) -> List[str]:
+    return _pool_backend.summarize(texts)
+
+
+class ProcessPoolSummaryBackend(SummaryBackend):
+    """여러 프로세스에 모델을 하나씩 올리고 입력을 나눠 요약하는 백엔드"""
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+        from transformers import AutoTokenizer
+
+        self.workers = config.summary_workers
+        self.name = f"{config.summary_backend}x{self.workers}"
+        self.tokenizer = AutoTokenizer.from_pretrained(config.summary_model)
+
+        # 코어를 작업 프로세스끼리 나눠 스레드 과다 경쟁을 막음
+        threads = config.summary_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        # 부모의 torch 스레드 풀 상태를 물려받지 않도록 spawn으로 시작
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_worker,
+            initargs=(config, threads)
+        )
+        # 모델 로딩 실패를 첫 요약 전에 알 수 있도록 작업 프로세스를 미리 띄움
+        list(self._executor.map(_pool_ready, range(self.workers)))
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        if not texts:
+            return []
+        shard_size = math.ceil(len(texts) / min(self.workers, len(texts)))
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        summaries: List[str] = []
+        for shard_summaries in self._executor.map(_pool_summarize, shards):
+            summaries.extend(shard_summaries)
+        return summaries
+
+    def close(self):
+        self._executor.shutdown()
@@ -0,0 +1,121 @@
+import re
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Any, Callable, Dict, List, Optional
+from lib_metrics import metrics
+
+# 기사 식별과 무관한 추적용 쿼리 파라미터
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref", "ref_src", "referer", "cmpid", "ncid", "rccode", "lfrom",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+# 모바일 호스트 → 데스크톱 호스트 (경로가 같은 사이트만)
+MOBILE_HOSTS: Dict[str, str] = {
+    "m.news.naver.com": "n.news.naver.com",
+    "m.khan.co.kr": "www.khan.co.kr",
+    "m.hankookilbo.com": "www.hankookilbo.com",
+    "m.segye.com": "www.segye.com",
+    "m.kmib.co.kr": "www.kmib.co.kr",
+    "m.yna.co.kr": "www.yna.co.kr",
+    "m.edaily.co.kr": "www.edaily.co.kr",
+    "m.sedaily.com": "www.sedaily.com",
+    "m.fnnews.com": "www.fnnews.com",
+    "m.ytn.co.kr": "www.ytn.co.kr",
+}
+
+# 네이버 뉴스 기사 주소 (언론사 id/기사 id)
+_NAVER_PATH_ID = re.compile(r"/(?:mnews/)?article/(?:\w+/)?(\d{3})/(\d{6,})")
+_NAVER_HOST = re.compile(r"(^|\.)naver\.com$")
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+logger = logging.getLogger(__name__)
+
+def is_naver_url(url: str) -> bool:
+    """네이버 뉴스 미러 주소인지"""
+    return bool(_NAVER_HOST.search((urlsplit(url or "").hostname or "").lower()))
+
+def normalize_url(url: str) -> str:
+    """스킴/호스트 소문자화, 기본 포트·조각(#)·추적 파라미터 제거, 알려진 모바일 호스트를 데스크톱 호스트로 변환
+
+    http(s)가 아닌 주소는 빈 문자열을 반환합니다.
+    """
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return ""
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return ""
+
+    netloc = parts.netloc.rsplit("@", 1)[-1].lower()
+    if netloc.endswith(_DEFAULT_PORTS[scheme]):
+        netloc = netloc[:-len(_DEFAULT_PORTS[scheme])]
+    netloc = MOBILE_HOSTS.get(netloc, netloc)
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(key, value) for key, value in params
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    # 지울 파라미터가 없으면 원래 인코딩을 그대로 둠
+    query = parts.query if len(kept) == len(params) else urlencode(kept)
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+def naver_article_id(url: str) -> Optional[str]:
+    """네이버 뉴스 주소의 '언론사 id/기사 id' (네이버 주소가 아니거나 찾지 못하면 None)
+
+    n.news.naver.com/mnews/article/001/0012345678, news.naver.com/main/read.naver?oid=001&aid=0012345678,
+    entertain/sports 기사 주소를 모두 같은 id로 인식합니다.
+    """
+    if not is_naver_url(url):
+        return None
+    parts = urlsplit(url)
+    match = _NAVER_PATH_ID.search(parts.path)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+    params = dict(parse_qsl(parts.query))
+    if params.get("oid") and params.get("aid"):
+        return f"{params['oid']}/{params['aid']}"
+    return None
+
+def canonical_key(url: str) -> str:
+    """같은 기사인지 비교하기 위한 키 (스킴, www./m. 접두어, 쿼리 파라미터 순서 무시)"""
+    naver_id = naver_article_id(url)
+    if naver_id:
+        return f"naver:{naver_id}"
+    normalized = normalize_url(url)
+    if not normalized:
+        return ""
+    parts = urlsplit(normalized)
+    host = re.sub(r"^(www|m|mobile)\.", "", parts.netloc)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{host}{parts.path.rstrip('/')}?{query}"
+
+def choose_link(item: Dict[str, Any], is_valid: Callable[[str], bool]) -> str:
+    """기사 항목에서 본문을 받을 주소 선택 (언론사 원문 우선, 받을 수 없으면 네이버 미러, 둘 다 안 되면 빈 문자열)"""
+    for link in (normalize_url(item.get('originallink', '')), normalize_url(item.get('link', ''))):
+        if link and is_valid(link):
+            return link
+    return ""
+
+def canonicalize_items(items: List[Dict[str, Any]], is_valid: Callable[[str], bool]) -> List[Dict[str, Any]]:
+    """기사 항목마다 받을 주소를 'link'로 정하고, 같은 기사(정규화 주소 또는 네이버 기사 id)는 처음 항목만 남김
+
+    link/originallink 중 하나라도 이미 나온 기사와 같으면 중복으로 봅니다. 원본 항목은 바꾸지 않습니다.
+    """
+    seen = set()
+    result = []
+    for item in items:
+        link = choose_link(item, is_valid)
+        if not link:
+            metrics.count("articles.skipped_invalid_link")
+            continue
+        keys = {canonical_key(url) for url in (item.get('originallink'), item.get('link'), link) if url}
+        keys.discard("")
+        if keys & seen:
+            metrics.count("articles.skipped_same_url")
+            logger.debug(f"같은 기사 주소 스킵: {link}")
+            continue
+        seen.update(keys)
+        result.append(dict(item, link=link))
+    return result
@@ -0,0 +1,98 @@
+import os
+import json
+import socket
+import logging
+import threading
+import socketserver
+from typing import Any, Dict, List
+
+class _SummaryRequestHandler(socketserver.StreamRequestHandler):
+    """한 줄에 JSON 요청 하나씩 읽어 응답 한 줄로 돌려주는 핸들러"""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class SummaryWorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """요약 모델을 메모리에 상주시키고 Unix 소켓으로 요약 요청을 처리하는 워커
+
+    요청 형식 (한 줄에 JSON 하나):
+      {"op": "ping"}                       -> {"ok": true, "model": ...}
+      {"op": "summarize", "texts": [...]}  -> {"ok": true, "summaries": [...]}
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, processor: Any):
+        self.socket_path = socket_path
+        self.processor = processor
+        self.logger = logging.getLogger(__name__)
+        # 모델 하나를 여러 요청이 나눠 쓰므로 요약은 한 번에 하나씩 실행
+        self._summarize_lock = threading.Lock()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _SummaryRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 종류별 처리"""
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "model": self.processor.config.summary_model}
+        if op == "summarize":
+            with self._summarize_lock:
+                summaries = self.processor.summarize_batch(request.get("texts", []))
+            return {"ok": True, "summaries": summaries}
+        return {"ok": False, "error": f"알 수 없는 요청: {op}"}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class SummaryWorkerClient:
+    """상주 요약 워커에 요약을 요청하는 클라이언트"""
+
+    def __init__(self, socket_path: str, timeout: float = 600.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """요청 한 건을 보내고 응답을 받음 (연결 실패 시 OSError, 처리 실패 시 ValueError)"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as stream:
+                stream.write((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+                stream.flush()
+                line = stream.readline()
+        if not line:
+            raise OSError("요약 워커 응답 없음")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "요약 워커 오류"))
+        return response
+
+    def ping(self) -> bool:
+        """워커가 응답하는지 확인"""
+        try:
+            self._call({"op": "ping"})
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        """여러 텍스트 요약 요청 (입력 순서대로 반환)"""
+        summaries = self._call({"op": "summarize", "texts": texts})["summaries"]
+        if len(summaries) != len(texts):
+            raise ValueError("요약 워커 응답 개수가 요청과 다릅니다.")
+        return summaries
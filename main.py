@@ -5,12 +5,267 @@
 """
 
 import sys
+import time
 import argparse
+from typing import Dict, List, Tuple, Optional
 from config import Config
 from news_processor import NewsProcessor
+from lib_metrics import metrics
+
+def load_batch_jobs(path: str) -> List[Tuple[str, Optional[str]]]:
+    """일괄 처리 파일에서 (검색어, 키워드) 목록 읽기
+    
+    한 줄에 하나씩 '검색어' 또는 '검색어 | 키워드' 형식으로 작성하며, '#'으로 시작하는 줄은 무시합니다.
+    결과 파일이 검색어별로 만들어지므로 같은 검색어를 두 번 쓰면 ValueError가 발생합니다.
+    """
+    jobs = []
+    lines: Dict[str, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            query, _, keyword = line.partition("|")
+            query = query.strip()
+            if query in lines:
+                raise ValueError(f"{path}:{number}: 중복된 검색어 '{query}' ({lines[query]}번째 줄과 같음)")
+            lines[query] = number
+            jobs.append((query, keyword.strip() or None))
+    return jobs
+
+def run_summary_worker(argv: List[str]):
+    """요약 모델을 상주시키는 워커 실행 (Ctrl+C로 종료)"""
+    from lib_worker import SummaryWorkerServer
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py summary-worker',
+        description='요약 모델을 메모리에 상주시키고 Unix 소켓으로 요약 요청을 처리하는 워커'
+    )
+    parser.add_argument(
+        '--socket', 
+        metavar='PATH',
+        help='워커 소켓 경로 (기본값: SUMMARY_SOCKET 또는 summary.sock)'
+    )
+    args = parser.parse_args(argv)
+    
+    config = Config()
+    socket_path = args.socket or config.summary_socket or "summary.sock"
+    # 워커 자신은 모델을 직접 사용
+    config.summary_socket = ""
+    processor = NewsProcessor(config)
+    
+    print("요약 모델 로딩 중...")
+    if not processor._ensure_summarizer():
+        print("요약 모델을 불러오지 못했습니다.")
+        sys.exit(1)
+    
+    server = SummaryWorkerServer(socket_path, processor)
+    print(f"요약 워커 대기 중: {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n요약 워커를 종료합니다.")
+    finally:
+        server.server_close()
+
+def _queue_config(path: Optional[str]) -> Config:
+    config = Config()
+    if path:
+        config.queue_file = path
+    return config
+
+def _print_queue_counts(queue):
+    counts = queue.counts()
+    print("대기열 상태: " + ", ".join(f"{stage} {count}" for stage, count in sorted(counts.items())))
+
+def run_enqueue(argv: List[str]):
+    """검색어를 작업 대기열에 등록"""
+    from lib_queue import JobQueue
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py enqueue',
+        description='검색어를 작업 대기열에 등록 (등록 후 worker 명령으로 처리)'
+    )
+    parser.add_argument('query', nargs='?', default='빈집', help='검색할 키워드 (기본값: 빈집)')
+    parser.add_argument('--keyword', metavar='KEYWORD', help='연관성 평가에 사용할 키워드')
+    parser.add_argument('--batch', metavar='FILE', help="일괄 처리할 검색어 파일 (한 줄에 '검색어' 또는 '검색어 | 키워드')")
+    parser.add_argument('--combined', action='store_true', help='결과를 하나의 파일로 저장')
+    parser.add_argument('--queue', metavar='FILE', help='작업 대기열 파일 (기본값: QUEUE_FILE 또는 news_queue.sqlite3)')
+    args = parser.parse_args(argv)
+    
+    config = _queue_config(args.queue)
+    jobs = load_batch_jobs(args.batch) if args.batch else [(args.query, args.keyword)]
+    queue = JobQueue.from_config(config)
+    queued = queue.enqueue(jobs)
+    queue.set_meta("combined", "1" if args.combined else "0")
+    print(f"작업 대기열에 {len(jobs)}개 검색어 등록 ({queued}개 새로 처리): {config.queue_file}")
+    _print_queue_counts(queue)
+    queue.close()
+
+def run_worker(argv: List[str]):
+    """작업 대기열을 처리하는 작업자 실행 (여러 프로세스를 동시에 실행 가능)"""
+    import os
+    import socket
+    from lib_queue import JobQueue
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py worker',
+        description='작업 대기열의 수집/평가/추출/요약 작업을 처리하고, 모두 끝나면 보고서를 기록하는 작업자'
+    )
+    parser.add_argument('--queue', metavar='FILE', help='작업 대기열 파일 (기본값: QUEUE_FILE 또는 news_queue.sqlite3)')
+    parser.add_argument('--id', metavar='ID', help='작업자 이름 (기본값: 호스트명:PID)')
+    parser.add_argument('--no-render', action='store_true', help='작업이 끝나도 보고서를 기록하지 않기')
+    parser.add_argument('--summary-socket', metavar='PATH', help='상주 요약 워커 소켓 경로')
+    args = parser.parse_args(argv)
+    
+    config = _queue_config(args.queue)
+    if args.summary_socket:
+        config.summary_socket = args.summary_socket
+    worker_id = args.id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue.from_config(config)
+    processor = NewsProcessor(config)
+    
+    print(f"작업자 시작: {worker_id} ({config.queue_file})")
+    try:
+        for output_file in processor.run_queue_worker(queue, worker_id, render=not args.no_render):
+            print(f"결과 파일 생성: {output_file}")
+        _print_queue_counts(queue)
+    except KeyboardInterrupt:
+        # 임대한 작업은 임대 시간이 지나면 다른 작업자가 이어서 처리
+        print("\n작업자를 종료합니다.")
+        sys.exit(1)
+    finally:
+        queue.close()
+
+def run_render(argv: List[str]):
+    """작업 대기열의 요약 결과로 보고서 기록"""
+    from lib_queue import JobQueue
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py render',
+        description='작업 대기열에서 요약이 끝난 기사로 보고서 기록'
+    )
+    parser.add_argument('--queue', metavar='FILE', help='작업 대기열 파일 (기본값: QUEUE_FILE 또는 news_queue.sqlite3)')
+    parser.add_argument('--force', action='store_true', help='이미 기록했거나 처리 중인 작업이 남아 있어도 다시 기록')
+    args = parser.parse_args(argv)
+    
+    config = _queue_config(args.queue)
+    queue = JobQueue.from_config(config)
+    processor = NewsProcessor(config)
+    written = processor.render_queue(queue, "render", force=args.force)
+    for output_file in written:
+        print(f"결과 파일 생성: {output_file}")
+    if not written:
+        print("기록할 보고서가 없습니다. (처리 중인 작업이 남아 있거나 이미 기록됨, --force로 다시 기록)")
+    _print_queue_counts(queue)
+    queue.close()
+
+def run_domains(argv: List[str]):
+    """도메인별 본문 추출 통계 출력"""
+    from lib_domain import DomainHealth
+    
+    sort_keys = {
+        'attempts': lambda row: -row['attempts'],
+        'failure': lambda row: -(row['failure_rate'] + row['empty_rate']),
+        'latency': lambda row: -(row['p95'] or 0),
+        'chars': lambda row: -row['avg_chars'],
+    }
+    parser = argparse.ArgumentParser(
+        prog='main.py domains',
+        description='도메인별 본문 추출 통계 (응답 시간, 실패/빈 본문 비율, 평균 본문 길이, 차단 상태)'
+    )
+    parser.add_argument('--sort', choices=sorted(sort_keys), default='attempts', help='정렬 기준 (기본값: attempts)')
+    parser.add_argument('--limit', type=int, default=30, metavar='N', help='출력할 도메인 수 (기본값: 30, 0이면 전체)')
+    parser.add_argument('--blocked', action='store_true', help='차단 중인 도메인만 출력')
+    parser.add_argument('--reset', nargs='?', const='', metavar='HOST', help='도메인 통계 삭제 (HOST가 없으면 전체)')
+    args = parser.parse_args(argv)
+    
+    config = Config()
+    domains = DomainHealth.from_config(config)
+    if args.reset is not None:
+        domains.reset(args.reset or None)
+        print(f"도메인 통계 삭제: {args.reset or '전체'}")
+        domains.close()
+        return
+    
+    rows = sorted(domains.summary(), key=sort_keys[args.sort])
+    if args.blocked:
+        rows = [row for row in rows if row['open_for'] > 0]
+    if args.limit > 0:
+        rows = rows[:args.limit]
+    
+    def seconds(value):
+        return f"{value:.2f}" if value is not None else "-"
+    
+    header = f"{'도메인':<32} {'시도':>6} {'실패%':>6} {'빈본문%':>7} {'p50(s)':>7} {'p95(s)':>7} {'평균글자':>8} {'제한(s)':>7}  상태"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        state = f"차단 {row['open_for'] / 60:.0f}분 남음" if row['open_for'] > 0 else "정상"
+        print(f"{row['host']:<32} {row['attempts']:>6} {row['failure_rate'] * 100:>6.1f} {row['empty_rate'] * 100:>7.1f} "
+              f"{seconds(row['p50']):>7} {seconds(row['p95']):>7} {row['avg_chars']:>8.0f} {row['timeout']:>7.1f}  {state}")
+    print(f"\n{config.domain_stats_file}: 도메인 {len(domains.summary())}개")
+    domains.close()
+
+def run_serve(argv: List[str]):
+    """보고서 서버 실행 (Ctrl+C로 종료)"""
+    from lib_server import ReportServer, ReportService
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py serve',
+        description='구독한 검색어의 보고서를 주기적으로 갱신하며 HTTP로 제공하는 로컬 서버'
+    )
+    parser.add_argument('queries', nargs='*', help='미리 구독할 검색어 (요청한 검색어도 자동으로 구독)')
+    parser.add_argument('--batch', metavar='FILE', help="구독할 검색어 파일 (한 줄에 '검색어' 또는 '검색어 | 키워드')")
+    parser.add_argument('--host', help='서버 주소 (기본값: SERVE_HOST 또는 127.0.0.1)')
+    parser.add_argument('--port', type=int, help='서버 포트 (기본값: SERVE_PORT 또는 8000)')
+    parser.add_argument('--refresh', type=float, metavar='MINUTES', help='갱신 주기(분) (기본값: SERVE_REFRESH_MINUTES 또는 30)')
+    args = parser.parse_args(argv)
+    
+    config = Config()
+    if args.host:
+        config.serve_host = args.host
+    if args.port:
+        config.serve_port = args.port
+    if args.refresh:
+        config.serve_refresh_minutes = args.refresh
+    if not config.validate_api_credentials():
+        sys.exit(1)
+    
+    processor = NewsProcessor(config)
+    service = ReportService.from_config(processor, config)
+    jobs = load_batch_jobs(args.batch) if args.batch else []
+    for query, keyword in jobs + [(query, None) for query in args.queries]:
+        service.subscribe(query, keyword)
+    service.start()
+    
+    server = ReportServer((config.serve_host, config.serve_port), service)
+    print(f"보고서 서버 시작: http://{config.serve_host}:{config.serve_port}/ "
+          f"(갱신 주기 {config.serve_refresh_minutes:g}분)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n보고서 서버를 종료합니다.")
+    finally:
+        server.server_close()
+        service.stop()
+
+# 첫 번째 인수로 실행하는 하위 명령
+COMMANDS = {
+    'summary-worker': run_summary_worker,
+    'enqueue': run_enqueue,
+    'worker': run_worker,
+    'render': run_render,
+    'domains': run_domains,
+    'serve': run_serve,
+}
 
 def main():
     """메인 함수"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
     # 명령행 인수 파싱
     parser = argparse.ArgumentParser(
         description='네이버 뉴스 API를 이용한 뉴스 수집 및 AI 요약 시스템',
@@ -20,6 +275,17 @@ def main():
   %(prog)s "부동산"                 # '부동산' 키워드로 검색
   %(prog)s "빈집" --keyword "농촌"  # 사용자 정의 연관성 키워드 사용
   %(prog)s "빈집" --no-dedup        # 중복 제거 건너뛰기
+  %(prog)s "빈집" --no-cache        # 캐시 없이 전체 다시 처리
+  %(prog)s "빈집" --incremental     # 지난 실행 이후 새 기사만 처리
+  %(prog)s --batch queries.txt      # 여러 검색어를 한 번에 처리 (검색어별 결과 파일)
+  %(prog)s --batch queries.txt --combined  # 여러 검색어를 하나의 결과 파일로
+  %(prog)s summary-worker --socket /tmp/news-summary.sock  # 요약 모델 상주 워커 실행
+  %(prog)s "빈집" --summary-socket /tmp/news-summary.sock  # 상주 워커로 요약
+  %(prog)s enqueue --batch queries.txt  # 작업 대기열에 검색어 등록
+  %(prog)s worker                   # 대기열 작업자 실행 (여러 개 동시 실행 가능)
+  %(prog)s render --force           # 대기열의 현재 결과로 보고서 다시 기록
+  %(prog)s domains --sort failure   # 도메인별 본문 추출 통계 확인
+  %(prog)s serve "빈집" --port 8000  # 보고서 서버 실행 (http://127.0.0.1:8000/report?q=빈집)
         ''',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
@@ -43,6 +309,60 @@ def main():
         help='중복 제거 과정을 건너뛰기'
     )
     
+    parser.add_argument(
+        '--batch', 
+        metavar='FILE',
+        help="일괄 처리할 검색어 파일 (한 줄에 '검색어' 또는 '검색어 | 키워드')"
+    )
+    
+    parser.add_argument(
+        '--combined', 
+        action='store_true', 
+        help='일괄 처리 결과를 하나의 파일로 저장'
+    )
+    
+    parser.add_argument(
+        '--incremental', 
+        action='store_true', 
+        help='지난 실행 이후의 새 기사만 처리하고, 이전 결과와 합쳐 보고서 생성'
+    )
+    
+    parser.add_argument(
+        '--index-file', 
+        metavar='FILE',
+        help='증분 수집용 처리 기사 색인 파일 (기본값: INDEX_FILE 또는 news_index.sqlite3)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir', 
+        metavar='DIR',
+        help='본문/연관성/요약 캐시 디렉터리 (기본값: CACHE_DIR 또는 .cache)'
+    )
+    
+    parser.add_argument(
+        '--no-cache', 
+        action='store_true', 
+        help='캐시를 사용하지 않기'
+    )
+    
+    parser.add_argument(
+        '--summary-socket', 
+        metavar='PATH',
+        help='상주 요약 워커 소켓 경로 (기본값: SUMMARY_SOCKET, 연결 실패 시 직접 요약)'
+    )
+    
+    parser.add_argument(
+        '--metrics', 
+        action='store_true', 
+        help='종료 시 단계별 소요 시간/건수/처리량 요약 표 출력'
+    )
+    
+    parser.add_argument(
+        '--metrics-out', 
+        metavar='FILE',
+        help='단계별 측정값 저장 파일 (.json이면 JSON, 그 외에는 Prometheus 텍스트 형식)'
+    )
+    
     parser.add_argument(
         '--version', 
         action='version', 
@@ -54,24 +374,43 @@ def main():
     try:
         # 설정 및 프로세서 초기화
         config = Config()
+        if args.cache_dir:
+            config.cache_dir = args.cache_dir
+        if args.no_cache:
+            config.cache_enabled = False
+        if args.no_dedup:
+            config.dedup_enabled = False
+        if args.incremental:
+            config.incremental = True
+        if args.index_file:
+            config.index_file = args.index_file
+        if args.summary_socket:
+            config.summary_socket = args.summary_socket
         processor = NewsProcessor(config)
         
-        print(f"뉴스 수집 시작: '{args.query}'")
-        print(f"수집 기간: {config.get_date_range_str()}")
-        
-        # 뉴스 처리
-        html_content = processor.process_news(args.query, args.keyword)
-        
-        # 결과 저장
-        output_file = processor.save_html(html_content)
-        if output_file:
-            print(f"결과 파일 생성: {output_file}")
+        started = time.perf_counter()
+        if args.batch:
+            jobs = load_batch_jobs(args.batch)
+            print(f"일괄 뉴스 수집 시작: {len(jobs)}개 검색어")
+            print(f"수집 기간: {config.get_date_range_str()}")
+            
+            # 뉴스 처리 및 결과 저장 (기사 단위로 바로 기록)
+            for output_file in processor.write_batch(jobs, combined=args.combined):
+                print(f"결과 파일 생성: {output_file}")
+        else:
+            print(f"뉴스 수집 시작: '{args.query}'")
+            print(f"수집 기간: {config.get_date_range_str()}")
             
-            # 중복 제거 (옵션)
-            if not args.no_dedup:
-                dedup_file = processor.remove_duplicates_and_save(html_content)
-                if dedup_file:
-                    print(f"중복 제거 파일 생성: {dedup_file}")
+            # 뉴스 처리 및 결과 저장 (기사 단위로 바로 기록)
+            output_file = processor.write_report(args.query, args.keyword)
+            print(f"결과 파일 생성: {output_file}")
+        metrics.observe("pipeline.total", time.perf_counter() - started)
+        
+        if args.metrics:
+            print(metrics.format_table())
+        if args.metrics_out:
+            metrics.export(args.metrics_out)
+            print(f"측정값 파일 생성: {args.metrics_out}")
         
         print("작업 완료!")
         
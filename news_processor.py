@@ -1,87 +1,407 @@
+import os
+import re
+import time
+import hashlib
 import logging
-from typing import List, Dict, Any
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Callable
 from config import Config
 from lib_news import NewsService
 from lib_llm import LLMService
+from lib_cache import CacheService
+from lib_dedup import DedupService
+from lib_report import ReportWriter, ReportBuffer
+from lib_index import ArticleIndex
+from lib_metrics import metrics
+from lib_relevance import RelevanceService
+from lib_worker import SummaryWorkerClient
+from lib_url import canonicalize_items, choose_link
+from lib_queue import JobQueue, FETCHED, SCORED, EXTRACTED, SUMMARIZED, RENDERED, SKIPPED
+
+# 요약 조각을 나눌 문장 경계 (문장부호 뒤 공백, 줄바꿈)
+_SENTENCE_PATTERN = re.compile(r'(?<=[.!?。])\s+|\n+')
 
 class NewsProcessor:
     """뉴스 수집, 분석, 요약, HTML 생성을 통합 처리하는 클래스"""
     
+    # 조각 요약을 모아 다시 요약하는 최대 단계 수
+    MAX_REDUCE_DEPTH = 2
+    
     def __init__(self, config: Config = None):
         self.config = config or Config()
         self.logger = logging.getLogger(__name__)
         
+        # 캐시 초기화
+        self.cache = CacheService.from_config(self.config) if self.config.cache_enabled else None
+        
         # 서비스 초기화
-        self.news_service = NewsService(self.config)
-        self.llm_service = LLMService(self.config.llm_model)
+        self.news_service = NewsService(self.config, self.cache)
+        self.llm_service = LLMService.from_config(self.config, self.cache)
+        self.relevance_service = RelevanceService(self.config, self.llm_service)
+        self.dedup_service = DedupService.from_config(self.config)
+        
+        # 증분 수집용 처리 기사 색인
+        self.index = ArticleIndex.from_config(self.config) if self.config.incremental else None
         
-        # 요약 모델 초기화
-        self._init_summarizer()
+        # 요약 모델은 처음 필요할 때 불러옴 (preload_summarizer로 미리 시작 가능)
+        self.tokenizer = None
+        self.summarizer = None
+        self._summarizer_loaded = False
+        self._summarizer_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        
+        # 상주 요약 워커 (설정 시 모델을 직접 불러오지 않고 워커에 요청)
+        self.summary_worker = None
+        if self.config.summary_socket:
+            self.summary_worker = SummaryWorkerClient(self.config.summary_socket, self.config.summary_socket_timeout)
     
     def _init_summarizer(self):
         """요약 모델 초기화"""
+        if not self.config.summary_model:
+            self.logger.info("요약 모델이 설정되지 않아 요약을 건너뜁니다.")
+            self.tokenizer = None
+            self.summarizer = None
+            return
+        
         try:
             self.logger.info("요약 모델 로딩 중...")
-            tokenizer = AutoTokenizer.from_pretrained(self.config.summary_model)
-            model = AutoModelForSeq2SeqLM.from_pretrained(self.config.summary_model)
-            self.summarizer = pipeline("summarization", model=model, tokenizer=tokenizer)
-            self.logger.info("요약 모델 로딩 완료")
+            from lib_summary import SummaryBackend
+            with metrics.timer("summary.model_load"):
+                self.summarizer = SummaryBackend.from_config(self.config)
+                self.tokenizer = self.summarizer.tokenizer
+            self.logger.info(f"요약 모델 로딩 완료 ({self.summarizer.name})")
         except Exception as e:
             self.logger.error(f"요약 모델 로딩 실패: {e}")
+            self.tokenizer = None
             self.summarizer = None
     
+    def _ensure_summarizer(self):
+        """요약 모델이 아직 없으면 불러옴 (여러 스레드에서 호출해도 한 번만 로딩)"""
+        with self._summarizer_lock:
+            if not self._summarizer_loaded:
+                self._init_summarizer()
+                self._summarizer_loaded = True
+        return self.summarizer
+    
+    def preload_summarizer(self):
+        """요약 모델 로딩을 백그라운드에서 시작 (본문 다운로드와 겹치도록)"""
+        if self._summarizer_loaded or self._preload_thread or self.summary_worker:
+            return
+        self._preload_thread = threading.Thread(
+            target=self._ensure_summarizer, name="summarizer-preload", daemon=True
+        )
+        self._preload_thread.start()
+    
+    def _needs_summarizer(self, text: str) -> bool:
+        """요약 캐시에 없어 모델로 요약해야 하는 본문인지 확인"""
+        return bool(text) and len(text.strip()) >= 64 and self._get_cached_summary(text) is None
+    
     def summarize_text(self, text: str) -> str:
         """텍스트 요약"""
-        if not text or len(text.strip()) < 64:
-            return "요약할 수 있는 내용이 부족합니다."
+        return self.summarize_batch([text])[0]
+    
+    def summarize_batch(self, texts: List[str]) -> List[str]:
+        """여러 텍스트를 문장 단위 조각으로 나눠 일괄 요약 (입력 순서대로 반환)"""
+        if self.summary_worker and texts:
+            try:
+                return self.summary_worker.summarize(texts)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"요약 워커 사용 실패 - 직접 요약으로 전환: {e}")
+                self.summary_worker = None
+        
+        results: List[str] = [""] * len(texts)
+        targets = []
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < 64:
+                results[i] = "요약할 수 있는 내용이 부족합니다."
+                continue
+            
+            cached = self._get_cached_summary(text)
+            if cached is not None:
+                metrics.count("summary.cache_hits")
+                results[i] = cached
+            else:
+                targets.append((i, text))
         
-        if not self.summarizer:
-            return "요약 모델이 로드되지 않았습니다."
+        if not targets:
+            return results
         
-        try:
-            # 텍스트 길이 제한
-            text = text[:self.config.max_text_length]
-            result = self.summarizer(
-                text, 
-                max_length=self.config.summary_max_length,
-                min_length=self.config.summary_min_length,
-                do_sample=False
-            )
-            return result[0]['summary_text']
-        except Exception as e:
-            self.logger.warning(f"요약 실패: {e}")
-            return "요약 실패"
+        if not self._ensure_summarizer():
+            for i, _ in targets:
+                results[i] = "요약 모델이 로드되지 않았습니다."
+            return results
+        
+        summaries = self._map_reduce([text for _, text in targets])
+        for (i, text), summary in zip(targets, summaries):
+            if summary is None:
+                results[i] = "요약 실패"
+            else:
+                results[i] = summary
+                self._set_cached_summary(text, summary)
+        
+        return results
+    
+    def _map_reduce(self, texts: List[str], depth: int = 0) -> List[Optional[str]]:
+        """문장 경계로 나눈 조각을 한 번에 요약하고, 조각이 여러 개인 글은 조각 요약을 모아 다시 요약 (실패 시 None)"""
+        chunked = [self._split_chunks(text) for text in texts]
+        unique_chunks = list(dict.fromkeys(chunk for chunks in chunked for chunk in chunks))
+        chunk_summaries = dict(zip(unique_chunks, self._summarize_chunks(unique_chunks)))
+        
+        results: List[Optional[str]] = [None] * len(texts)
+        reduce_indices, reduce_inputs = [], []
+        for i, chunks in enumerate(chunked):
+            parts = [chunk_summaries[chunk] for chunk in chunks]
+            if not parts or any(part is None for part in parts):
+                continue
+            if len(parts) == 1:
+                results[i] = parts[0]
+            elif depth >= self.MAX_REDUCE_DEPTH:
+                results[i] = " ".join(parts)
+            else:
+                reduce_indices.append(i)
+                reduce_inputs.append(" ".join(parts))
+        
+        if reduce_inputs:
+            metrics.count("summary.reduced", len(reduce_inputs))
+            for i, summary in zip(reduce_indices, self._map_reduce(reduce_inputs, depth + 1)):
+                results[i] = summary
+        return results
+    
+    def _split_chunks(self, text: str) -> List[str]:
+        """모델 입력 토큰 한도에 맞게 문장 단위로 묶은 조각 목록"""
+        limit = max(16, min(self.config.summary_chunk_tokens, self.tokenizer.model_max_length - 2))
+        sentences = [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text) if sentence.strip()]
+        counts = [len(ids) for ids in self.tokenizer(sentences, add_special_tokens=False)['input_ids']]
+        
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for sentence, count in zip(sentences, counts):
+            if current and current_tokens + count > limit:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            if count > limit:
+                # 한 문장이 한도를 넘으면 글자 수 기준으로 균등 분할
+                parts = -(-count // limit)
+                size = -(-len(sentence) // parts)
+                chunks.extend(sentence[k:k + size] for k in range(0, len(sentence), size))
+                continue
+            current.append(sentence)
+            current_tokens += count
+        if current:
+            chunks.append(" ".join(current))
+        
+        if len(chunks) > self.config.summary_max_chunks:
+            metrics.count("summary.chunks_dropped", len(chunks) - self.config.summary_max_chunks)
+            self.logger.info(f"긴 기사: {len(chunks)}개 조각 중 앞 {self.config.summary_max_chunks}개만 요약")
+            chunks = chunks[:self.config.summary_max_chunks]
+        return chunks
+    
+    def _summarize_chunks(self, chunks: List[str]) -> List[Optional[str]]:
+        """조각별 캐시를 확인하고 나머지만 토큰 길이순으로 묶어 일괄 요약 (실패한 조각은 None)"""
+        results: List[Optional[str]] = [None] * len(chunks)
+        missing = []
+        for k, chunk in enumerate(chunks):
+            cached = self._get_cached_summary(chunk, "summary_chunk")
+            if cached is not None:
+                metrics.count("summary.chunk_cache_hits")
+                results[k] = cached
+            else:
+                missing.append(k)
+        if not missing:
+            return results
+        
+        # 길이가 비슷한 입력끼리 묶어 배치 패딩 낭비를 줄임
+        lengths = [len(ids) for ids in self.tokenizer([chunks[k] for k in missing])['input_ids']]
+        order = [missing[j] for j in sorted(range(len(missing)), key=lambda j: lengths[j])]
+        
+        batch_size = max(1, self.config.summary_batch_size)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            try:
+                summaries = self._run_summarizer([chunks[k] for k in batch])
+            except Exception as e:
+                self.logger.warning(f"일괄 요약 실패 - 개별 요약으로 대체: {e}")
+                summaries = []
+                for k in batch:
+                    try:
+                        summaries.append(self._run_summarizer([chunks[k]])[0])
+                    except Exception as e:
+                        metrics.count("summary.failed")
+                        self.logger.warning(f"요약 실패: {e}")
+                        summaries.append(None)
+            for k, summary in zip(batch, summaries):
+                results[k] = summary
+                if summary is not None:
+                    self._set_cached_summary(chunks[k], summary, "summary_chunk")
+        return results
+    
+    def _run_summarizer(self, texts: List[str]) -> List[str]:
+        """요약 백엔드를 한 번 실행"""
+        started = time.perf_counter()
+        summaries = self.summarizer.summarize(texts)
+        
+        elapsed = time.perf_counter() - started
+        metrics.observe("summary.batch", elapsed)
+        metrics.count("summary.generated", len(summaries))
+        metrics.record_tokens("summary", sum(len(ids) for ids in self.tokenizer(summaries)['input_ids']), elapsed)
+        return summaries
+    
+    def _summary_cache_key(self, text: str) -> str:
+        """본문 해시와 요약 설정으로 요약 캐시 키 생성"""
+        body_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return CacheService.make_key(
+            body_hash,
+            self.config.summary_model,
+            self.config.summary_backend,
+            self.config.summary_chunk_tokens,
+            self.config.summary_max_chunks,
+            self.config.summary_max_length,
+            self.config.summary_min_length
+        )
+    
+    def _get_cached_summary(self, text: str, namespace: str = "summary"):
+        """캐시된 요약 조회 (namespace: 글 전체 summary, 조각 summary_chunk)"""
+        if not self.cache:
+            return None
+        return self.cache.get(namespace, self._summary_cache_key(text))
+    
+    def _set_cached_summary(self, text: str, summary: str, namespace: str = "summary"):
+        """요약 결과 캐시 저장"""
+        if self.cache:
+            self.cache.set(namespace, self._summary_cache_key(text), summary)
     
     def process_news(self, query: str, keyword: str = None) -> str:
         """뉴스 수집부터 HTML 생성까지 전체 프로세스 실행"""
-        if not self.config.validate_api_credentials():
-            return "<html><body><h1>API 자격 증명 오류</h1></body></html>"
-        
-        # 기본 키워드 설정
-        if not keyword:
-            keyword = query
+        return self.process_batch([(query, keyword)])[query]
+    
+    def process_batch(self, jobs: List[Tuple[str, Optional[str]]]) -> Dict[str, str]:
+        """여러 검색어를 한 번에 처리하여 검색어별 HTML 반환
         
-        self.logger.info(f"뉴스 수집 시작: {query}")
+        요약 모델은 한 번만 사용하며, 여러 검색어에 함께 나온 기사는 한 번만 다운로드/요약합니다.
+        """
+        return {query: buffer.getvalue() for query, buffer in self.render_batch(jobs).items()}
+    
+    def render_batch(self, jobs: List[Tuple[str, Optional[str]]]) -> Dict[str, ReportBuffer]:
+        """여러 검색어를 한 번에 처리하여 검색어별 보고서 버퍼(HTML과 기사 레코드) 반환"""
+        buffers = {query: ReportBuffer() for query, _ in jobs}
+        self._render_reports(jobs, lambda query: buffers[query])
+        return buffers
+    
+    def process_batch_combined(self, jobs: List[Tuple[str, Optional[str]]]) -> str:
+        """여러 검색어를 한 번에 처리하여 하나의 통합 HTML 반환"""
+        buffer = ReportBuffer()
+        self._render_combined_report(jobs, buffer)
+        return buffer.getvalue()
+    
+    def write_report(self, query: str, keyword: str = None, filename: str = None) -> str:
+        """뉴스를 처리하면서 기사 단위로 HTML/JSONL 파일에 바로 기록"""
+        return self.write_batch([(query, keyword)], filenames={query: filename or self.config.output_file})[0]
+    
+    def write_batch(self, jobs: List[Tuple[str, Optional[str]]], combined: bool = False,
+                    filenames: Dict[str, str] = None, groups: Optional[Iterator] = None) -> List[str]:
+        """여러 검색어를 처리하면서 결과 파일에 바로 기록하고 생성한 파일 목록 반환
         
-        # 뉴스 수집
-        articles = self.news_service.fetch_news(query)
+        groups를 주면 수집/평가/요약 대신 그 (묶음, 레코드 이터레이터)들을 기록합니다.
+        """
+        written = []
         
-        # HTML 생성
-        html = self._create_html(articles, query, keyword)
+        def open_writer(query: str = None) -> ReportWriter:
+            if query is None:
+                filename = self.config.output_file
+            else:
+                filename = (filenames or {}).get(query) or self.get_output_filename(query)
+            written.append(filename)
+            return ReportWriter(filename, self._get_jsonl_filename(filename))
         
-        return html
+        if combined:
+            self._render_combined_report(jobs, open_writer(), groups)
+        else:
+            self._render_reports(jobs, open_writer, groups)
+        return written
+    
+    def _get_jsonl_filename(self, filename: str) -> Optional[str]:
+        """HTML 파일에 대응하는 JSONL 파일 이름 (비활성화 시 None)"""
+        if not self.config.output_jsonl:
+            return None
+        return os.path.splitext(filename)[0] + ".jsonl"
     
-    def _create_html(self, articles: List[Dict[str, Any]], query: str, keyword: str) -> str:
-        """HTML 생성"""
-        html = self._get_html_header(query)
+    def _render_reports(self, jobs: List[Tuple[str, Optional[str]]], open_writer: Callable[[str], Any],
+                        groups: Optional[Iterator] = None):
+        """검색어별 보고서를 작성기에 순서대로 기록"""
+        duplicates = sorted({query for query, _ in jobs if sum(q == query for q, _ in jobs) > 1})
+        if duplicates:
+            # 결과는 검색어별로 하나씩이므로 같은 검색어가 여러 번 나오면 서로 덮어씀
+            raise ValueError(f"같은 검색어가 여러 번 있습니다: {', '.join(duplicates)}")
+        if groups is None and not self.config.validate_api_credentials():
+            for query, _ in jobs:
+                with open_writer(query) as writer:
+                    writer.write("<html><body><h1>API 자격 증명 오류</h1></body></html>")
+            return
         
-        if not articles:
-            html += f"<p>지난 {self.config.days_back}일간 '{query}' 관련 주요 보도는 아직 없습니다.</p>\n"
+        if groups is None:
+            groups = self._iter_groups(self._fetch_groups(jobs))
+        for (query, _, articles), records in groups:
+            with open_writer(query) as writer:
+                writer.write(self._get_html_header(query))
+                self._write_articles(writer, query, articles, records)
+                writer.write("</body></html>")
+    
+    def _render_combined_report(self, jobs: List[Tuple[str, Optional[str]]], writer: Any,
+                                groups: Optional[Iterator] = None):
+        """모든 검색어의 결과를 하나의 작성기에 검색어별 구역으로 기록"""
+        with writer:
+            if groups is None and not self.config.validate_api_credentials():
+                writer.write("<html><body><h1>API 자격 증명 오류</h1></body></html>")
+                return
+            
+            writer.write(self._get_html_header(", ".join(query for query, _ in jobs)))
+            if groups is None:
+                groups = self._iter_groups(self._fetch_groups(jobs))
+            for (query, _, articles), records in groups:
+                writer.write(f"<h2>{query}</h2>\n")
+                self._write_articles(writer, query, articles, records)
+            writer.write("</body></html>")
+    
+    def _fetch_groups(self, jobs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, str, List[Dict[str, Any]]]]:
+        """검색어별 뉴스 수집 결과를 (검색어, 키워드, 기사 목록) 묶음으로 반환"""
+        # 검색어별 뉴스를 동시에 수집
+        queries = list(dict.fromkeys(query for query, _ in jobs))
+        self.logger.info(f"뉴스 수집 시작: {', '.join(queries)}")
+        if self.index:
+            # 증분 수집: 지난 실행 이후의 새 기사만 수집
+            fetched = self.news_service.fetch_news_many(
+                queries,
+                since={query: self.index.get_high_water(query) for query in queries},
+                seen={query: self.index.seen_links(query) for query in queries}
+            )
         else:
-            html += self._process_articles(articles, keyword)
+            fetched = self.news_service.fetch_news_many(queries)
+        
+        # 기본 키워드 설정
+        groups = [(query, keyword or query, fetched[query]) for query, keyword in jobs]
+        return groups
+    
+    def _write_articles(self, writer: Any, query: str, articles: List[Dict[str, Any]],
+                        records: Iterator[Dict[str, Any]]):
+        """처리가 끝난 기사를 하나씩 작성기에 기록"""
+        written = 0
+        for record in records:
+            writer.write(self._render_article(record))
+            writer.write_record(dict(record, query=query))
+            written += 1
         
-        return html
+        if not written:
+            writer.write(f"<p>지난 {self.config.days_back}일간 '{query}' 관련 주요 보도는 아직 없습니다.</p>\n")
+    
+    def _render_article(self, record: Dict[str, Any]) -> str:
+        """기사 레코드 하나를 HTML로 변환"""
+        return f"""<article>
+<h5><a href='{record['link']}' target='_blank'>{record['title']}</a></h5>
+<p><strong>요약:</strong> {record['summary']}</p>
+</article>
+<hr>"""
     
     def _get_html_header(self, query: str) -> str:
         """HTML 헤더 생성"""
@@ -101,48 +421,270 @@ class NewsProcessor:
 <h1>📌 {query} 관련 뉴스 요약 ({self.config.get_date_range_str()})</h1>
 """
     
-    def _process_articles(self, articles: List[Dict[str, Any]], keyword: str) -> str:
-        """기사들을 처리하여 HTML 생성"""
-        html = ""
+    def _select_articles(self, articles: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
+        """주소 정규화, 중복 제거, 연관성 평가를 통과한 기사 레코드 목록 반환"""
+        # 받을 수 있는 주소(원문 우선)를 고르고, 같은 기사 주소나 같은 네이버 기사 id는 하나만 남김
+        candidates = []
+        for art in canonicalize_items(articles, self.news_service.is_valid_link):
+            candidates.append({
+                'link': art['link'],
+                'title': art.get('title', '').replace("<b>", "").replace("</b>", ""),
+                'description': art.get('description', ''),
+                'pubDate': art.get('pubDate', ''),
+            })
+        
+        # 제목과 설명이 겹치는 기사는 연관성 평가 전에 제거
+        if self.config.dedup_enabled:
+            with metrics.timer("dedup.titles"):
+                kept = self.dedup_service.unique_indices([f"{c['title']} {c['description']}" for c in candidates])
+            metrics.count("articles.skipped_duplicate", len(candidates) - len(kept))
+            candidates = [candidates[i] for i in kept]
+        
+        # 연관성 평가 (키워드 일치/유사도로 명확한 기사는 LLM 없이 판정)
+        with metrics.timer("relevance.assess_batch"):
+            relevances = self.relevance_service.score_batch(keyword, candidates)
+        
+        selected = []
+        for record, relevance in zip(candidates, relevances):
+            if relevance is None:
+                # 평가 실패는 연관성 0과 구분해 설정에 따라 포함 또는 제외
+                metrics.count("articles.relevance_failed")
+                self.logger.warning(f"제목 '{record['title']}' 연관성 평가 실패 - "
+                                    f"{'포함' if self.config.relevance_fail_open else 'SKIP'}")
+                if not self.config.relevance_fail_open:
+                    continue
+            elif relevance < self.config.relevance_threshold:
+                metrics.count("articles.skipped_low_relevance")
+                self.logger.info(f"제목 '{record['title']}' 연관성({relevance}) 낮음 - SKIP")
+                continue
+            record['relevance'] = relevance
+            selected.append(record)
+        return selected
+    
+    def _iter_groups(self, groups: List[Tuple[str, str, List[Dict[str, Any]]]]
+                     ) -> Iterator[Tuple[Tuple[str, str, List[Dict[str, Any]]], Iterator[Dict[str, Any]]]]:
+        """검색어 묶음별로 (묶음, 요약이 끝나는 대로 나오는 레코드 이터레이터)를 순서대로 반환
+        
+        각 묶음의 레코드 이터레이터는 다음 묶음으로 넘어가기 전에 모두 소비해야 합니다.
+        """
+        # 연관성 평가를 통과한 기사는 바로 본문 다운로드를 시작 (검색어 간 같은 URL은 한 번만)
+        futures = {}
+        selections = []
+        # 검색어별 연관성 평가를 동시에 진행하고, 끝난 순서가 아니라 검색어 순서대로 다음 단계로 넘김
+        with ThreadPoolExecutor(max_workers=max(1, min(len(groups), self.config.llm_max_in_flight))) as executor:
+            for selected in executor.map(lambda group: self._select_articles(group[2], group[1]), groups):
+                # 빠르고 안정적인 도메인의 기사부터 다운로드 (요약은 원래 순서대로)
+                for link in self.news_service.order_urls([record['link'] for record in selected]):
+                    if link not in futures:
+                        futures[link] = self.news_service.submit_extract(link)
+                selections.append(selected)
+        
+        # 검색어 간 같은 URL의 요약 결과 공유
+        summaries: Dict[str, str] = {}
+        for group, selected in zip(groups, selections):
+            records = self._iter_records(group, selected, futures, summaries)
+            if self.index:
+                records = self._iter_with_index(group, records)
+            yield group, records
+    
+    def _iter_with_index(self, group: Tuple[str, str, List[Dict[str, Any]]],
+                         records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """새 기사 레코드를 색인에 저장하며 내보낸 뒤, 수집 기간 안의 이전 레코드를 이어서 내보냄"""
+        query, _, articles = group
+        new_links = set()
+        for record in records:
+            self.index.save_record(query, record)
+            new_links.add(record['link'])
+            yield record
+        
+        # 모든 기사를 처리한 뒤에만 처리 완료로 기록 (중간에 중단되면 다음 실행에서 다시 처리)
+        self.index.mark_seen(query, articles)
+        self.index.prune(self.config.from_date)
+        
+        for record in self.index.load_records(query, self.config.from_date):
+            if record['link'] not in new_links:
+                yield record
+    
+    def _iter_records(self, group: Tuple[str, str, List[Dict[str, Any]]], selected: List[Dict[str, Any]],
+                      futures: Dict[str, Future], summaries: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """원래 순서대로 본문을 받아 배치 크기만큼 모이면 요약하여 레코드를 내보냄"""
+        query, _, articles = group
+        dedup_index = self.dedup_service.new_index() if self.config.dedup_enabled else None
+        batch_size = max(1, self.config.summary_batch_size)
         processed_count = 0
-        skipped_count = 0
         
-        for art in articles:
-            link = art.get('link')
+        chunk = []
+        for position, record in enumerate(selected):
+            record['body'] = futures[record['link']].result()
+            if not record['body']:
+                metrics.count("articles.skipped_empty_body")
+            elif dedup_index is None or dedup_index.add(f"{record['title']} {record['body']}"):
+                chunk.append(record)
+                # 캐시에 없는 요약이 처음 생기면 모델 로딩을 시작해 남은 본문 다운로드와 겹치게 함
+                if record['link'] not in summaries and self._needs_summarizer(record['body']):
+                    self.preload_summarizer()
+            else:
+                # 본문이 겹치는 기사는 요약하지 않고 제거
+                metrics.count("articles.skipped_duplicate")
             
-            # 링크 유효성 검사
-            if not self.news_service.is_valid_link(link):
-                skipped_count += 1
+            if chunk and (len(chunk) >= batch_size or position == len(selected) - 1):
+                for done in self._summarize_records(chunk, summaries):
+                    processed_count += 1
+                    metrics.count("articles.processed")
+                    yield done
+                chunk = []
+        
+        self.logger.info(f"'{query}': {len(articles)}개 기사 중 {processed_count}개 처리, "
+                         f"{len(articles) - processed_count}개 스킵")
+    
+    def _summarize_records(self, records: List[Dict[str, Any]], summaries: Dict[str, str]) -> List[Dict[str, Any]]:
+        """레코드들의 본문을 한 번에 요약 (이미 요약한 URL은 재사용)"""
+        missing = {}
+        for record in records:
+            if record['link'] not in summaries:
+                missing.setdefault(record['link'], record['body'])
+        summaries.update(zip(missing, self.summarize_batch(list(missing.values()))))
+        
+        for record in records:
+            record['summary'] = summaries[record['link']]
+        return records
+    
+    def run_queue_worker(self, queue: JobQueue, worker_id: str, render: bool = True) -> List[str]:
+        """대기열 작업이 없어질 때까지 처리하고, 모두 끝나면 보고서 기록 (기록한 파일 목록 반환)
+        
+        여러 프로세스가 같은 대기열로 동시에 실행할 수 있으며, 보고서는 그중 한 작업자만 기록합니다.
+        """
+        while True:
+            if self._queue_step(queue, worker_id):
                 continue
+            if queue.is_complete():
+                return self.render_queue(queue, worker_id) if render else []
+            # 다른 작업자가 임대 중인 작업이 끝나거나 임대가 만료될 때까지 대기
+            time.sleep(self.config.queue_poll_interval)
+    
+    def _queue_step(self, queue: JobQueue, owner: str) -> bool:
+        """뒤 단계 작업부터 한 묶음 처리 (처리한 작업이 있으면 True)"""
+        for stage, handler in ((EXTRACTED, self._queue_summarize), (SCORED, self._queue_extract)):
+            limit = self.config.summary_batch_size if stage == EXTRACTED else self.config.fetch_workers * 2
+            tasks = queue.lease_articles(stage, owner, max(1, limit))
+            if tasks:
+                self._run_queue_tasks(queue, owner, tasks, handler)
+                return True
+        
+        tasks = queue.lease_articles(FETCHED, owner, 0, whole_query=True)
+        if tasks:
+            keyword = dict(queue.jobs()).get(tasks[0][1]['query'])
+            self._run_queue_tasks(queue, owner, tasks, lambda articles: self._queue_score(articles, keyword))
+            return True
+        
+        job = queue.lease_query(owner)
+        if job:
+            query, _ = job
+            try:
+                with metrics.timer("queue.fetch"):
+                    articles = self.news_service.fetch_news(query)
+                queue.complete_query(query, owner, articles)
+            except Exception as e:
+                self.logger.error(f"'{query}' 수집 실패 - 다시 시도합니다: {e}")
+                queue.release(owner, [], query)
+            return True
+        return False
+    
+    def _run_queue_tasks(self, queue: JobQueue, owner: str, tasks: List[Tuple[int, Dict[str, Any]]],
+                         handler: Callable[[List[Dict[str, Any]]], List[Tuple[str, Dict[str, Any]]]]):
+        """임대한 기사 작업을 처리해 다음 단계로 넘기고, 실패하면 임대를 풀어 다시 시도하게 함"""
+        try:
+            outcomes = handler([record for _, record in tasks])
+        except Exception as e:
+            self.logger.error(f"대기열 작업 {len(tasks)}건 처리 실패 - 다시 시도합니다: {e}")
+            queue.release(owner, [task_id for task_id, _ in tasks])
+            return
+        done = queue.complete_articles(
+            owner, [(task_id, stage, record) for (task_id, _), (stage, record) in zip(tasks, outcomes)]
+        )
+        if done < len(tasks):
+            self.logger.warning(f"임대가 만료되어 {len(tasks) - done}건의 결과를 반영하지 않았습니다.")
+    
+    def _queue_score(self, articles: List[Dict[str, Any]], keyword: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """한 검색어의 수집 기사를 연관성 평가 (통과하면 scored, 아니면 skipped)"""
+        query = articles[0]['query']
+        keyword = keyword or query
+        # 선택한 레코드의 link는 정규화한 원문 주소일 수 있으므로 원래 항목마다 고른 주소로 다시 찾음
+        selected = {record['link']: record for record in self._select_articles(articles, keyword)}
+        outcomes = []
+        for article in articles:
+            record = selected.pop(choose_link(article, self.news_service.is_valid_link), None)
+            outcomes.append((SCORED, dict(record, query=query)) if record else (SKIPPED, article))
+        return outcomes
+    
+    def _queue_extract(self, records: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """본문 추출 (본문이 없으면 skipped)"""
+        bodies = self.news_service.extract_articles([record['link'] for record in records])
+        outcomes = []
+        for record, body in zip(records, bodies):
+            if body:
+                # 요약 캐시에 없는 본문이 있을 때만 다음 요약 단계를 위해 모델 로딩을 시작
+                if self._needs_summarizer(body):
+                    self.preload_summarizer()
+                outcomes.append((EXTRACTED, dict(record, body=body)))
+            else:
+                metrics.count("articles.skipped_empty_body")
+                outcomes.append((SKIPPED, record))
+        return outcomes
+    
+    def _queue_summarize(self, records: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """본문 일괄 요약"""
+        summaries = self.summarize_batch([record['body'] for record in records])
+        return [(SUMMARIZED, dict(record, summary=summary)) for record, summary in zip(records, summaries)]
+    
+    def render_queue(self, queue: JobQueue, owner: str, force: bool = False) -> List[str]:
+        """요약이 끝난 기사로 보고서 기록 (이미 기록했거나 다른 작업자가 기록 중이면 빈 목록)
+        
+        force이면 이미 기록한 대기열도 다시 기록하고, 처리 중인 작업이 남아 있어도 지금까지의 결과로 기록합니다.
+        """
+        if not force and (queue.get_meta("rendered") or not queue.is_complete()):
+            return []
+        if not queue.acquire_lock("render", owner):
+            return []
+
+        try:
+            # 잠금을 기다리는 사이 다른 작업자가 먼저 기록했을 수 있으므로 다시 확인
+            if not force and queue.get_meta("rendered"):
+                return []
+            jobs = queue.jobs()
+            combined = queue.get_meta("combined") == "1"
+            filenames = {jobs[0][0]: self.config.output_file} if len(jobs) == 1 and not combined else None
+            rendered_ids: List[int] = []
             
-            title = art.get('title', '').replace("<b>", "").replace("</b>", "")
-            
-            # 연관성 평가
-            relevance = self.llm_service.assess_relevance(keyword, title)
-            if relevance < self.config.relevance_threshold:
-                self.logger.info(f"제목 '{title}' 연관성({relevance}) 낮음 - SKIP")
-                skipped_count += 1
-                continue
+            def groups():
+                for query, keyword in jobs:
+                    tasks = queue.records(query, (SUMMARIZED, RENDERED))
+                    yield (query, keyword, []), self._iter_queue_records(tasks, rendered_ids)
             
-            # 본문 추출 및 요약
-            body = self.news_service.extract_article_text(link)
-            if not body:
-                skipped_count += 1
+            written = self.write_batch(jobs, combined=combined, filenames=filenames, groups=groups())
+            queue.mark_rendered(rendered_ids)
+            queue.set_meta("rendered", str(time.time()))
+            return written
+        finally:
+            queue.release_lock("render", owner)
+    
+    def _iter_queue_records(self, tasks: List[Tuple[int, Dict[str, Any]]],
+                            rendered_ids: List[int]) -> Iterator[Dict[str, Any]]:
+        """대기열 레코드를 순서대로 내보내며 본문이 겹치는 기사는 제외"""
+        dedup_index = self.dedup_service.new_index() if self.config.dedup_enabled else None
+        for task_id, record in tasks:
+            rendered_ids.append(task_id)
+            if dedup_index is not None and not dedup_index.add(f"{record['title']} {record.get('body', '')}"):
+                metrics.count("articles.skipped_duplicate")
                 continue
-                
-            summary = self.summarize_text(body)
-            
-            # HTML 추가
-            html += f"""<article>
-<h5><a href='{link}' target='_blank'>{title}</a></h5>
-<p><strong>요약:</strong> {summary}</p>
-</article>
-<hr>"""
-            processed_count += 1
-        
-        self.logger.info(f"{len(articles)}개 기사 중 {processed_count}개 처리, {skipped_count}개 스킵")
-        html += "</body></html>"
-        return html
+            metrics.count("articles.processed")
+            yield {key: value for key, value in record.items() if key != 'body'}
+    
+    def get_output_filename(self, query: str) -> str:
+        """검색어별 출력 파일 이름 생성"""
+        base, ext = os.path.splitext(self.config.output_file)
+        slug = re.sub(r"[^\w-]+", "_", query).strip("_") or "query"
+        return f"{base}_{slug}{ext}"
     
     def save_html(self, html_content: str, filename: str = None) -> str:
         """HTML 파일 저장"""
@@ -157,20 +699,3 @@ class NewsProcessor:
         except Exception as e:
             self.logger.error(f"파일 저장 실패: {e}")
             return ""
-    
-    def remove_duplicates_and_save(self, html_content: str) -> str:
-        """중복 제거 후 파일 저장"""
-        try:
-            self.logger.info("중복 뉴스 제거 중...")
-            deduplicated_html = self.llm_service.remove_duplicates(html_content)
-            
-            if deduplicated_html and deduplicated_html != html_content:
-                filename = self.save_html(deduplicated_html, self.config.output_nodup_file)
-                self.logger.info(f"중복 제거된 HTML 파일 저장 완료: {filename}")
-                return filename
-            else:
-                self.logger.info("중복 제거할 내용이 없거나 실패")
-                return ""
-        except Exception as e:
-            self.logger.error(f"중복 제거 실패: {e}")
-            return ""
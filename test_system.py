@@ -5,11 +5,38 @@
 
 import sys
 import os
+import re
+import time
+import json
+import difflib
+import tempfile
+import unittest
+import asyncio
+import threading
+import http.client
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+import ollama
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
 from lib_llm import LLMService
 from lib_news import NewsService
+from lib_cache import CacheService
+from lib_dedup import DedupService
+from lib_relevance import RelevanceService
+from lib_worker import SummaryWorkerClient, SummaryWorkerServer
+from lib_extract import ArticleExtractor, decode_html
+from lib_queue import JobQueue, FETCHED, SCORED, EXTRACTED
+from lib_domain import DomainHealth, host_of
+from lib_url import canonicalize_items, normalize_url
+from lib_report import ReportWriter, ReportBuffer, RECORD_FIELDS
+from lib_server import ReportServer, ReportService
+from lib_index import ArticleIndex
+from lib_metrics import Metrics
+from news_processor import NewsProcessor
 
 def test_config():
     """설정 클래스 테스트"""
@@ -17,7 +44,12 @@ def test_config():
     config = Config()
     print(f"LLM 모델: {config.llm_model}")
     print(f"날짜 범위: {config.get_date_range_str()}")
+    from_date = config.from_date
+    config.refresh_dates(config.today + timedelta(days=1))
+    print(f"하루 뒤 날짜 범위: {config.get_date_range_str()}")
     print(f"연관성 임계값: {config.relevance_threshold}")
+    assert config.from_date - from_date == timedelta(days=1)
+    assert config.today - config.from_date == timedelta(days=config.days_back)
     print()
 
 def test_llm_service():
@@ -30,6 +62,10 @@ def test_llm_service():
         relevance = llm.assess_relevance("빈집", "농촌 지역의 빈집 문제가 심각하다")
         print(f"연관성 평가 결과: {relevance}")
         
+        # 일괄 연관성 평가 테스트
+        relevances = llm.assess_relevance_batch("빈집", ["농촌 지역의 빈집 문제가 심각하다", "오늘의 프로야구 경기 결과"])
+        print(f"일괄 연관성 평가 결과: {relevances}")
+        
         # 텍스트 생성 테스트
         response = llm.generate_text("안녕하세요를 영어로 번역해주세요.")
         print(f"텍스트 생성 결과: {response[:50]}...")
@@ -51,7 +87,7 @@ def test_news_service():
         
         # 링크 유효성 테스트
         valid_link = news_service.is_valid_link("https://news.naver.com/test")
-        invalid_link = news_service.is_valid_link("https://n.news.naver.com/test")
+        invalid_link = news_service.is_valid_link("https://news.ifm.kr/test")
         
         print(f"유효한 링크 테스트: {valid_link}")
         print(f"무효한 링크 테스트: {invalid_link}")
@@ -60,15 +96,816 @@ def test_news_service():
         print(f"뉴스 서비스 테스트 실패: {e}")
     print()
 
-def main():
-    """메인 테스트 함수"""
+def _temp_config(directory: str) -> Config:
+    """저장 파일을 모두 임시 디렉터리에 두는 설정 (오프라인 테스트용)"""
+    config = Config()
+    config.cache_dir = os.path.join(directory, "cache")
+    config.index_file = os.path.join(directory, "index.sqlite3")
+    config.queue_file = os.path.join(directory, "queue.sqlite3")
+    config.domain_stats_file = os.path.join(directory, "domains.sqlite3")
+    config.serve_cache_dir = os.path.join(directory, "reports")
+    config.output_file = os.path.join(directory, "result.html")
+    return config
+
+def test_cache():
+    """캐시 서비스 테스트"""
+    print("=== Cache 테스트 ===")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CacheService(os.path.join(cache_dir, "cache.sqlite3"), ttl_seconds=60, max_bytes=1024)
+        key = CacheService.make_key("빈집", "농촌 지역의 빈집 문제가 심각하다", "llama3.1:8b")
+        cache.set("relevance", key, 85)
+        print(f"캐시 조회 결과: {cache.get('relevance', key)}")
+        print(f"없는 키 조회 결과: {cache.get('relevance', 'missing')}")
+        assert cache.get("relevance", key) == 85
+        assert cache.get("relevance", "missing") is None
+        assert cache.get("summary", key) is None
+        cache.close()
+    print()
+
+def test_dedup():
+    """중복 제거 서비스 테스트"""
+    print("=== Dedup 테스트 ===")
+    dedup = DedupService()
+    texts = [
+        "농촌 지역의 빈집 문제가 심각하다. 정부는 대책을 발표했다",
+        "오늘의 프로야구 경기 결과",
+        "농촌 지역의 빈집 문제가 심각하다… 정부는 대책을 발표했다!",
+    ]
+    kept = dedup.unique_indices(texts)
+    print(f"남길 기사 인덱스: {kept}")
+    # 문장부호만 다른 기사는 먼저 나온 것만 남김
+    assert kept == [0, 1]
+    
+    index = dedup.new_index()
+    assert index.add(texts[2])
+    assert not index.add(texts[0])
+    assert index.add("")
+    print()
+
+class _RecordingLLM:
+    """LLM 평가로 넘어온 제목을 기록하는 가짜 LLM 서비스"""
+
+    def __init__(self):
+        self.titles = []
+
+    def assess_relevance_batch(self, keyword, titles):
+        self.titles.extend(titles)
+        return [70] * len(titles)
+
+def test_relevance_prefilter():
+    """연관성 사전 필터 테스트"""
+    print("=== Relevance 사전 필터 테스트 ===")
+    service = RelevanceService(Config(), _RecordingLLM())
+    scores = service.lexical_scores("농촌 빈집", ["농촌 빈집 정비 사업 확대", "빈집 세금 감면", "프로야구 개막"])
+    print(f"키워드 n-gram 포함률: {[round(score, 2) for score in scores]}")
+    assert scores[0] == 1.0
+    assert 0.0 < scores[1] < 1.0
+    assert scores[2] == 0.0
+    print()
+
+def test_relevance_short_keyword():
+    """짧은 키워드와 겹치지 않게 바꿔 쓴 제목도 LLM 평가로 넘어가는지 테스트"""
+    print("=== Relevance 짧은 키워드 테스트 ===")
+    config = Config()
+    config.relevance_cascade = True
+    config.relevance_embedding_model = ""
+    llm = _RecordingLLM()
+    items = [
+        {"title": "빈집 정비 사업 확대", "description": ""},
+        {"title": "사람이 떠난 시골 폐가 늘어", "description": "농촌 주택이 방치되고 있다"},
+    ]
+    scores = RelevanceService(config, llm).score_batch("빈집", items)
+    print(f"평가 결과: {scores}, LLM 평가 제목: {llm.titles}")
+    assert scores == [100, 70]
+    assert llm.titles == ["사람이 떠난 시골 폐가 늘어"]
+    print()
+
+# 경량 추출기 테스트용 기사 페이지 (EUC-KR, 메뉴/저작권 문구 포함)
+_EXTRACTOR_HTML = """<html><head><meta charset="euc-kr"><title>빈집 정비</title></head><body>
+<nav>정치 경제 사회</nav>
+<div id="article-view-content-div"><p>농촌 지역의 빈집이 빠르게 늘어나면서 지자체가 정비 사업을 확대하고 있다.</p>
+<p>정부는 올해 관련 예산을 작년보다 늘리고, 빈집을 공공 임대주택으로 활용하는 방안도 검토하고 있다.</p></div>
+<footer>무단 전재 및 재배포 금지</footer></body></html>"""
+
+def test_extractor():
+    """경량 본문 추출기 테스트 (EUC-KR 디코딩, 메뉴/저작권 문구 제외)"""
+    print("=== Article Extractor 테스트 ===")
+    text = decode_html(_EXTRACTOR_HTML.encode("cp949"))
+    extracted = ArticleExtractor().extract(text, "https://www.example.co.kr/news/1")
+    print(f"경량 추출 결과: {extracted[:60]}...")
+    assert extracted.startswith("농촌 지역의 빈집이 빠르게 늘어나면서")
+    assert "공공 임대주택" in extracted
+    assert "정치 경제 사회" not in extracted and "무단 전재" not in extracted
+    print()
+
+def test_extractor_matches_newspaper():
+    """경량 본문 추출 결과가 newspaper 결과와 충분히 같은지 테스트 (newspaper3k가 없으면 건너뜀)"""
+    print("=== Article Extractor / newspaper 비교 테스트 ===")
+    try:
+        from newspaper import Article
+    except ImportError as e:
+        raise unittest.SkipTest(f"newspaper3k를 불러올 수 없습니다: {e}")
+    text = decode_html(_EXTRACTOR_HTML.encode("cp949"))
+    extracted = ArticleExtractor().extract(text, "https://www.example.co.kr/news/1")
+    article = Article("https://www.example.co.kr/news/1", language='ko')
+    article.download(input_html=text)
+    article.parse()
+    similarity = difflib.SequenceMatcher(None, " ".join(extracted.split()), " ".join(article.text.split())).ratio()
+    print(f"newspaper 결과와 유사도: {similarity:.3f}")
+    assert similarity >= 0.8
+    print()
+
+def test_job_queue():
+    """작업 대기열 테스트 (임대 만료 후 다른 작업자가 이어서 처리)"""
+    print("=== Job Queue 테스트 ===")
+    with tempfile.TemporaryDirectory() as queue_dir:
+        queue = JobQueue(os.path.join(queue_dir, "queue.sqlite3"), lease_seconds=0)
+        queue.enqueue([("빈집", None)])
+        query, keyword = queue.lease_query("worker-1")
+        queue.complete_query(query, "worker-1", [{"link": "https://n.news.naver.com/1", "title": "빈집"}])
+        tasks = queue.lease_articles(FETCHED, "worker-1", 10)
+        # 임대 시간이 0이므로 worker-2가 바로 다시 임대할 수 있음
+        retaken = queue.lease_articles(FETCHED, "worker-2", 10)
+        stale = queue.complete_articles("worker-1", [(task_id, SCORED, record) for task_id, record in tasks])
+        done = queue.complete_articles("worker-2", [(task_id, SCORED, record) for task_id, record in retaken])
+        print(f"만료된 임대 반영 건수: {stale}, 이어받은 작업 반영 건수: {done}")
+        print(f"대기열 상태: {queue.counts()}")
+        assert (stale, done) == (0, 1)
+        assert queue.counts() == {"scored": 1, "query:fetched": 1}
+        
+        # 임대만 하고 끝내지 못한 작업은 시도 횟수(max_attempts)를 넘으면 failed
+        crashed = JobQueue(os.path.join(queue_dir, "crashed.sqlite3"), lease_seconds=0, max_attempts=2)
+        crashed.enqueue([("빈집", None)])
+        leases = 0
+        while crashed.lease_query(f"worker-{leases}"):
+            leases += 1
+        print(f"종료된 작업자 작업 임대 횟수: {leases}, 상태: {crashed.counts()}")
+        assert leases == 2
+        assert crashed.counts() == {"query:failed": 1}
+        assert crashed.enqueue([("빈집", None)]) == 1
+        crashed.close()
+        queue.close()
+    print()
+
+class _LateRenderQueue(JobQueue):
+    """보고서 잠금을 기다리는 사이 다른 작업자가 보고서를 기록한 대기열"""
+
+    def acquire_lock(self, name, owner):
+        acquired = super().acquire_lock(name, owner)
+        self.set_meta("rendered", "other-worker")
+        return acquired
+
+def test_render_queue_once():
+    """잠금을 얻은 뒤에도 이미 기록된 대기열은 다시 기록하지 않는지 테스트"""
+    print("=== Render Queue 테스트 ===")
+    with tempfile.TemporaryDirectory() as queue_dir:
+        processor = NewsProcessor(_temp_config(queue_dir))
+        queue = _LateRenderQueue(os.path.join(queue_dir, "render.sqlite3"))
+        queue.enqueue([("빈집", None)])
+        queue.lease_query("worker-1")
+        queue.complete_query("빈집", "worker-1", [])
+        assert queue.is_complete()
+        written = processor.render_queue(queue, "worker-1")
+        print(f"기록한 파일: {written}")
+        assert written == []
+        assert not os.path.exists(processor.config.output_file)
+        queue.close()
+    print()
+
+def test_domain_health():
+    """도메인별 추출 통계 테스트 (연속 실패 시 차단, 빠른 도메인 우선)"""
+    print("=== Domain Health 테스트 ===")
+    with tempfile.TemporaryDirectory() as stats_dir:
+        path = os.path.join(stats_dir, "domains.sqlite3")
+        domains = DomainHealth(path, skip_domains=["n.news.naver.com"], failure_threshold=2)
+        domains.record("https://fast.example.com/1", 0.2, chars=800)
+        domains.record("https://slow.example.com/1", 8.0, failed=True)
+        domains.record("https://slow.example.com/2", 8.0, chars=0)
+        order = domains.order(['https://slow.example.com/3', 'https://slow.example.com/4',
+                               'https://fast.example.com/2', 'https://fast.example.com/5'])
+        print(f"제외 도메인 판정: {domains.is_skipped('https://n.news.naver.com/article/1')}")
+        print(f"연속 실패 도메인 차단: {domains.is_skipped('https://slow.example.com/3')}")
+        print(f"처리 순서: {order}")
+        assert domains.is_skipped("https://n.news.naver.com/article/1")
+        assert domains.is_skipped("https://slow.example.com:443/3")
+        assert not domains.is_skipped("https://fast.example.com/3")
+        assert order == ['https://fast.example.com/2', 'https://slow.example.com/3',
+                         'https://fast.example.com/5', 'https://slow.example.com/4']
+        
+        # 다른 작업자 프로세스의 기록을 덮어쓰지 않고, 그 프로세스가 건 차단은 다음 기록 때 함께 읽음
+        other = DomainHealth(path, failure_threshold=2)
+        domains.record("https://shared.example.com/1", 1.0, failed=True)
+        other.record("https://shared.example.com/2", 1.0, failed=True)
+        assert other.is_skipped("https://shared.example.com/3")
+        domains.record("https://fast.example.com/6", 0.2, chars=800)
+        assert domains.is_skipped("https://shared.example.com/3")
+        # 차단 중에 끝난 요청의 성공은 차단을 풀지 않음
+        domains.record("https://shared.example.com/4", 1.0, chars=500)
+        assert other.is_skipped("https://shared.example.com/3")
+        reloaded = DomainHealth(path)
+        attempts = {row["host"]: row["attempts"] for row in reloaded.summary()}
+        reloaded.close()
+        print(f"공유 도메인 시도 횟수: {attempts['shared.example.com']}")
+        assert attempts["shared.example.com"] == 3
+        other.close()
+        domains.close()
+    print()
+
+def test_url_canonicalization():
+    """기사 주소 정규화 테스트 (원문 주소 우선, 같은 네이버 기사 id는 하나만)"""
+    print("=== URL Canonicalization 테스트 ===")
+    normalized = normalize_url('https://M.YNA.co.kr/view/AKR1?input=1195m&utm_source=naver#top')
+    print(f"추적 파라미터 제거: {normalized}")
+    assert normalized == "https://www.yna.co.kr/view/AKR1?input=1195m"
+    items = [
+        {"link": "https://n.news.naver.com/mnews/article/001/0014567890", "originallink": "https://www.yna.co.kr/view/AKR1"},
+        {"link": "https://news.naver.com/main/read.naver?oid=001&aid=0014567890", "originallink": ""},
+        {"link": "https://n.news.naver.com/mnews/article/002/0000000001", "originallink": ""},
+    ]
+    with tempfile.TemporaryDirectory() as stats_dir:
+        news_service = NewsService(_temp_config(stats_dir))
+        kept = canonicalize_items(items, news_service.is_valid_link)
+        news_service.close()
+    print(f"선택된 주소: {[item['link'] for item in kept]}")
+    assert [item['link'] for item in kept] == [
+        "https://www.yna.co.kr/view/AKR1",
+        "https://n.news.naver.com/mnews/article/002/0000000001",
+    ]
+    print()
+
+class _FakeTokenizer:
+    """공백 단위로 토큰을 세는 가짜 토크나이저"""
+
+    model_max_length = 1024
+
+    def __call__(self, texts, add_special_tokens=True):
+        return {"input_ids": [text.split() for text in texts]}
+
+class _FakeSummaryBackend:
+    """받은 입력 묶음을 기록하고 첫 단어를 요약으로 돌려주는 가짜 요약 백엔드"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.tokenizer = _FakeTokenizer()
+        self.batches = []
+
+    def summarize(self, texts):
+        self.batches.append(list(texts))
+        return [text.split()[0] for text in texts]
+
+def _fake_summary_processor(directory: str) -> NewsProcessor:
+    """가짜 요약 백엔드를 붙인 처리기 (캐시 없음)"""
+    config = _temp_config(directory)
+    config.cache_enabled = False
+    processor = NewsProcessor(config)
+    processor.summarizer = _FakeSummaryBackend()
+    processor.tokenizer = processor.summarizer.tokenizer
+    processor._summarizer_loaded = True
+    return processor
+
+def test_summarize_batch():
+    """일괄 요약 테스트 (길이순 묶음, 묶음 크기 제한, 입력 순서대로 반환)"""
+    print("=== Summarize Batch 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        processor = _fake_summary_processor(directory)
+        processor.config.summary_batch_size = 2
+        texts = [f"기사{i} " + "빈집 정비 사업 확대 " * (12 - 2 * i) + "끝." for i in range(4)]
+        texts.append("짧은 글")
+        summaries = processor.summarize_batch(texts)
+        batches = processor.summarizer.batches
+        print(f"요약: {summaries}, 묶음 크기: {[len(batch) for batch in batches]}")
+        assert summaries == ["기사0", "기사1", "기사2", "기사3", "요약할 수 있는 내용이 부족합니다."]
+        assert all(len(batch) <= 2 for batch in batches)
+        # 길이가 비슷한 짧은 글부터 묶어 요약
+        assert [text.split()[0] for batch in batches for text in batch] == ["기사3", "기사2", "기사1", "기사0"]
+    print()
+
+def _pub_date(hours_ago: float) -> str:
+    """지금부터 hours_ago시간 전의 네이버 pubDate 문자열"""
+    return (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).strftime('%a, %d %b %Y %H:%M:%S %z')
+
+def _news_item(number: int, hours_ago: float = 1) -> Dict[str, str]:
+    """네이버 검색 결과 형식의 기사 항목"""
+    return {
+        "title": f"<b>빈집</b> 기사 {number}번 제목 {'가나다라마바사'[number % 7] * 3}",
+        "originallink": f"https://www.example.co.kr/news/{number}",
+        "link": f"https://n.news.naver.com/mnews/article/001/{number:010d}",
+        "description": f"설명 {number}",
+        "pubDate": _pub_date(hours_ago),
+    }
+
+def _news_body(number: int) -> str:
+    """기사 번호마다 내용이 다른 본문"""
+    return f"본문{number} " + " ".join(f"{number}번 기사의 {k}번째 문장입니다." for k in range(number, number + 8))
+
+class _AcceptAllRelevance:
+    """모든 기사를 연관성 100으로 평가하는 가짜 연관성 서비스"""
+
+    def score_batch(self, keyword, items):
+        return [100] * len(items)
+
+def _offline_processor(directory: str, items: Dict[str, List[Dict[str, str]]]) -> Tuple[NewsProcessor, List[str]]:
+    """네이버 API, 기사 다운로드, 연관성 평가, 요약 모델 대신 가짜를 붙인 처리기와 다운로드 요청 기록"""
+    processor = _fake_summary_processor(directory)
+    processor.config.naver_client_id = processor.config.naver_client_secret = "test"
+    processor.relevance_service = _AcceptAllRelevance()
+    processor.news_service.fetch_news_many = (
+        lambda queries, since=None, seen=None: {query: items.get(query, []) for query in queries}
+    )
+    requested = []
+    
+    def submit_extract(url):
+        requested.append(url)
+        future = Future()
+        future.set_result(_news_body(int(url.rsplit("/", 1)[1])))
+        return future
+    
+    processor.news_service.submit_extract = submit_extract
+    return processor, requested
+
+def test_batch_shared_articles():
+    """여러 검색어 일괄 처리 테스트 (검색어 간 같은 기사는 한 번만 다운로드/요약, 같은 검색어 중복은 오류)"""
+    print("=== Batch 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        processor, requested = _offline_processor(directory, {
+            "빈집": [_news_item(1), _news_item(2)],
+            "폐가": [_news_item(2), _news_item(3)],
+        })
+        buffers = processor.render_batch([("빈집", None), ("폐가", "빈집")])
+        links = {query: [record["link"] for record in buffer.records] for query, buffer in buffers.items()}
+        summarized = [text.split()[0] for batch in processor.summarizer.batches for text in batch]
+        print(f"검색어별 기사: {links}, 다운로드 {len(requested)}건, 요약 {summarized}")
+        assert links == {
+            "빈집": ["https://www.example.co.kr/news/1", "https://www.example.co.kr/news/2"],
+            "폐가": ["https://www.example.co.kr/news/2", "https://www.example.co.kr/news/3"],
+        }
+        assert sorted(requested) == [f"https://www.example.co.kr/news/{n}" for n in (1, 2, 3)]
+        assert sorted(summarized) == ["본문1", "본문2", "본문3"]
+        assert buffers["폐가"].records[0]["summary"] == "본문2"
+        
+        try:
+            processor.render_batch([("빈집", None), ("빈집", "폐가")])
+        except ValueError as e:
+            print(f"같은 검색어 중복: {e}")
+        else:
+            raise AssertionError("같은 검색어가 두 번 있으면 ValueError가 나야 합니다.")
+    print()
+
+def _paged_news_service(directory: str, pages: List[List[Dict[str, str]]]) -> Tuple[NewsService, List[int]]:
+    """_request_page가 pages를 차례로 돌려주는 뉴스 서비스와 요청한 start 기록"""
+    config = _temp_config(directory)
+    config.news_display_count = 2
+    news_service = NewsService(config)
+    starts = []
+    
+    def request_page(query, start, display):
+        starts.append(start)
+        page = (start - 1) // display
+        return {"items": pages[page] if page < len(pages) else []}
+    
+    news_service._request_page = request_page
+    return news_service, starts
+
+def test_extract_concurrency():
+    """본문 동시 추출 테스트 (호스트별/전체 동시 다운로드 제한, 대기열 이어받기, 입력 순서 유지)"""
+    print("=== Extract Concurrency 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        config = _temp_config(directory)
+        config.fetch_workers = 4
+        config.fetch_per_host = 2
+        news_service = NewsService(config)
+        lock = threading.Lock()
+        active: Dict[str, int] = {}
+        peaks: Dict[str, int] = {}
+        overall = {"active": 0, "peak": 0}
+        
+        def extract_article_text(url):
+            host = host_of(url)
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peaks[host] = max(peaks.get(host, 0), active[host])
+                overall["active"] += 1
+                overall["peak"] = max(overall["peak"], overall["active"])
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+                overall["active"] -= 1
+            return f"본문:{url}"
+        
+        news_service.extract_article_text = extract_article_text
+        # 포트만 다른 주소는 같은 호스트로 제한
+        urls = [f"https://{site}.example.com/news/{n}" for n in range(4) for site in ("a", "b", "c")]
+        urls += [f"https://a.example.com:8443/news/{n}" for n in range(3)]
+        urls += [urls[0], urls[5], urls[0]]
+        bodies = news_service.extract_articles(urls)
+        print(f"호스트별 최대 동시 다운로드: {peaks}, 전체 최대: {overall['peak']}")
+        assert bodies == [f"본문:{url}" for url in urls]
+        assert max(peaks.values()) <= config.fetch_per_host
+        assert config.fetch_per_host < overall["peak"] <= config.fetch_workers
+        assert sorted(peaks) == ["a.example.com", "b.example.com", "c.example.com"]
+        assert not news_service._host_active and not news_service._host_pending
+        news_service.close()
+    print()
+
+def test_fetch_news_paging():
+    """네이버 결과 페이지 넘김 테스트 (수집 기간보다 오래된 기사에서 중단)"""
+    print("=== Fetch Paging 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        old = 24 * 30
+        pages = [[_news_item(1), _news_item(2)], [_news_item(3), _news_item(4, old)], [_news_item(5), _news_item(6)]]
+        news_service, starts = _paged_news_service(directory, pages)
+        items = news_service.fetch_news("빈집")
+        print(f"요청한 start: {starts}, 수집: {len(items)}건")
+        assert starts == [1, 3]
+        assert [item["originallink"][-1] for item in items] == ["1", "2", "3"]
+        
+        # 마지막 페이지가 display보다 적으면 다음 페이지를 요청하지 않음
+        starts.clear()
+        pages[:] = [[_news_item(1), _news_item(2)], [_news_item(3)]]
+        assert len(news_service.fetch_news("빈집")) == 3
+        assert starts == [1, 3]
+        news_service.close()
+    print()
+
+def test_report_writer():
+    """스트리밍 보고서 기록 테스트 (JSONL 레코드, 완료 후 '.part' 파일 정리)"""
+    print("=== Report Writer 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        processor, _ = _offline_processor(directory, {"빈집": [_news_item(1), _news_item(2)]})
+        written = processor.write_report("빈집")
+        html_file = processor.config.output_file
+        jsonl_file = os.path.splitext(html_file)[0] + ".jsonl"
+        with open(jsonl_file, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        print(f"기록한 파일: {written}, JSONL 레코드: {len(records)}건")
+        assert written == html_file
+        assert os.path.exists(jsonl_file)
+        assert not any(name.endswith(".part") for name in os.listdir(directory))
+        assert [record["link"] for record in records] == [
+            "https://www.example.co.kr/news/1", "https://www.example.co.kr/news/2"
+        ]
+        assert set(records[0]) == set(RECORD_FIELDS)
+        assert records[0]["query"] == "빈집" and records[0]["summary"] == "본문1"
+        assert records[0]["title"] == "빈집 기사 1번 제목 나나나"
+        with open(html_file, encoding="utf-8") as f:
+            assert "본문2" in f.read()
+        
+        # 작성 중 오류가 나면 최종 파일을 만들지 않고 부분 결과를 '.part'로 남김
+        failed_file = os.path.join(directory, "failed.html")
+        try:
+            with ReportWriter(failed_file, os.path.join(directory, "failed.jsonl")) as writer:
+                writer.write("<html>")
+                raise RuntimeError("중단")
+        except RuntimeError:
+            pass
+        assert not os.path.exists(failed_file)
+        assert os.path.exists(failed_file + ".part")
+    print()
+
+def test_incremental_merge():
+    """증분 수집 테스트 (이미 처리한 링크에서 페이지 넘김 중단, 새 기사와 이전 기사 병합)"""
+    print("=== Incremental 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        pages = [[_news_item(3), _news_item(2)], [_news_item(1), _news_item(0)]]
+        news_service, starts = _paged_news_service(directory, pages)
+        items = news_service.fetch_news("빈집", seen={"https://www.example.co.kr/news/2"})
+        print(f"처리한 링크까지 수집: {[item['originallink'] for item in items]}, 요청한 start: {starts}")
+        assert [item["originallink"] for item in items] == ["https://www.example.co.kr/news/3"]
+        assert starts == [1]
+        news_service.close()
+        
+        processor, requested = _offline_processor(directory, {})
+        processor.config.incremental = True
+        processor.index = ArticleIndex(processor.config.index_file)
+        latest = {"빈집": [_news_item(1, 5), _news_item(2, 4)]}
+        seen_args = []
+        
+        def fetch_news_many(queries, since=None, seen=None):
+            seen_args.append(seen)
+            return {query: [item for item in latest[query] if item["originallink"] not in seen[query]]
+                    for query in queries}
+        
+        processor.news_service.fetch_news_many = fetch_news_many
+        first = processor.render_batch([("빈집", None)])["빈집"].records
+        latest["빈집"] = [_news_item(3, 1)] + latest["빈집"]
+        requested.clear()
+        second = processor.render_batch([("빈집", None)])["빈집"].records
+        print(f"두 번째 실행 기사: {[record['link'] for record in second]}, 다운로드: {requested}")
+        assert [record["link"] for record in first] == [
+            "https://www.example.co.kr/news/1", "https://www.example.co.kr/news/2"
+        ]
+        assert "https://www.example.co.kr/news/1" in seen_args[-1]["빈집"]
+        assert requested == ["https://www.example.co.kr/news/3"]
+        # 새 기사를 먼저, 이전 실행의 기사는 색인에서 최신순으로 이어서
+        assert [record["link"] for record in second] == [
+            "https://www.example.co.kr/news/3", "https://www.example.co.kr/news/2", "https://www.example.co.kr/news/1"
+        ]
+        assert second[2]["summary"] == "본문1"
+        
+        # 중간에 중단된 실행에서 저장만 한 기사는 처리한 링크로 보지 않음 (다음 실행이 그 뒤까지 수집)
+        processor.index.save_record("폐가", {"link": "https://www.example.co.kr/news/9", "pubDate": _pub_date(1)})
+        assert processor.index.seen_links("폐가") == set()
+        processor.index.mark_seen("폐가", [_news_item(9)])
+        assert "https://www.example.co.kr/news/9" in processor.index.seen_links("폐가")
+        processor.index.close()
+    print()
+
+def test_metrics_prometheus():
+    """단계별 지표 테스트 (Prometheus 히스토그램 버킷이 누적값인지)"""
+    print("=== Metrics 테스트 ===")
+    collector = Metrics()
+    for seconds in (0.003, 0.2, 0.2, 3.0, 500.0):
+        collector.observe("article.download", seconds)
+    collector.count("articles.processed", 2)
+    collector.record_tokens("summary", 100, 2.0)
+    text = collector.to_prometheus()
+    buckets = {}
+    for line in text.splitlines():
+        match = re.match(r'news_article_download_seconds_bucket\{le="([^"]+)"\} (\d+)$', line)
+        if match:
+            buckets[match.group(1)] = int(match.group(2))
+    print(f"버킷: {buckets}")
+    counts = list(buckets.values())
+    assert counts == sorted(counts)
+    assert (buckets["0.005"], buckets["0.25"], buckets["5.0"], buckets["120.0"], buckets["+Inf"]) == (1, 3, 4, 4, 5)
+    assert "news_article_download_seconds_count 5" in text
+    assert "news_articles_processed_total 2" in text
+    assert collector.snapshot()["throughput"]["summary"]["tokens_per_second"] == 50.0
+    print()
+
+def test_chunked_summary():
+    """긴 기사 조각 요약 테스트 (조각마다 summary_chunk_tokens 이하, 조각 요약을 모아 다시 요약)"""
+    print("=== Chunked Summary 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        processor = _fake_summary_processor(directory)
+        processor.config.summary_chunk_tokens = 20
+        processor.config.summary_max_chunks = 8
+        sentences = [f"문장{k} 농촌 지역의 빈집이 늘고 있다." for k in range(12)]
+        long_sentence = " ".join(f"단어{k}" for k in range(50))
+        text = " ".join(sentences) + "\n" + long_sentence
+        
+        chunks = processor._split_chunks(text)
+        sizes = [len(chunk.split()) for chunk in chunks]
+        print(f"조각 토큰 수: {sizes}")
+        assert len(chunks) > 1 and max(sizes) <= 20
+        assert chunks[0].startswith("문장0 ")
+        
+        summary = processor.summarize_text(text)
+        inputs = [text for batch in processor.summarizer.batches for text in batch]
+        print(f"요약: {summary}, 모델 입력 {len(inputs)}건")
+        assert all(len(chunk.split()) <= 20 for chunk in inputs)
+        # 조각 요약("문장0", "문장3", ...)을 모은 글을 다시 요약
+        assert inputs[-1].startswith("문장0 ") and summary == "문장0"
+        
+        processor.config.summary_max_chunks = 2
+        assert len(processor._split_chunks(text)) == 2
+    print()
+
+class _FlakyOllamaClient:
+    """프롬프트별로 정해진 횟수만큼 실패한 뒤 응답하고, 동시 요청 수를 기록하는 가짜 Ollama 클라이언트"""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        self.calls: Dict[str, int] = {}
+        self.active = 0
+        self.max_active = 0
+
+    async def chat(self, model, messages, **kwargs):
+        prompt = messages[0]["content"]
+        self.calls[prompt] = self.calls.get(prompt, 0) + 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            error = self.failures.get(prompt)
+            if error is not None and self.calls[prompt] <= 2:
+                raise error
+            return {"message": {"content": f"응답:{prompt}"}}
+        finally:
+            self.active -= 1
+
+def test_llm_client_retries():
+    """LLM 요청 테스트 (연결 재사용 클라이언트, 동시 요청 제한, 재시도할 오류만 재시도)"""
+    print("=== LLM Client 테스트 ===")
+    client = _FlakyOllamaClient({
+        "flaky": ConnectionError("연결 끊김"),
+        "bad": ollama.ResponseError("잘못된 요청", 400),
+    })
+    llm = LLMService(max_in_flight=2, max_retries=2, backoff=0)
+    
+    async def open_client():
+        llm._client = client
+        llm._semaphore = asyncio.Semaphore(llm.max_in_flight)
+    
+    llm._open_client = open_client
+    try:
+        responses = llm._send_requests(["flaky", "bad", "a", "b", "c"])
+    finally:
+        llm.close()
+    print(f"응답: {responses}, 요청 횟수: {client.calls}, 최대 동시 요청: {client.max_active}")
+    assert responses == ["응답:flaky", None, "응답:a", "응답:b", "응답:c"]
+    assert client.calls["flaky"] == 3
+    assert client.calls["bad"] == 1
+    assert client.max_active <= 2
+    
+    # 실제 클라이언트는 직접 만든 연결 풀을 쓰고 close()에서 함께 닫음
+    llm = LLMService(timeout=2)
+    llm._get_loop()
+    transport = llm._transport
+    assert transport is not None
+    llm.close()
+    assert llm._transport is None and llm._loop is None
+    print()
+
+def test_relevance_structured_output():
+    """구조화된 연관성 응답 테스트 (점수 개수가 맞지 않으면 버리고 개별 평가로 대체)"""
+    print("=== Relevance Structured Output 테스트 ===")
+    llm = LLMService(batch_size=3)
+    assert llm._parse_relevance('{"score": 150}') == 100
+    assert llm._parse_relevance('{"score": true}') is None
+    assert llm._parse_relevance('NaN') is None and llm._parse_relevance('{"score": Infinity}') is None
+    assert llm._parse_relevance('1e999') is None
+    assert llm._parse_relevance_chunk('{"scores": [NaN, 1, -Infinity]}', 3) == {1: 1}
+    assert llm._parse_relevance_chunk('{"scores": [10, 20]}', 3) == {}
+    assert llm._parse_relevance_chunk('{"scores": [10, 20, 30]}', 3) == {0: 10, 1: 20, 2: 30}
+    # 응답 형식이나 응답 길이 제한이 다르면 캐시 점수를 공유하지 않음
+    assert llm._relevance_key("빈집", "빈집 정비") != LLMService(scoring_format="text")._relevance_key("빈집", "빈집 정비")
+    assert llm._relevance_key("빈집", "빈집 정비") != LLMService(num_predict=4)._relevance_key("빈집", "빈집 정비")
+    
+    requests = []
+    
+    def send_requests(prompts, format=None, options=None):
+        requests.append((format, options, len(prompts)))
+        if format is LLMService._SCORES_SCHEMA:
+            return ['{"scores": [90, 10]}' for _ in prompts]
+        return ['{"score": 80}' for _ in prompts]
+    
+    llm._send_requests = send_requests
+    scores = llm.assess_relevance_batch("빈집", ["빈집 정비", "프로야구 개막", "폐가 철거"])
+    print(f"점수: {scores}, 요청: {[(options, count) for _, options, count in requests]}")
+    assert scores == [80, 80, 80]
+    assert requests[0][0] is LLMService._SCORES_SCHEMA and requests[1][0] is LLMService._SCORE_SCHEMA
+    assert requests[1][2] == 3
+    assert all(options["temperature"] == 0 for _, options, _ in requests)
+    print()
+
+class _FakeReportProcessor:
+    """보고서 서버 테스트용 가짜 처리기 (검색어와 실행 횟수로 보고서 생성)"""
+
+    def __init__(self, config):
+        self.config = config
+        self.runs = []
+
+    def render_batch(self, jobs):
+        self.runs.append(list(jobs))
+        buffers = {}
+        for query, keyword in jobs:
+            buffer = ReportBuffer()
+            buffer.write(f"<html><body>{query} {keyword}</body></html>")
+            buffer.write_record({"query": query, "title": query})
+            buffers[query] = buffer
+        return buffers
+
+def test_report_server():
+    """보고서 서버 테스트 (ETag 304, q 없는 갱신 요청 400, 재시작 후 저장된 검색어 다시 구독)"""
+    print("=== Report Server 테스트 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        config = _temp_config(directory)
+        service = ReportService(_FakeReportProcessor(config), config.serve_cache_dir, refresh_seconds=3600)
+        server = ReportServer(("127.0.0.1", 0), service)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            def request(method, path, headers=None):
+                connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+                connection.close()
+                return response, body
+            
+            path = "/report?q=" + quote("빈집") + "&keyword=" + quote("폐가")
+            response, body = request("GET", path)
+            etag = response.getheader("ETag")
+            print(f"보고서 응답: {response.status}, ETag: {etag}")
+            assert response.status == 200 and "빈집 폐가" in body.decode("utf-8")
+            assert request("GET", path, {"If-None-Match": etag})[0].status == 304
+            assert request("POST", "/refresh")[0].status == 400
+            assert request("POST", "/missing?q=x")[0].status == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.stop()
+        
+        # 다시 시작하면 저장된 검색어를 키워드와 함께 구독하고, 갱신 주기가 지났으면 바로 갱신 대상
+        restarted = ReportService(_FakeReportProcessor(config), config.serve_cache_dir, refresh_seconds=0)
+        rows = restarted.subscriptions()
+        print(f"재시작 후 구독: {rows}")
+        assert [(row["query"], row["keyword"], row["articles"]) for row in rows] == [("빈집", "폐가", 1)]
+        assert restarted._due_queries()[0] == ["빈집"]
+    print()
+
+class _FakeSummaryProcessor:
+    """요약 워커 테스트용 가짜 처리기 (첫 단어를 요약으로 돌려줌)"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def summarize_batch(self, texts):
+        return [text.split()[0] for text in texts]
+
+def test_summary_worker():
+    """상주 요약 워커 연결 테스트"""
+    print("=== Summary Worker 테스트 ===")
+    with tempfile.TemporaryDirectory() as socket_dir:
+        socket_path = os.path.join(socket_dir, "summary.sock")
+        server = SummaryWorkerServer(socket_path, _FakeSummaryProcessor(Config()))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = SummaryWorkerClient(socket_path, timeout=5)
+            summaries = client.summarize(["농촌 지역의 빈집 문제가 심각하다", "프로야구 개막"])
+            print(f"워커 응답: {client.ping()}, 요약: {summaries}")
+            assert client.ping()
+            assert summaries == ["농촌", "프로야구"]
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert not SummaryWorkerClient(socket_path, timeout=5).ping()
+    print()
+
+def test_summary_preload_skipped_when_cached():
+    """요약이 모두 캐시에 있으면 요약 모델 로딩을 시작하지 않는지 테스트"""
+    print("=== Summary Preload 테스트 ===")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        config = _temp_config(cache_dir)
+        config.summary_model = ""
+        processor = NewsProcessor(config)
+        body = "농촌 지역의 빈집이 빠르게 늘어나면서 지자체가 정비 사업을 확대하고 있다. " * 3
+        processor._set_cached_summary(body, "빈집 정비 사업 확대")
+        processor.news_service.extract_articles = lambda links: [body for _ in links]
+        
+        outcomes = processor._queue_extract([{"link": "https://www.example.co.kr/news/1", "title": "빈집"}])
+        summaries = processor.summarize_batch([body])
+        print(f"요약: {summaries}, 모델 로딩 시작: {processor._preload_thread is not None}")
+        assert outcomes[0][0] == EXTRACTED
+        assert summaries == ["빈집 정비 사업 확대"]
+        assert processor._preload_thread is None and not processor._summarizer_loaded
+        
+        # 캐시에 없는 본문이 나오면 로딩을 시작
+        processor.news_service.extract_articles = lambda links: [body + "새 문단." for _ in links]
+        processor._queue_extract([{"link": "https://www.example.co.kr/news/2", "title": "빈집"}])
+        assert processor._preload_thread is not None
+        processor._preload_thread.join()
+    print()
+
+def main() -> int:
+    """메인 테스트 함수 (실패한 테스트가 있으면 1 반환)"""
     print("리팩토링된 뉴스 시스템 테스트를 시작합니다...\n")
     
-    test_config()
-    test_llm_service()
-    test_news_service()
+    tests = [
+        test_config,
+        test_llm_service,
+        test_news_service,
+        test_cache,
+        test_dedup,
+        test_relevance_prefilter,
+        test_relevance_short_keyword,
+        test_extractor,
+        test_extractor_matches_newspaper,
+        test_job_queue,
+        test_render_queue_once,
+        test_domain_health,
+        test_url_canonicalization,
+        test_summarize_batch,
+        test_batch_shared_articles,
+        test_extract_concurrency,
+        test_fetch_news_paging,
+        test_report_writer,
+        test_incremental_merge,
+        test_metrics_prometheus,
+        test_chunked_summary,
+        test_llm_client_retries,
+        test_relevance_structured_output,
+        test_report_server,
+        test_summary_worker,
+        test_summary_preload_skipped_when_cached,
+    ]
+    failed = []
+    for test in tests:
+        try:
+            test()
+        except unittest.SkipTest as e:
+            print(f"{test.__name__} 건너뜀: {e}\n")
+        except Exception as e:
+            print(f"{test.__name__} 실패: {e!r}\n")
+            failed.append(test.__name__)
     
+    if failed:
+        print(f"실패한 테스트 {len(failed)}개: {', '.join(failed)}")
+        return 1
     print("테스트 완료!")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())